@@ -87,6 +87,58 @@ def main():
         help="skip creating empty output files, only support `xlabel2yolo` and `xlabel2voc` tasks",
     )
 
+    autolabel_parser = subparsers.add_parser(
+        "autolabel", help="run auto labeling without the GUI"
+    )
+    autolabel_parser.add_argument(
+        "--model",
+        type=str,
+        help="model config file path or built-in model name",
+    )
+    autolabel_parser.add_argument(
+        "--images", type=str, help="image directory path"
+    )
+    autolabel_parser.add_argument(
+        "--output",
+        type=str,
+        help="label directory path (default: image directory)",
+    )
+    autolabel_parser.add_argument(
+        "--format",
+        type=str,
+        default="xlabel",
+        help="output label format (e.g., xlabel, yolo, voc, coco)",
+    )
+    autolabel_parser.add_argument(
+        "--workers", type=int, default=None, help="number of decoding threads"
+    )
+    autolabel_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="images per inference call (default: model batch size)",
+    )
+    autolabel_parser.add_argument(
+        "--prompt", type=str, help="text prompt for grounding models"
+    )
+    autolabel_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the checkpoint and label all images again",
+    )
+    autolabel_parser.add_argument(
+        "--classes", type=str, help="classes file path for --format"
+    )
+    autolabel_parser.add_argument(
+        "--pose-cfg", type=str, help="pose configuration file for --format"
+    )
+    autolabel_parser.add_argument(
+        "--mode", type=str, help="conversion mode for --format"
+    )
+    autolabel_parser.add_argument(
+        "--mapping", type=str, help="mapping table file path for --format"
+    )
+
     parser.add_argument(
         "--reset-config", action="store_true", help="reset qt config"
     )
@@ -212,6 +264,10 @@ def main():
             "anylabeling.views.common.converter",
             fromlist=["handle_convert_command"],
         ).handle_convert_command(args),
+        "autolabel": lambda args: __import__(
+            "anylabeling.views.common.autolabel",
+            fromlist=["handle_autolabel_command"],
+        ).handle_autolabel_command(args),
     }
 
     if args.command and args.command in special:
@@ -12,6 +12,7 @@ CLI_HELP_MSG = """
         version           Show version information
         config            Show config file path
         convert           Run conversion tasks
+        autolabel         Run auto labeling without the GUI
 
     Launch Options:
         xanylabeling                                    Launch the GUI application
@@ -25,6 +26,9 @@ CLI_HELP_MSG = """
         xanylabeling convert --task <task>              Show help for a specific task
         xanylabeling convert --task <task> [options]    Run conversion
 
+    Auto Labeling:
+        xanylabeling autolabel --model <model> --images DIR [options]
+
     Examples:
         1. Launch the app:
             xanylabeling
@@ -47,6 +51,9 @@ CLI_HELP_MSG = """
         7. Convert YOLO to XLABEL:
             xanylabeling convert --task yolo2xlabel --mode detect --images ./images --labels ./labels --output ./output --classes classes.txt
 
+        8. Auto label a folder on a server without a display:
+            xanylabeling autolabel --model yolov8n --images ./images --output ./labels
+
     For more options, use: xanylabeling --help
 
     Docs: https://github.com/CVHub520/X-AnyLabeling/tree/main/docs
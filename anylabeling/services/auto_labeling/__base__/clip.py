@@ -1,6 +1,8 @@
 import os
 import cv2
+import hashlib
 import collections
+import threading
 import unicodedata
 import six
 import numpy as np
@@ -31,10 +33,87 @@ _MODEL_INFO = {
     "RN50": {"struct": "RN50@RBT3-chinese", "input_resolution": 224},
 }
 
+DEFAULT_TEXT_FEATURE_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), "xanylabeling_data", "text_features"
+)
+
+
+class TextFeatureCache:
+    """Memoized text features of a CLIP text encoder.
+
+    Features are keyed by text and persisted to one `.npz` file per text
+    model, so class prompts are only encoded once, not once per object and
+    image. The file name is derived from the model path, size and mtime,
+    so replacing the model file invalidates its features.
+    """
+
+    def __init__(self, model_path, context_length, cache_dir=None):
+        self.lock = threading.Lock()
+        self.features = {}
+        self.cache_file = None
+        if cache_dir is None:
+            cache_dir = DEFAULT_TEXT_FEATURE_CACHE_DIR
+        if not cache_dir:
+            return
+        try:
+            stat = os.stat(model_path)
+        except OSError:
+            return
+        stamp = (
+            f"{os.path.abspath(model_path)}|{stat.st_size}|"
+            f"{stat.st_mtime_ns}|{context_length}"
+        )
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        digest = hashlib.sha1(stamp.encode()).hexdigest()[:16]
+        self.cache_file = os.path.join(cache_dir, f"{name}_{digest}.npz")
+        self._load()
+
+    def get(self, text):
+        return self.features.get(text)
+
+    def update(self, texts, features):
+        """Add features of texts and persist the cache"""
+        with self.lock:
+            for text, feature in zip(texts, features):
+                self.features[text] = feature
+            self._save()
+
+    def _load(self):
+        if not os.path.isfile(self.cache_file):
+            return
+        try:
+            with np.load(self.cache_file, allow_pickle=False) as data:
+                self.features = dict(
+                    zip(data["texts"].tolist(), data["features"])
+                )
+        except Exception as e:  # noqa
+            logger.warning(f"Could not load text features: {e}")
+
+    def _save(self):
+        if not self.cache_file or not self.features:
+            return
+        texts = list(self.features)
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            np.savez(
+                tmp_file,
+                texts=np.array(texts),
+                features=np.stack([self.features[t] for t in texts]),
+            )
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:  # noqa
+            logger.warning(f"Could not persist text features: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
 
 class ChineseClipONNX:
     """Ref: https://github.com/OFA-Sys/Chinese-CLIP"""
 
+    # Maximum number of crops per image encoder call in `classify`
+    crop_batch_size = 64
+
     def __init__(
         self,
         txt_model_path: str,
@@ -42,35 +121,77 @@ class ChineseClipONNX:
         model_arch: str,
         device: str = "cpu",
         context_length: int = 52,
+        text_cache_dir: str = None,
+        session_config: dict = None,
     ) -> None:
         # Load models
-        self.txt_net = OnnxBaseModel(txt_model_path, device_type=device)
-        self.img_net = OnnxBaseModel(img_model_path, device_type=device)
+        self.txt_net = OnnxBaseModel(
+            txt_model_path,
+            device_type=device,
+            session_config=session_config,
+        )
+        self.img_net = OnnxBaseModel(
+            img_model_path,
+            device_type=device,
+            session_config=session_config,
+        )
         # Image settings
         self.image_size = _MODEL_INFO[model_arch]["input_resolution"]
         # Text settings
         self._tokenizer = FullTokenizer()
         self.context_length = context_length
+        self.text_cache = TextFeatureCache(
+            txt_model_path, context_length, text_cache_dir
+        )
+        batch_size = self.txt_net.get_input_shape()[0]
+        self.txt_dynamic_batch = not isinstance(batch_size, int)
+        batch_size = self.img_net.get_input_shape()[0]
+        self.img_dynamic_batch = not isinstance(batch_size, int)
 
     def __call__(self, image: np.ndarray, text: List[str]):
+        return self.classify([image], text)
+
+    def classify(self, images: List[np.ndarray], text: List[str]):
+        """Score images, e.g. all object crops of an image, against texts.
+
+        The crops are preprocessed together and encoded in batches, then
+        scored against the cached text features with a single matmul.
+
+        Returns:
+            np.ndarray: Probabilities of shape (len(images), len(text)).
+        """
         txt_features = self.txt_pipeline(text)
-        img_features = self.img_pipeline(image)
+        img_features = self.img_pipeline_batch(images)
         logits_per_image = 100 * np.dot(img_features, txt_features.T)
-        probabilities = np.exp(logits_per_image) / np.sum(
-            np.exp(logits_per_image), axis=1, keepdims=True
-        )
+        logits_per_image -= np.max(logits_per_image, axis=1, keepdims=True)
+        probabilities = np.exp(logits_per_image)
+        probabilities /= np.sum(probabilities, axis=1, keepdims=True)
         return probabilities
 
     def txt_pipeline(self, text: List[str]):
-        text = self.tokenize(text, context_length=self.context_length)
-        features = []
-        for i in range(len(text)):
-            blob = np.expand_dims(text[i], axis=0)
-            feature = self.txt_net.get_ort_inference(blob)
-            features.append(feature)
-        features = np.squeeze(np.stack(features), axis=1)
-        features = self.postprocess(features)
-        return features
+        if isinstance(text, str):
+            text = [text]
+        missing = [
+            t for t in dict.fromkeys(text) if self.text_cache.get(t) is None
+        ]
+        if missing:
+            self.text_cache.update(missing, self.encode_text(missing))
+        return np.stack([self.text_cache.get(t) for t in text])
+
+    def encode_text(self, text: List[str]):
+        """Run the text encoder without the cache, in a single batch if
+        the model has a dynamic batch dimension."""
+        tokens = self.tokenize(text, context_length=self.context_length)
+        if self.txt_dynamic_batch:
+            features = self.txt_net.get_ort_inference(tokens)
+        else:
+            features = np.concatenate(
+                [
+                    self.txt_net.get_ort_inference(tokens[i : i + 1])
+                    for i in range(len(tokens))
+                ]
+            )
+        return self.postprocess(features)
 
     def img_pipeline(self, image: np.ndarray):
         blob = self.image_preprocess(image, image_size=self.image_size)
@@ -78,17 +199,49 @@ class ChineseClipONNX:
         features = self.postprocess(outputs)
         return features
 
+    def img_pipeline_batch(self, images: List[np.ndarray]):
+        features = []
+        for start in range(0, len(images), self.crop_batch_size):
+            blob = self.batch_preprocess(
+                images[start : start + self.crop_batch_size]
+            )
+            if self.img_dynamic_batch:
+                features.append(self.img_net.get_ort_inference(blob))
+            else:
+                features.extend(
+                    self.img_net.get_ort_inference(blob[i : i + 1])
+                    for i in range(len(blob))
+                )
+        return self.postprocess(np.concatenate(features))
+
+    def batch_preprocess(
+        self,
+        images,
+        mean_value=(0.48145466, 0.4578275, 0.40821073),
+        std_value=(0.26862954, 0.26130258, 0.27577711),
+    ):
+        """Resize and normalize images into one float32 NCHW blob"""
+        size = self.image_size
+        blob = np.empty((len(images), size, size, 3), dtype=np.float32)
+        for i, image in enumerate(images):
+            blob[i] = cv2.resize(image, (size, size))
+        # Every image is scaled by its own maximum, as in `normalize`
+        scale = np.max(np.abs(blob).reshape(len(images), -1), axis=1)
+        blob /= np.maximum(scale, 1e-6)[:, None, None, None]
+        blob -= np.array(mean_value, dtype=np.float32)
+        blob /= np.array(std_value, dtype=np.float32)
+        return np.ascontiguousarray(blob.transpose(0, 3, 1, 2))
+
     @staticmethod
     def normalize(data, mean, std):
-        if not isinstance(mean, np.ndarray):
-            mean = np.array(mean)
-        if not isinstance(std, np.ndarray):
-            std = np.array(std)
-        _max = np.max(abs(data))
+        mean = np.asarray(mean, dtype=np.float32)
+        std = np.asarray(std, dtype=np.float32)
+        data = data.astype(np.float32)
+        _max = np.max(np.abs(data))
         _div = np.divide(data, _max)
         _sub = np.subtract(_div, mean)
         arrays = np.divide(_sub, std)
-        arrays = np.transpose(arrays, (2, 0, 1)).astype(np.float32)
+        arrays = np.transpose(arrays, (2, 0, 1))
         return arrays
 
     def image_preprocess(
@@ -40,7 +40,11 @@ class RecognizeAnything(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.input_shape = self.net.get_input_shape()[-2:]
         self.tag_mode = self.config.get("tag_mode", "")  # ['en', 'cn']
 
@@ -24,9 +24,12 @@ class RTMDet:
         std: tuple = (57.3750, 57.1200, 58.3950),
         backend: str = "onnxruntime",
         device: str = "cpu",
+        session_config: dict = None,
     ):
         super().__init__()
-        self.net = OnnxBaseModel(onnx_model, device_type=device)
+        self.net = OnnxBaseModel(
+            onnx_model, device_type=device, session_config=session_config
+        )
         self.model_input_size = self.net.get_input_shape()[-2:]
         if not isinstance(self.model_input_size[0], int):
             self.model_input_size = model_input_size
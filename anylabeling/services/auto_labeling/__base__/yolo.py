@@ -20,7 +20,7 @@ from ..utils import (
     scale_boxes,
     scale_coords,
     point_in_bbox,
-    masks2segments,
+    roi_masks2segments,
     xyxy2xywh,
     xywhr2xyxyxyxy,
     non_max_suppression_v5,
@@ -74,7 +74,11 @@ class YOLO(Model):
             self.input_width = self.config.get("input_width", 640)
             self.input_height = self.config.get("input_height", 640)
         else:
-            self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+            self.net = OnnxBaseModel(
+                model_abs_path,
+                __preferred_device__,
+                session_config=self.config.get("session"),
+            )
             (
                 _,
                 _,
@@ -201,6 +205,29 @@ class YOLO(Model):
         if isinstance(self.classes, dict):
             self.classes = list(self.classes.values())
 
+        self._init_batching()
+
+    def _init_batching(self):
+        """
+        Set the images per inference call of `predict_shapes_batch`: the
+        `batch_size` config key for a dynamic batch axis, or the fixed
+        batch size of the model if it is larger than one.
+        """
+        self.batch_size = 1
+        self.fixed_batch_size = None
+        if (
+            self.engine.lower() == "dnn"
+            or self.tracker is not None
+            or self.model_type == "u_rtdetr"
+            or type(self).predict_shapes is not YOLO.predict_shapes
+        ):
+            return
+        batch_dim = self.net.get_input_shape()[0]
+        if not isinstance(batch_dim, int):
+            self.batch_size = max(int(self.config.get("batch_size", 8)), 1)
+        elif batch_dim > 1:
+            self.batch_size = self.fixed_batch_size = batch_dim
+
     def set_auto_labeling_conf(self, value):
         """set auto labeling confidence threshold"""
         if value > 0:
@@ -348,8 +375,7 @@ class YOLO(Model):
                     pred[:, 6:],
                     pred[:, :4],
                     self.input_shape,
-                    upsample=True,
-                )  # HWC
+                )
             elif self.task == "obb":
                 pred[:, :4] = scale_boxes(
                     self.input_shape, pred[:, :4], img_shape, xywh=True
@@ -403,14 +429,85 @@ class YOLO(Model):
             blob = self.preprocess_rtdetr(image)
         else:
             blob = self.preprocess(image, upsample_mode="letterbox")
+        if self.fixed_batch_size:
+            blob = self.pad_batch(blob)
         outputs = self.inference(blob)
+        return self.outputs_to_result(image, outputs)
+
+    def get_batch_size(self):
+        return self.batch_size
+
+    def predict_shapes_batch(self, images, image_paths):
+        """
+        Predict shapes for several images with one inference call per
+        `batch_size` images. Falls back to per-image inference if the
+        model cannot run a batch.
+        """
+        if self.batch_size <= 1:
+            return super().predict_shapes_batch(images, image_paths)
+
+        results = [[] for _ in image_paths]
+        indices, cv_images, blobs = [], [], []
+        for i, (image, image_path) in enumerate(zip(images, image_paths)):
+            if image is None:
+                continue
+            try:
+                cv_image = qt_img_to_rgb_cv_img(image, image_path)
+            except Exception as e:  # noqa
+                logger.warning(f"Could not read image {image_path}")
+                logger.warning(e)
+                continue
+            indices.append(i)
+            cv_images.append(cv_image)
+            blobs.append(self.preprocess(cv_image, upsample_mode="letterbox"))
+
+        for start in range(0, len(blobs), self.batch_size):
+            end = start + self.batch_size
+            blob = np.concatenate(blobs[start:end], axis=0)
+            if self.fixed_batch_size:
+                blob = self.pad_batch(blob)
+            try:
+                outputs = self.inference(blob)
+            except Exception as e:  # noqa
+                logger.warning(
+                    f"Batch inference failed, falling back to batch size 1: {e}"
+                )
+                self.batch_size = 1
+                self.fixed_batch_size = None
+                for i in indices[start:]:
+                    results[i] = self.predict_shapes(images[i], image_paths[i])
+                return results
+            for j, i in enumerate(indices[start:end]):
+                image = cv_images[start + j]
+                self.img_height, self.img_width = image.shape[:2]
+                self.image_shape = image.shape
+                preds = [output[j : j + 1] for output in outputs]
+                results[i] = self.outputs_to_result(image, preds)
+        return results
+
+    def pad_batch(self, blob):
+        """Pad a blob with zeros up to the fixed batch size of the model."""
+        pad = self.fixed_batch_size - blob.shape[0]
+        if pad <= 0:
+            return blob
+        padding = np.zeros((pad, *blob.shape[1:]), dtype=blob.dtype)
+        return np.concatenate([blob, padding], axis=0)
+
+    def outputs_to_result(self, image, outputs):
+        """
+        Convert the raw outputs of a single image into an AutoLabelingResult.
+        """
+        if self.fixed_batch_size:
+            outputs = [output[:1] for output in outputs]
         boxes, class_ids, scores, masks, keypoints = self.postprocess(outputs)
 
         points = [[] for _ in range(len(boxes))]
         if self.task == "seg" and masks is not None:
             points = [
                 scale_coords(self.input_shape, x, image.shape, normalize=False)
-                for x in masks2segments(masks, self.epsilon_factor)
+                for x in roi_masks2segments(
+                    masks, self.input_shape, self.epsilon_factor
+                )
             ]
         track_ids = [[] for _ in range(len(boxes))]
         if self.tracker is not None and (len(boxes) > 0):
@@ -667,60 +764,68 @@ class YOLO(Model):
             row_ind += length
         return outs[np.newaxis, :]
 
-    def process_mask(self, protos, masks_in, bboxes, shape, upsample=False):
+    def process_mask(self, protos, masks_in, bboxes, shape):
         """
-        Apply masks to bounding boxes using the output of the mask head.
+        Decode the mask of every bounding box from the output of the mask head.
+
+        Masks are decoded in float32 from the prototype pixels under each
+        box only, then upsampled to the input shape and thresholded, so
+        memory grows with the box sizes rather than with n * h * w.
 
         Args:
             protos (np.ndarray): A tensor of shape [mask_dim, mask_h, mask_w].
             masks_in (np.ndarray): A tensor of shape [n, mask_dim], where n is the number of masks after NMS.
             bboxes (np.ndarray): A tensor of shape [n, 4], where n is the number of masks after NMS.
             shape (tuple): A tuple of integers representing the size of the input image in the format (h, w).
-            upsample (bool): A flag to indicate whether to upsample the mask to the original image size. Default is False.
 
         Returns:
-            (np.ndarray): A binary mask tensor of shape [n, h, w],
-            where n is the number of masks after NMS, and h and w
-            are the height and width of the input image.
-            The mask is applied to the bounding boxes.
+            (List[Tuple[np.ndarray, Tuple[int, int]]]): For every box, a
+            binary uint8 mask of its region of interest in the input image
+            and the (x, y) offset of that region.
         """
         c, mh, mw = protos.shape
         ih, iw = shape
-        masks = 1 / (
-            1
-            + np.exp(
-                -np.dot(masks_in, protos.reshape(c, -1).astype(float)).astype(
-                    float
-                )
-            )
-        )
-        masks = masks.reshape(-1, mh, mw)
+        protos = protos.astype(np.float32, copy=False)
+        masks_in = masks_in.astype(np.float32, copy=False)
+        # Upsampling a region gives the same pixels as upsampling the whole
+        # mask when the input is an integer multiple of the mask size
+        scale_x, scale_y = iw // mw, ih // mh
+        aligned = scale_x * mw == iw and scale_y * mh == ih
 
         downsampled_bboxes = bboxes.copy()
         downsampled_bboxes[:, 0] *= mw / iw
         downsampled_bboxes[:, 2] *= mw / iw
         downsampled_bboxes[:, 3] *= mh / ih
         downsampled_bboxes[:, 1] *= mh / ih
-        masks = self.crop_mask_np(masks, downsampled_bboxes)  # CHW
-        if upsample:
-            if masks.shape[0] == 1:
-                masks_np = np.squeeze(masks, axis=0)
-                masks_resized = cv2.resize(
-                    masks_np,
-                    (shape[1], shape[0]),
-                    interpolation=cv2.INTER_LINEAR,
-                )
-                masks = np.expand_dims(masks_resized, axis=0)
+        # Prototype pixels inside each box, as crop_mask would keep them
+        crops = np.ceil(downsampled_bboxes).astype(int)
+        crops[:, [0, 2]] = crops[:, [0, 2]].clip(0, mw)
+        crops[:, [1, 3]] = crops[:, [1, 3]].clip(0, mh)
+
+        masks = []
+        for coefficients, (x1, y1, x2, y2) in zip(masks_in, crops):
+            if x1 >= x2 or y1 >= y2:
+                masks.append((np.zeros((0, 0), dtype=np.uint8), (0, 0)))
+                continue
+            # Keep a zero border, so the upsampled region fades out like
+            # the full mask and its contours are not cut at the edges
+            px1, py1 = max(x1 - 1, 0), max(y1 - 1, 0)
+            px2, py2 = min(x2 + 1, mw), min(y2 + 1, mh)
+            patch = np.zeros((py2 - py1, px2 - px1), dtype=np.float32)
+            logits = coefficients @ protos[:, y1:y2, x1:x2].reshape(c, -1)
+            with np.errstate(over="ignore"):
+                patch[y1 - py1 : y2 - py1, x1 - px1 : x2 - px1] = (
+                    1 / (1 + np.exp(-logits))
+                ).reshape(y2 - y1, x2 - x1)
+            if aligned:
+                offset = (px1 * scale_x, py1 * scale_y)
+                size = (patch.shape[1] * scale_x, patch.shape[0] * scale_y)
             else:
-                masks_np = np.transpose(masks, (1, 2, 0))
-                masks_resized = cv2.resize(
-                    masks_np,
-                    (shape[1], shape[0]),
-                    interpolation=cv2.INTER_LINEAR,
-                )
-                masks = np.transpose(masks_resized, (2, 0, 1))
-        masks[masks > 0.5] = 1
-        masks[masks <= 0.5] = 0
+                full = np.zeros((mh, mw), dtype=np.float32)
+                full[py1:py2, px1:px2] = patch
+                patch, offset, size = full, (0, 0), (iw, ih)
+            mask = cv2.resize(patch, size, interpolation=cv2.INTER_LINEAR)
+            masks.append(((mask > 0.5).astype(np.uint8), offset))
 
         return masks
 
@@ -863,25 +968,6 @@ class YOLO(Model):
             x = x[np.isin(x[:, -1], classes)]
         return [x]
 
-    @staticmethod
-    def crop_mask_np(masks, boxes):
-        """
-        It takes a mask and a bounding box, and returns a mask that is cropped to the bounding box.
-
-        Args:
-            masks (np.ndarray): [n, h, w] array of masks.
-            boxes (np.ndarray): [n, 4] array of bbox coordinates in relative point form.
-
-        Returns:
-            (np.ndarray): The masks are being cropped to the bounding box.
-        """
-        n, h, w = masks.shape
-        x1, y1, x2, y2 = np.hsplit(boxes[:, :, None], 4)
-        r = np.arange(w, dtype=x1.dtype)[None, None, :]  # rows shape(1,1,w)
-        c = np.arange(h, dtype=x1.dtype)[None, :, None]  # cols shape(1,h,1)
-
-        return masks * ((r >= x1) & (r < x2) & (c >= y1) & (c < y2))
-
     @staticmethod
     def rescale_coords_v10(boxes, image_shape, input_shape):
         """
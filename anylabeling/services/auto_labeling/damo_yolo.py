@@ -53,7 +53,11 @@ class DAMO_YOLO(Model):
                 )
             )
 
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.classes = self.config["classes"]
         self.filter_classes = self.config.get("filter_classes", [])
         self.input_shape = self.net.get_input_shape()
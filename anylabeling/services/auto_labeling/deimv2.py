@@ -48,7 +48,11 @@ class DEIMv2(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.classes = self.config["classes"]
         self.imgsz = self.config.get("img_size", 640)
         self.conf_thres = self.config.get("conf_threshold", 0.40)
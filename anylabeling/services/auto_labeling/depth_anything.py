@@ -244,7 +244,11 @@ class DepthAnything(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.input_shape = self.net.get_input_shape()[-2:]
         self.render_mode = self.config.get("render_mode", "color")
         self.save_dir, self.file_ext = _THUMBNAIL_RENDER_MODELS[
@@ -42,7 +42,11 @@ class DepthAnythingV2(Model):
                 )
             )
         self.model_path = model_abs_path
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.input_shape = self.net.get_input_shape()[-2:]
         self.render_mode = self.config.get("render_mode", "color")
         self.device = "cuda" if __preferred_device__ == "GPU" else "cpu"
@@ -48,7 +48,11 @@ class DFINE(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.classes = self.config["classes"]
         self.input_shape = (640, 640)
         self.conf_thres = self.config["conf_threshold"]
@@ -0,0 +1,265 @@
+"""Persistent on-disk cache for image embeddings."""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from anylabeling.views.labeling.logger import logger
+
+from .lru_cache import LRUCache
+
+DEFAULT_EMBEDDING_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), "xanylabeling_data", "embeddings"
+)
+DEFAULT_DISK_CACHE_SIZE_MB = 4096
+
+_META_FILE = "meta.json"
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+class EmbeddingCache:
+    """Two-level cache for image embeddings.
+
+    Recently used embeddings are kept in an in-memory `LRUCache` keyed by
+    filename, exactly as before. Every embedding is also written to disk,
+    keyed by (model name, image content hash, input size), so that
+    re-opening an image in a later session skips the encoder entirely.
+    Arrays are stored as `.npy` files and memory-mapped on load. The disk
+    store is bounded by `max_bytes` and evicts least recently used entries.
+
+    The public interface (`get`, `put`, `find`) mirrors `LRUCache`, so the
+    cache can be dropped in wherever `image_embedding_cache` is used.
+    """
+
+    def __init__(
+        self,
+        model_name,
+        input_size=None,
+        maxsize=10,
+        max_bytes=DEFAULT_DISK_CACHE_SIZE_MB * 1024 * 1024,
+        cache_dir=None,
+        memory_max_bytes=None,
+    ):
+        self.memory_cache = LRUCache(maxsize, memory_max_bytes)
+        self.input_size = input_size
+        self.max_bytes = max_bytes
+        self.cache_dir = os.path.join(
+            cache_dir or DEFAULT_EMBEDDING_CACHE_DIR,
+            _safe_name(model_name),
+        )
+        self.lock = threading.RLock()
+        self._hashes = {}
+        self._index = OrderedDict()
+        self._total_bytes = 0
+        self.enabled = self.max_bytes > 0
+        if self.enabled:
+            self._load_index()
+
+    @classmethod
+    def from_config(cls, config, maxsize=10):
+        """Build a cache from a model config dict.
+
+        Supported optional keys:
+            embedding_cache_dir: root directory of the disk cache.
+            embedding_cache_size_mb: disk budget, 0 disables the disk cache.
+            embedding_cache_memory_mb: memory budget, replaces `maxsize`.
+        """
+        size_mb = config.get(
+            "embedding_cache_size_mb", DEFAULT_DISK_CACHE_SIZE_MB
+        )
+        memory = LRUCache.from_config(config, maxsize)
+        return cls(
+            config["name"],
+            input_size=config.get("input_size"),
+            maxsize=memory.maxsize,
+            max_bytes=int(size_mb * 1024 * 1024),
+            cache_dir=config.get("embedding_cache_dir"),
+            memory_max_bytes=memory.max_bytes,
+        )
+
+    def get(self, filename):
+        """Get embedding from memory or disk. Returns None on a miss."""
+        embedding = self.memory_cache.get(filename)
+        if embedding is not None or not self.enabled:
+            return embedding
+        key = self._get_key(filename)
+        if key is None:
+            return None
+        embedding = self._read(key)
+        if embedding is not None:
+            self.memory_cache.put(filename, embedding)
+        return embedding
+
+    def put(self, filename, embedding):
+        """Put embedding into memory and persist it to disk."""
+        self.memory_cache.put(filename, embedding)
+        if not self.enabled:
+            return
+        key = self._get_key(filename)
+        if key is None:
+            return
+        try:
+            self._write(key, embedding)
+        except Exception as e:  # noqa
+            logger.warning(f"Could not persist embedding for {filename}: {e}")
+
+    def find(self, filename):
+        """Returns True if an embedding for filename is cached."""
+        if self.memory_cache.find(filename):
+            return True
+        if not self.enabled:
+            return False
+        key = self._get_key(filename)
+        with self.lock:
+            return key is not None and key in self._index
+
+    def capacity(self, reserve=0):
+        """Returns how many embeddings fit in the memory budget."""
+        return self.memory_cache.capacity(reserve)
+
+    def stats(self):
+        """Returns memory cache counters plus disk usage."""
+        stats = self.memory_cache.stats()
+        with self.lock:
+            stats["disk_size"] = len(self._index)
+            stats["disk_nbytes"] = self._total_bytes
+            stats["disk_max_bytes"] = self.max_bytes
+        return stats
+
+    def clear(self):
+        """Remove all entries of this model from disk."""
+        with self.lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._index.clear()
+            self._total_bytes = 0
+
+    def _get_key(self, filename):
+        if not filename:
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        stamp = (filename, stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            content_hash = self._hashes.get(stamp)
+        if content_hash is None:
+            hasher = hashlib.sha1()
+            try:
+                with open(filename, "rb") as f:
+                    for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                        hasher.update(chunk)
+            except OSError:
+                return None
+            content_hash = hasher.hexdigest()
+            with self.lock:
+                self._hashes[stamp] = content_hash
+        size = json.dumps(self.input_size)
+        return hashlib.sha1(f"{content_hash}|{size}".encode()).hexdigest()
+
+    def _load_index(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, key)
+            meta_file = os.path.join(entry_dir, _META_FILE)
+            if not os.path.isfile(meta_file):
+                # Leftover of an interrupted write
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            entries.append(
+                (os.path.getmtime(meta_file), key, _dir_size(entry_dir))
+            )
+        for _, key, nbytes in sorted(entries):
+            self._index[key] = nbytes
+            self._total_bytes += nbytes
+        self._evict()
+
+    def _read(self, key):
+        with self.lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        entry_dir = os.path.join(self.cache_dir, key)
+        try:
+            with open(os.path.join(entry_dir, _META_FILE), "r") as f:
+                meta = json.load(f)
+            embedding = {}
+            for name in meta["arrays"]:
+                embedding[name] = np.load(
+                    os.path.join(entry_dir, f"{name}.npy"), mmap_mode="r"
+                )
+            for name, value in meta["values"].items():
+                if name in meta["tuples"]:
+                    value = tuple(value)
+                embedding[name] = value
+            os.utime(os.path.join(entry_dir, _META_FILE))
+        except Exception as e:  # noqa
+            logger.warning(f"Dropping corrupted embedding cache entry: {e}")
+            self._remove(key)
+            return None
+        return embedding
+
+    def _write(self, key, embedding):
+        with self.lock:
+            if key in self._index:
+                self._index.move_to_end(key)
+                return
+        entry_dir = os.path.join(self.cache_dir, key)
+        tmp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            meta = {"arrays": [], "values": {}, "tuples": []}
+            for name, value in embedding.items():
+                if isinstance(value, np.ndarray):
+                    np.save(os.path.join(tmp_dir, f"{name}.npy"), value)
+                    meta["arrays"].append(name)
+                else:
+                    if isinstance(value, tuple):
+                        meta["tuples"].append(name)
+                    meta["values"][name] = _to_builtin(value)
+            with open(os.path.join(tmp_dir, _META_FILE), "w") as f:
+                json.dump(meta, f)
+            nbytes = _dir_size(tmp_dir)
+            os.replace(tmp_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        with self.lock:
+            self._index[key] = nbytes
+            self._total_bytes += nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            key = next(iter(self._index))
+            self._remove(key)
+
+    def _remove(self, key):
+        with self.lock:
+            self._total_bytes -= self._index.pop(key, 0)
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+
+def _safe_name(name):
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def _dir_size(path):
+    return sum(
+        os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+    )
+
+
+def _to_builtin(value):
+    if isinstance(value, (tuple, list)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -1,29 +1,291 @@
+import hashlib
 import os
-import onnx
+import threading
+
 import onnxruntime as ort
 
+from anylabeling.views.labeling.logger import logger
+
+DEFAULT_OPTIMIZED_MODEL_DIR = os.path.join(
+    os.path.expanduser("~"), "xanylabeling_data", "optimized_models"
+)
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+EXECUTION_MODES = {
+    "sequential": ort.ExecutionMode.ORT_SEQUENTIAL,
+    "parallel": ort.ExecutionMode.ORT_PARALLEL,
+}
+
+# Custom metadata of model files, keyed by path, size and mtime
+_metadata_cache = {}
+_metadata_lock = threading.Lock()
+
 
 class OnnxBaseModel:
+    """ONNX Runtime session of a model file.
+
+    The optional `session_config` is the `session` block of a model
+    config, with the keys:
+
+    - providers: execution providers in order of preference, e.g.
+      [CUDAExecutionProvider, CPUExecutionProvider]. Defaults to CUDA
+      for the GPU device and CPU otherwise.
+    - intra_op_num_threads / inter_op_num_threads: thread pool sizes,
+      inter_op_num_threads defaults to OMP_NUM_THREADS when it is set.
+    - graph_optimization_level: disable, basic, extended or all.
+    - execution_mode: sequential or parallel.
+    - enable_mem_arena / enable_mem_pattern: CPU memory arena and memory
+      pattern planning.
+    - cache_optimized_model: save the optimized graph under
+      ~/xanylabeling_data/optimized_models, so later loads of the same
+      model file skip graph optimization. Defaults to true. If the graph
+      cannot be saved, this is recorded there too and later loads of the
+      same model file do not try again.
+    """
+
     def __init__(
-        self, model_path, device_type: str = "cpu", log_severity_level: int = 3
+        self,
+        model_path,
+        device_type: str = "cpu",
+        log_severity_level: int = 3,
+        session_config: dict = None,
+        optimized_model_dir: str = None,
     ):
-        self.sess_opts = ort.SessionOptions()
-        self.sess_opts.log_severity_level = log_severity_level
-        if "OMP_NUM_THREADS" in os.environ:
-            self.sess_opts.inter_op_num_threads = int(
-                os.environ["OMP_NUM_THREADS"]
+        session_config = dict(session_config or {})
+        self.model_path = model_path
+        self.log_severity_level = log_severity_level
+        self.providers = self.get_providers(
+            device_type, session_config.get("providers")
+        )
+        self.sess_opts = self.get_session_options(session_config)
+        self.optimized_model_file = None
+
+        cache_file = None
+        if session_config.get("cache_optimized_model", True):
+            cache_file = self.get_optimized_model_file(
+                session_config, optimized_model_dir
+            )
+        if cache_file and os.path.isfile(cache_file):
+            self.ort_session = self.load_optimized_model(
+                cache_file, session_config
+            )
+        elif cache_file and not os.path.isfile(
+            self.get_failed_marker_file(cache_file)
+        ):
+            self.ort_session = self.save_optimized_model(
+                cache_file, session_config
             )
+        else:
+            self.ort_session = self.create_session(model_path, self.sess_opts)
 
-        self.providers = ["CPUExecutionProvider"]
-        if device_type.lower() == "gpu":
-            self.providers = ["CUDAExecutionProvider"]
+        logger.info(
+            f"Loaded {os.path.basename(model_path)} with "
+            f"{self.describe_session()}"
+        )
 
-        self.ort_session = ort.InferenceSession(
+    def get_providers(self, device_type, providers=None):
+        if not providers:
+            if device_type.lower() == "gpu":
+                return ["CUDAExecutionProvider"]
+            return ["CPUExecutionProvider"]
+        available = ort.get_available_providers()
+        unavailable = [p for p in providers if p not in available]
+        if unavailable:
+            logger.warning(
+                f"Execution providers {unavailable} are not available, "
+                f"available providers are {available}"
+            )
+        providers = [p for p in providers if p in available]
+        return providers or ["CPUExecutionProvider"]
+
+    def get_session_options(self, session_config, optimization_level=None):
+        sess_opts = ort.SessionOptions()
+        sess_opts.log_severity_level = self.log_severity_level
+        if "inter_op_num_threads" in session_config:
+            sess_opts.inter_op_num_threads = int(
+                session_config["inter_op_num_threads"]
+            )
+        elif "OMP_NUM_THREADS" in os.environ:
+            sess_opts.inter_op_num_threads = int(os.environ["OMP_NUM_THREADS"])
+        if "intra_op_num_threads" in session_config:
+            sess_opts.intra_op_num_threads = int(
+                session_config["intra_op_num_threads"]
+            )
+        if optimization_level is None:
+            optimization_level = session_config.get(
+                "graph_optimization_level", "all"
+            )
+        if optimization_level not in GRAPH_OPTIMIZATION_LEVELS:
+            raise ValueError(
+                f"Invalid graph_optimization_level {optimization_level!r}, "
+                f"expected one of {list(GRAPH_OPTIMIZATION_LEVELS)}"
+            )
+        sess_opts.graph_optimization_level = GRAPH_OPTIMIZATION_LEVELS[
+            optimization_level
+        ]
+        execution_mode = session_config.get("execution_mode", "sequential")
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(
+                f"Invalid execution_mode {execution_mode!r}, "
+                f"expected one of {list(EXECUTION_MODES)}"
+            )
+        sess_opts.execution_mode = EXECUTION_MODES[execution_mode]
+        if "enable_mem_arena" in session_config:
+            sess_opts.enable_cpu_mem_arena = bool(
+                session_config["enable_mem_arena"]
+            )
+        if "enable_mem_pattern" in session_config:
+            sess_opts.enable_mem_pattern = bool(
+                session_config["enable_mem_pattern"]
+            )
+        return sess_opts
+
+    def get_optimized_model_file(self, session_config, optimized_model_dir):
+        """
+        Path of the optimized graph for this model file and these settings,
+        or None if the graph is not optimized.
+        """
+        optimization_level = session_config.get(
+            "graph_optimization_level", "all"
+        )
+        if optimization_level == "disable":
+            return None
+        try:
+            stat = os.stat(self.model_path)
+        except OSError:
+            return None
+        # Optimized graphs depend on the providers and the runtime version
+        stamp = (
+            f"{os.path.abspath(self.model_path)}|{stat.st_size}|"
+            f"{stat.st_mtime_ns}|{optimization_level}|"
+            f"{','.join(self.providers)}|{ort.__version__}"
+        )
+        digest = hashlib.sha1(stamp.encode()).hexdigest()[:16]
+        return os.path.join(
+            optimized_model_dir or DEFAULT_OPTIMIZED_MODEL_DIR,
+            f"{self.get_optimized_model_prefix()}{digest}.onnx",
+        )
+
+    def get_optimized_model_prefix(self):
+        """Start of the names of the optimized graphs of this model file"""
+        path = os.path.abspath(self.model_path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        path_digest = hashlib.sha1(path.encode()).hexdigest()[:8]
+        return f"{name}_{path_digest}_"
+
+    @staticmethod
+    def get_failed_marker_file(cache_file):
+        """File recording that the graph of cache_file cannot be saved"""
+        return f"{os.path.splitext(cache_file)[0]}.failed"
+
+    def remove_stale_optimized_models(self, cache_file):
+        """
+        Remove the optimized graphs and failure markers of this model file
+        other than those of cache_file, which were made for an older
+        version of the file or for other settings.
+        """
+        cache_dir, cache_name = os.path.split(cache_file)
+        current = {
+            cache_name,
+            os.path.basename(self.get_failed_marker_file(cache_file)),
+        }
+        prefix = self.get_optimized_model_prefix()
+        for name in os.listdir(cache_dir):
+            if (
+                name in current
+                or not name.startswith(prefix)
+                or not name.endswith((".onnx", ".failed"))
+            ):
+                continue
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+
+    def load_optimized_model(self, cache_file, session_config):
+        """Load a saved optimized graph without optimizing it again"""
+        sess_opts = self.get_session_options(
+            session_config, optimization_level="disable"
+        )
+        try:
+            session = self.create_session(cache_file, sess_opts)
+        except Exception as e:  # noqa
+            logger.warning(f"Could not load optimized model {cache_file}: {e}")
+            try:
+                os.remove(cache_file)
+            except OSError:
+                pass
+            return self.create_session(self.model_path, self.sess_opts)
+        self.sess_opts = sess_opts
+        self.optimized_model_file = cache_file
+        return session
+
+    def save_optimized_model(self, cache_file, session_config):
+        """Create the session and save its optimized graph to cache_file"""
+        temp_file = f"{cache_file}.{os.getpid()}.tmp"
+        sess_opts = self.get_session_options(session_config)
+        sess_opts.optimized_model_filepath = temp_file
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            session = self.create_session(self.model_path, sess_opts)
+            os.replace(temp_file, cache_file)
+            self.remove_stale_optimized_models(cache_file)
+        except Exception as e:  # noqa
+            # e.g. models over 2 GB, which cannot be saved in one file
+            logger.warning(
+                f"Could not save optimized model of {self.model_path}: {e}"
+            )
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
+            self.record_failed_optimized_model(cache_file)
+            return self.create_session(self.model_path, self.sess_opts)
+        self.optimized_model_file = cache_file
+        return session
+
+    def record_failed_optimized_model(self, cache_file):
+        """
+        Mark the graph of cache_file as not savable, so later loads of the
+        same model file and settings skip the optimize-and-save attempt.
+        """
+        try:
+            with open(self.get_failed_marker_file(cache_file), "w"):
+                pass
+            self.remove_stale_optimized_models(cache_file)
+        except OSError:
+            pass
+
+    def create_session(self, model_path, sess_opts):
+        return ort.InferenceSession(
             model_path,
             providers=self.providers,
-            sess_options=self.sess_opts,
+            sess_options=sess_opts,
         )
-        self.model_path = model_path
+
+    def describe_session(self):
+        """Settings of the session, for logging"""
+        level = {v: k for k, v in GRAPH_OPTIMIZATION_LEVELS.items()}
+        mode = {v: k for k, v in EXECUTION_MODES.items()}
+        info = (
+            f"providers={self.ort_session.get_providers()}, "
+            f"intra_op_num_threads={self.sess_opts.intra_op_num_threads}, "
+            f"inter_op_num_threads={self.sess_opts.inter_op_num_threads}, "
+            "graph_optimization_level="
+            f"{level[self.sess_opts.graph_optimization_level]}, "
+            f"execution_mode={mode[self.sess_opts.execution_mode]}, "
+            f"enable_mem_arena={self.sess_opts.enable_cpu_mem_arena}, "
+            f"enable_mem_pattern={self.sess_opts.enable_mem_pattern}"
+        )
+        if self.optimized_model_file:
+            info += f", optimized_model={self.optimized_model_file}"
+        return info
 
     def get_ort_inference(
         self, blob=None, inputs=None, extract=True, squeeze=False
@@ -48,10 +310,30 @@ class OnnxBaseModel:
     def get_output_name(self):
         return [out.name for out in self.ort_session.get_outputs()]
 
+    def get_metadata(self):
+        """
+        Custom metadata of the model file as a dict, read once per file
+        from the session instead of parsing the whole graph again.
+        """
+        try:
+            stat = os.stat(self.model_path)
+            key = (
+                os.path.abspath(self.model_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+            )
+        except OSError:
+            key = None
+        with _metadata_lock:
+            metadata = _metadata_cache.get(key) if key else None
+            if metadata is None:
+                # The optimized graph keeps the metadata of the model file
+                metadata = dict(
+                    self.ort_session.get_modelmeta().custom_metadata_map
+                )
+                if key:
+                    _metadata_cache[key] = metadata
+        return dict(metadata)
+
     def get_metadata_info(self, field):
-        model = onnx.load(self.model_path)
-        metadata = model.metadata_props
-        for prop in metadata:
-            if prop.key == field:
-                return prop.value
-        return None
+        return self.get_metadata().get(field)
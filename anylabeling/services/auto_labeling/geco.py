@@ -255,8 +255,9 @@ class GeCo(Model):
 
         # Cache for image embedding
         self.cache_size = 10
-        self.preloaded_size = self.cache_size - 3
-        self.image_embedding_cache = LRUCache(self.cache_size)
+        self.image_embedding_cache = LRUCache.from_config(
+            self.config, self.cache_size
+        )
 
         # Pre-inference worker
         self.pre_inference_thread = None
@@ -318,16 +319,15 @@ class GeCo(Model):
         """
         Preload next files, run inference and cache results
         """
-        files = files[: self.preloaded_size]
+        files = files[: self.image_embedding_cache.capacity(reserve=3)]
         for filename in files:
             if self.image_embedding_cache.find(filename):
                 continue
-            image = self.load_image_from_filename(filename)
-            if image is None:
+            cv_image = self.load_cv_image_from_filename(filename)
+            if cv_image is None:
                 continue
             if self.stop_inference:
                 return
-            cv_image = qt_img_to_rgb_cv_img(image)
             image_embedding = self.model.encode(cv_image)
             self.image_embedding_cache.put(
                 filename,
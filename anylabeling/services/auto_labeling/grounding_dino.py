@@ -12,6 +12,7 @@ from anylabeling.app_info import __preferred_device__
 from anylabeling.views.labeling.shape import Shape
 from anylabeling.views.labeling.logger import logger
 from anylabeling.views.labeling.utils.opencv import qt_img_to_rgb_cv_img
+from .lru_cache import LRUCache
 from .model import Model
 from .types import AutoLabelingResult
 from .utils.general import Args
@@ -21,6 +22,14 @@ from .engines.build_onnx_engine import OnnxBaseModel
 class Grounding_DINO(Model):
     """Open-Set object detection model using Grounding_DINO"""
 
+    # ImageNet normalization folded into one scale and offset per channel
+    _SCALE = (1.0 / (255.0 * np.array([0.229, 0.224, 0.225]))).astype(
+        np.float32
+    )
+    _OFFSET = (-np.array([0.485, 0.456, 0.406]) * 255.0 * _SCALE).astype(
+        np.float32
+    )
+
     class Meta:
         required_config_names = [
             "type",
@@ -59,7 +68,11 @@ class Grounding_DINO(Model):
                 )
             )
 
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.model_configs = self.get_configs(self.config["model_type"])
         self.net.max_text_len = self.model_configs.max_text_len
         self.net.tokenizer = self.get_tokenlizer(
@@ -72,6 +85,9 @@ class Grounding_DINO(Model):
             self.config["input_height"],
         )
         self.replace = True
+        # The prompt is usually fixed for a whole folder, so the text
+        # inputs and decoded phrases are only built once per caption
+        self.text_inputs_cache = LRUCache(maxsize=16)
 
     def set_auto_labeling_conf(self, value):
         """set auto labeling box threshold"""
@@ -88,15 +104,26 @@ class Grounding_DINO(Model):
             image, self.target_size, interpolation=cv2.INTER_LINEAR
         )
 
-        image = image.astype(np.float32) / 255.0
-        mean = np.array([0.485, 0.456, 0.406])
-        std = np.array([0.229, 0.224, 0.225])
-        image = (image - mean) / std
-        image = np.transpose(image, (2, 0, 1))
-        image = np.expand_dims(image, 0).astype(np.float32)
+        # Normalize in float32 and convert HWC to NCHW
+        image = image.astype(np.float32)
+        image *= self._SCALE
+        image += self._OFFSET
+        image = np.ascontiguousarray(image.transpose(2, 0, 1)[None])
 
-        # encoder texts
         captions = self.get_caption(str(text_prompt))
+        inputs = dict(self.get_text_inputs(captions)["inputs"])
+        inputs["img"] = image
+        return image, inputs, captions
+
+    def get_text_inputs(self, captions):
+        """Return the cached text inputs and phrase table of a caption"""
+        text_inputs = self.text_inputs_cache.get(captions)
+        if text_inputs is None:
+            text_inputs = self.encode_text(captions)
+            self.text_inputs_cache.put(captions, text_inputs)
+        return text_inputs
+
+    def encode_text(self, captions):
         tokenized_raw_results = self.net.tokenizer.encode(captions)
         tokenized = {
             "input_ids": np.array([tokenized_raw_results.ids], dtype=np.int64),
@@ -129,7 +156,6 @@ class Grounding_DINO(Model):
                 :, : self.net.max_text_len
             ]
         inputs = {}
-        inputs["img"] = image
         inputs["input_ids"] = np.array(tokenized["input_ids"], dtype=np.int64)
         inputs["attention_mask"] = np.array(
             tokenized["attention_mask"], dtype=bool
@@ -141,7 +167,16 @@ class Grounding_DINO(Model):
         inputs["text_token_mask"] = np.array(
             text_self_attention_masks, dtype=bool
         )
-        return image, inputs, captions
+        # Tokens of the untruncated caption used to decode phrases, and the
+        # phrases decoded so far keyed by their token positions
+        phrase_tokenized = {
+            "input_ids": np.array(tokenized_raw_results.ids, dtype=np.int64),
+        }
+        return {
+            "inputs": inputs,
+            "phrase_tokenized": phrase_tokenized,
+            "phrases": {},
+        }
 
     def postprocess(
         self, outputs, caption, with_logits=True, token_spans=None
@@ -162,25 +197,21 @@ class Grounding_DINO(Model):
 
             # get phrase
             tokenlizer = self.net.tokenizer
-            tokenized_raw_results = tokenlizer.encode(caption)
-            tokenized = {
-                "input_ids": np.array(
-                    tokenized_raw_results.ids, dtype=np.int64
-                ),
-                "token_type_ids": np.array(
-                    tokenized_raw_results.type_ids, dtype=np.int64
-                ),
-                "attention_mask": np.array(
-                    tokenized_raw_results.attention_mask
-                ),
-            }
+            text_inputs = self.get_text_inputs(caption)
+            tokenized = text_inputs["phrase_tokenized"]
+            phrases = text_inputs["phrases"]
             # build pred
             pred_phrases = []
             for logit in logits_filt:
                 posmap = logit > self.text_threshold
-                pred_phrase = self.get_phrases_from_posmap(
-                    posmap, tokenized, tokenlizer
-                )
+                key = posmap.tobytes()
+                pred_phrase = phrases.get(key)
+                if pred_phrase is None:
+                    pred_phrase = self.get_phrases_from_posmap(
+                        posmap, tokenized, tokenlizer
+                    )
+                    if len(phrases) < 4096:
+                        phrases[key] = pred_phrase
                 if with_logits:
                     pred_phrases.append([pred_phrase, logit.max()])
                 else:
@@ -81,7 +81,11 @@ class GroundingSAM2(Model):
                 )
             )
 
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.model_configs = self.get_configs(self.config["model_type"])
         self.net.max_text_len = self.model_configs.max_text_len
         self.net.tokenizer = self.get_tokenlizer(
@@ -133,8 +137,9 @@ class GroundingSAM2(Model):
 
         # Cache for image embedding
         self.cache_size = 10
-        self.preloaded_size = self.cache_size - 3
-        self.image_embedding_cache = LRUCache(self.cache_size)
+        self.image_embedding_cache = LRUCache.from_config(
+            self.config, self.cache_size
+        )
         self.current_image_embedding_cache = {}
 
         # Pre-inference worker
@@ -651,16 +656,15 @@ class GroundingSAM2(Model):
         """
         Preload next files, run inference and cache results
         """
-        files = files[: self.preloaded_size]
+        files = files[: self.image_embedding_cache.capacity(reserve=3)]
         for filename in files:
             if self.image_embedding_cache.find(filename):
                 continue
-            image = self.load_image_from_filename(filename)
-            if image is None:
+            cv_image = self.load_cv_image_from_filename(filename)
+            if cv_image is None:
                 continue
             if self.stop_inference:
                 return
-            cv_image = qt_img_to_rgb_cv_img(image)
             image_embedding = self.model.encode(cv_image)
             self.image_embedding_cache.put(
                 filename,
@@ -42,7 +42,11 @@ class InternImage_CLS(Model):
                     "Could not download or initialize InternImage model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.classes = self.config["classes"]
         self.input_shape = self.net.get_input_shape()[-2:]
 
@@ -3,32 +3,113 @@
 from collections import OrderedDict
 import threading
 
+import numpy as np
+
+
+def get_nbytes(value):
+    """Returns the number of bytes held by numpy arrays in value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(get_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(get_nbytes(v) for v in value)
+    return 0
+
 
 class LRUCache:
-    """Thread-safe LRU cache implementation."""
+    """Thread-safe LRU cache implementation.
 
-    def __init__(self, maxsize=10):
+    Entries are evicted once there are more than `maxsize` of them, or once
+    the numpy payloads of all entries take more than `max_bytes`. Either
+    limit can be disabled by setting it to None. The most recently added
+    entry is never evicted, even if it alone exceeds `max_bytes`.
+    """
+
+    def __init__(self, maxsize=10, max_bytes=None):
         self.maxsize = maxsize
+        self.max_bytes = max_bytes
         self.lock = threading.Lock()
         self._cache = OrderedDict()
+        self._nbytes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, config, maxsize=10):
+        """Build a cache from a model config dict.
+
+        If the config sets `embedding_cache_memory_mb`, the cache is bounded
+        by that many megabytes of cached arrays instead of by entry count.
+        """
+        memory_mb = config.get("embedding_cache_memory_mb")
+        if memory_mb is None:
+            return cls(maxsize)
+        return cls(maxsize=None, max_bytes=int(memory_mb * 1024 * 1024))
 
     def get(self, key):
         """Get value from cache. Returns None if key is not present."""
         with self.lock:
             if key not in self._cache:
+                self.misses += 1
                 return None
+            self.hits += 1
             self._cache.move_to_end(key)
             return self._cache[key]
 
     def put(self, key, value):
         """Put value into cache. If cache is full, oldest item is evicted."""
+        nbytes = get_nbytes(value)
         with self.lock:
+            self.total_bytes -= self._nbytes.get(key, 0)
             self._cache[key] = value
+            self._nbytes[key] = nbytes
+            self.total_bytes += nbytes
             self._cache.move_to_end(key)
-            if len(self._cache) > self.maxsize:
-                self._cache.popitem(last=False)
+            while len(self._cache) > 1 and self._is_over_budget():
+                old_key, _ = self._cache.popitem(last=False)
+                self.total_bytes -= self._nbytes.pop(old_key)
+                self.evictions += 1
 
     def find(self, key):
         """Returns True if key is in cache, False otherwise."""
         with self.lock:
             return key in self._cache
+
+    def capacity(self, reserve=0):
+        """Returns how many entries of average size fit in the budget,
+        minus `reserve` entries kept free for the current image."""
+        with self.lock:
+            capacity = self.maxsize
+            if self.max_bytes is not None and self._cache:
+                average = self.total_bytes / len(self._cache)
+                if average > 0:
+                    by_bytes = int(self.max_bytes // average)
+                    capacity = min(capacity or by_bytes, by_bytes)
+            if capacity is None:
+                capacity = 10
+            return max(capacity - reserve, 0)
+
+    def stats(self):
+        """Returns a dict with usage and hit/miss/eviction counters."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "nbytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _is_over_budget(self):
+        if self.maxsize is not None and len(self._cache) > self.maxsize:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
@@ -1,11 +1,9 @@
 import os
 import pathlib
 import yaml
-import urllib.request
 import time
 import multiprocessing
 from urllib.parse import urlparse
-from urllib.error import URLError
 
 import ssl
 
@@ -22,10 +20,13 @@ from abc import abstractmethod
 from PyQt5.QtCore import QCoreApplication, QFile, QObject
 from PyQt5.QtGui import QImage
 
+from .model_downloader import DownloadError, download_file
+from .model_manifest import MANIFEST_FILE, ModelManifest
 from .types import AutoLabelingResult
 from anylabeling.config import get_config
 from anylabeling.views.labeling.logger import logger
 from anylabeling.views.labeling.label_file import LabelFile, LabelFileError
+from anylabeling.views.labeling.utils.opencv import qt_img_to_rgb_cv_img
 
 
 def _check_onnx_model_worker(model_path):
@@ -136,17 +137,23 @@ class Model(QObject):
             logger.error(f"An error occurred during data migration: {str(e)}")
             return False
 
-    def download_with_retry(self, url, dest_path, progress_callback):
-        """Download file with retry mechanism"""
+    def download_with_retry(
+        self, url, dest_path, progress_callback, sha256=None
+    ):
+        """
+        Download file with retry mechanism. Each retry resumes the chunks
+        that were not downloaded yet. Returns the sha256 of the file.
+        """
         for attempt in range(self.MAX_RETRIES):
             try:
                 if attempt > 0:
                     logger.warning(
                         f"Retry attempt {attempt + 1}/{self.MAX_RETRIES}"
                     )
-                urllib.request.urlretrieve(url, dest_path, progress_callback)
-                return True
-            except URLError as e:
+                return download_file(
+                    url, dest_path, progress_callback, sha256=sha256
+                )
+            except (OSError, DownloadError) as e:
                 delay = self.RETRY_DELAY * (attempt + 1)
                 if attempt < self.MAX_RETRIES - 1:
                     error_msg = f"Connection failed, retrying in {delay}s... (Attempt {attempt + 1}/{self.MAX_RETRIES} failed)"
@@ -217,24 +224,10 @@ class Model(QObject):
                 filename,
             )
         )
-        if os.path.exists(model_abs_path):
-            if model_abs_path.lower().endswith(".onnx"):
-                logger.info("Validating ONNX model integrity...")
-                ok = safe_check_onnx_model(model_abs_path)
-                if ok:
-                    return model_abs_path
-                else:
-                    logger.warning(
-                        f"ONNX model validation failed: {model_abs_path}. Deleting and redownloading..."
-                    )
-                    try:
-                        os.remove(model_abs_path)
-                        time.sleep(1)
-                    except Exception as e2:  # noqa
-                        logger.error(f"Could not delete: {str(e2)}")
-            else:
-                logger.info("Model file exists, no integrity check needed.")
-                return model_abs_path
+        # Size, mtime and sha256 of downloaded files, next to the models
+        manifest = ModelManifest(os.path.join(model_path, MANIFEST_FILE))
+        if self.validate_downloaded_model(manifest, model_abs_path):
+            return model_abs_path
         pathlib.Path(model_abs_path).parent.mkdir(parents=True, exist_ok=True)
 
         # Download url
@@ -268,9 +261,15 @@ class Model(QObject):
 
         logger.info(f"Downloading {download_url} to {model_abs_path}")
         try:
-
-            def _progress(count, block_size, total_size):
-                percent = int(count * block_size * 100 / total_size)
+            last_percent = [None]
+
+            def _progress(downloaded, total_size):
+                if total_size <= 0:
+                    return
+                percent = int(downloaded * 100 / total_size)
+                if percent == last_percent[0]:
+                    return
+                last_percent[0] = percent
                 self.on_message(
                     QCoreApplication.translate(
                         "Model", "Downloading {download_url}: {percent}%"
@@ -279,7 +278,13 @@ class Model(QObject):
                     )
                 )
 
-            self.download_with_retry(download_url, model_abs_path, _progress)
+            sha256 = self.download_with_retry(
+                download_url,
+                model_abs_path,
+                _progress,
+                model_config.get(f"{model_path_field_name}_sha256"),
+            )
+            manifest.record(model_abs_path, sha256)
 
         except Exception as e:  # noqa
             logger.error(
@@ -291,6 +296,36 @@ class Model(QObject):
 
         return model_abs_path
 
+    @staticmethod
+    def validate_downloaded_model(manifest, model_abs_path):
+        """
+        Check whether a downloaded model file can be used. Files that match
+        the manifest are used as they are, other ONNX files are validated
+        and recorded in the manifest, or deleted if they are broken.
+        """
+        if not os.path.exists(model_abs_path):
+            return False
+        if manifest.is_valid(model_abs_path):
+            logger.info("Model file matches the manifest.")
+            return True
+        if not model_abs_path.lower().endswith(".onnx"):
+            logger.info("Model file exists, no integrity check needed.")
+            return True
+        logger.info("Validating ONNX model integrity...")
+        if safe_check_onnx_model(model_abs_path):
+            manifest.record(model_abs_path)
+            return True
+        logger.warning(
+            f"ONNX model validation failed: {model_abs_path}. Deleting and redownloading..."
+        )
+        manifest.remove(model_abs_path)
+        try:
+            os.remove(model_abs_path)
+            time.sleep(1)
+        except Exception as e2:  # noqa
+            logger.error(f"Could not delete: {str(e2)}")
+        return False
+
     def check_missing_config(self, config_names, config):
         """
         Check if config has all required config names
@@ -306,6 +341,22 @@ class Model(QObject):
         """
         raise NotImplementedError
 
+    def get_batch_size(self):
+        """
+        Get the number of images predict_shapes_batch runs in one call
+        """
+        return 1
+
+    def predict_shapes_batch(self, images, filenames):
+        """
+        Predict shapes for several images. Models that support batched
+        inference override this, the default predicts one image at a time.
+        """
+        return [
+            self.predict_shapes(image, filename)
+            for image, filename in zip(images, filenames)
+        ]
+
     @abstractmethod
     def unload(self):
         """
@@ -322,7 +373,7 @@ class Model(QObject):
                 label_file = LabelFile(label_file)
             except LabelFileError as e:
                 logger.error("Error reading {}: {}".format(label_file, e))
-                return None, None
+                return None
             image_data = label_file.image_data
         else:
             image_data = LabelFile.load_image_file(filename)
@@ -331,6 +382,26 @@ class Model(QObject):
             logger.error("Error reading {}".format(filename))
         return image
 
+    @staticmethod
+    def load_cv_image_from_filename(filename):
+        """Load an 8bit RGB image for preloading.
+
+        The image is taken from the decoded image cache shared with
+        `predict_shapes`, so a preloaded image is not decoded again when
+        it is labeled. Images that only exist as `imageData` embedded in
+        a label file fall back to `load_image_from_filename`.
+        """
+        if os.path.exists(filename):
+            try:
+                return qt_img_to_rgb_cv_img(None, filename)
+            except Exception as e:  # noqa
+                logger.error("Error reading {}: {}".format(filename, e))
+                return None
+        image = Model.load_image_from_filename(filename)
+        if image is None or image.isNull():
+            return None
+        return qt_img_to_rgb_cv_img(image)
+
     def on_next_files_changed(self, next_files):
         """
         Handle next files changed. This function can preload next files
@@ -0,0 +1,233 @@
+"""Resumable, chunked downloads of model files."""
+
+import os
+import re
+import json
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .model_manifest import file_sha256
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_NUM_WORKERS = 4
+
+_BLOCK_SIZE = 64 * 1024
+_CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+
+
+class DownloadError(Exception):
+    pass
+
+
+def download_file(
+    url,
+    dest_path,
+    progress_callback=None,
+    sha256=None,
+    num_workers=DEFAULT_NUM_WORKERS,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    timeout=None,
+):
+    """Download `url` to `dest_path` and return the sha256 of the file.
+
+    The data is written to `dest_path + ".part"` and moved into place only
+    once it is complete and, if `sha256` is given, matches the checksum, so
+    an interrupted download never leaves a truncated file at `dest_path`.
+    When the server supports HTTP Range requests the file is fetched in
+    chunks of `chunk_size` bytes by `num_workers` threads, and the finished
+    chunks are tracked in `dest_path + ".part.json"`, so calling this again
+    after a failure only downloads the missing chunks.
+
+    `progress_callback(downloaded, total)` is called as data arrives, with
+    a total of 0 when the server does not report the size.
+    """
+    part_file = f"{dest_path}.part"
+    state_file = f"{part_file}.json"
+    progress = _Progress(progress_callback)
+
+    request = urllib.request.Request(url, headers={"Range": "bytes=0-0"})
+    response = _urlopen(request, timeout)
+    with response:
+        total = _get_ranged_size(response)
+        etag = response.headers.get("ETag")
+        if total is None:
+            # No range support, the probe response is the whole file
+            _remove(state_file)
+            total = int(response.headers.get("Content-Length") or 0)
+            progress.total = total
+            _download_stream(response, part_file, progress)
+            ranged = False
+        else:
+            ranged = True
+    if ranged:
+        progress.total = total
+        _download_chunks(
+            url,
+            part_file,
+            state_file,
+            total,
+            etag,
+            progress,
+            num_workers,
+            chunk_size,
+            timeout,
+        )
+
+    if total and os.path.getsize(part_file) != total:
+        _remove(part_file)
+        _remove(state_file)
+        raise DownloadError(
+            f"Downloaded {os.path.getsize(part_file)} of {total} bytes"
+        )
+    digest = file_sha256(part_file)
+    if sha256 and digest.lower() != sha256.lower():
+        _remove(part_file)
+        _remove(state_file)
+        raise DownloadError(
+            f"Checksum mismatch for {url}: expected {sha256}, got {digest}"
+        )
+    os.replace(part_file, dest_path)
+    _remove(state_file)
+    return digest
+
+
+class _Progress:
+    def __init__(self, callback):
+        self.callback = callback
+        self.total = None
+        self.downloaded = 0
+        self.lock = threading.Lock()
+
+    def update(self, size):
+        with self.lock:
+            self.downloaded += size
+            if self.callback is not None:
+                self.callback(self.downloaded, self.total or 0)
+
+
+def _urlopen(request, timeout):
+    if timeout is None:
+        return urllib.request.urlopen(request)
+    return urllib.request.urlopen(request, timeout=timeout)
+
+
+def _get_ranged_size(response):
+    """Total size from a 206 response, or None if ranges are not supported"""
+    if response.status != 206:
+        return None
+    match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _download_stream(response, part_file, progress):
+    with open(part_file, "wb") as f:
+        for block in iter(lambda: response.read(_BLOCK_SIZE), b""):
+            f.write(block)
+            progress.update(len(block))
+
+
+def _download_chunks(
+    url,
+    part_file,
+    state_file,
+    total,
+    etag,
+    progress,
+    num_workers,
+    chunk_size,
+    timeout,
+):
+    state = {
+        "url": url,
+        "size": total,
+        "etag": etag,
+        "chunk_size": chunk_size,
+        "done": [],
+    }
+    saved = _load_state(state_file)
+    resumable = all(saved.get(k) == v for k, v in state.items() if k != "done")
+    if (
+        resumable
+        and os.path.isfile(part_file)
+        and os.path.getsize(part_file) == total
+    ):
+        # Chunks written after the last state update are fetched again
+        state["done"] = list(saved.get("done", []))
+    else:
+        with open(part_file, "wb") as f:
+            f.truncate(total)
+        _save_state(state_file, state)
+
+    num_chunks = (total + chunk_size - 1) // chunk_size
+    done = set(state["done"])
+    for index in done:
+        progress.downloaded += min(chunk_size, total - index * chunk_size)
+    pending = [i for i in range(num_chunks) if i not in done]
+    if not pending:
+        return
+
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def fetch(index):
+        start = index * chunk_size
+        end = min(start + chunk_size, total) - 1
+        request = urllib.request.Request(
+            url, headers={"Range": f"bytes={start}-{end}"}
+        )
+        remaining = end - start + 1
+        with _urlopen(request, timeout) as response:
+            if response.status != 206:
+                raise DownloadError(f"Server ignored the range of {url}")
+            with open(part_file, "r+b") as f:
+                f.seek(start)
+                while remaining > 0 and not stop.is_set():
+                    block = response.read(min(_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    f.write(block)
+                    remaining -= len(block)
+                    progress.update(len(block))
+        if remaining > 0:
+            raise DownloadError(
+                f"Connection closed with {remaining} bytes left of {url}"
+            )
+        with lock:
+            state["done"].append(index)
+            _save_state(state_file, state)
+
+    workers = max(1, min(num_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch, index) for index in pending]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _load_state(state_file):
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _save_state(state_file, state):
+    temp_file = f"{state_file}.tmp"
+    with open(temp_file, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(temp_file, state_file)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
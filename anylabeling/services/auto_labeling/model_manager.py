@@ -311,6 +311,37 @@ class ModelManager(QObject):
         )
         self.model_download_thread.start()
 
+    def load_model_blocking(self, model):
+        """Load a model on the calling thread and return its config.
+
+        `model` is either the path of a model config file or the name of
+        a built-in model, e.g. `yolov8n` or `yolov8n-r20230520`. Used
+        where there is no event loop, e.g. the CLI. Returns None if the
+        model could not be loaded.
+        """
+        if os.path.isfile(model):
+            model = os.path.normpath(os.path.abspath(model))
+
+        model_id = None
+        for i, model_config in enumerate(self.model_configs):
+            config_file = model_config["config_file"]
+            config_name = os.path.splitext(os.path.basename(config_file))[0]
+            if model in (config_file, config_name, model_config["name"]):
+                model_id = i
+                break
+        if model_id is None:
+            if not os.path.isfile(model):
+                logger.error(f"Model not found: {model}")
+                return None
+            with open(model, "r", encoding="utf-8") as f:
+                model_config = yaml.safe_load(f)
+            model_config["config_file"] = model
+            model_config["is_custom_model"] = True
+            self.model_configs.append(model_config)
+            model_id = len(self.model_configs) - 1
+
+        return self._load_model(model_id)
+
     def _load_model(self, model_id):  # noqa: C901
         """Load and return model info"""
         if self.loaded_model_config is not None:
@@ -2072,6 +2103,34 @@ class ModelManager(QObject):
 
         self.prediction_finished.emit()
 
+    def get_batch_size(self):
+        """Get the batch size supported by the loaded model"""
+        if self.loaded_model_config is None:
+            return 1
+        return self.loaded_model_config["model"].get_batch_size()
+
+    def predict_shapes_batch(self, images, filenames):
+        """Predict shapes for several images in one call.
+        NOTE: This function is blocking and only used for batch processing.
+        """
+        if self.loaded_model_config is None:
+            self.new_model_status.emit(
+                self.tr("Model is not loaded. Choose a mode to continue.")
+            )
+            return [None] * len(filenames)
+
+        try:
+            return self.loaded_model_config["model"].predict_shapes_batch(
+                images, filenames
+            )
+        except Exception as e:  # noqa
+            logger.error(f"Error in predict_shapes_batch: {e}")
+            template = "Error in model prediction: {error_message}"
+            translated_template = self.tr(template)
+            error_text = translated_template.format(error_message=str(e))
+            self.new_model_status.emit(error_text)
+            return [None] * len(filenames)
+
     @pyqtSlot()
     def predict_shapes_threading(
         self,
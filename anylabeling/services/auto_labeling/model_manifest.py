@@ -0,0 +1,103 @@
+"""Manifest of downloaded model files, used to skip integrity checks."""
+
+import os
+import json
+import hashlib
+import threading
+
+from anylabeling.views.labeling.logger import logger
+
+MANIFEST_FILE = "models_manifest.json"
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Shared by all manifests, models load from several threads
+_manifest_lock = threading.Lock()
+
+
+class ModelManifest:
+    """Size, mtime and sha256 of model files, stored in a JSON file.
+
+    A file is recorded once after it is downloaded or checked. Later loads
+    compare its size and mtime to the manifest, which is O(1), and only a
+    file whose size or mtime changed needs a full check again. A file
+    whose mtime changed but whose sha256 still matches (e.g. it was
+    copied back in place) is accepted without a full check.
+    """
+
+    def __init__(self, manifest_file):
+        self.manifest_file = manifest_file
+
+    def is_valid(self, path):
+        """Check whether the file is unchanged since it was recorded"""
+        path = os.path.abspath(path)
+        with _manifest_lock:
+            entry = self._load().get(path)
+        if entry is None:
+            return False
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != entry["size"]:
+            return False
+        if stat.st_mtime_ns == entry["mtime_ns"]:
+            return True
+        if file_sha256(path) != entry["sha256"]:
+            return False
+        self._update(path, dict(entry, mtime_ns=stat.st_mtime_ns))
+        return True
+
+    def record(self, path, sha256=None):
+        """
+        Record the current size, mtime and sha256 of the file, `sha256`
+        skips hashing a file whose checksum is already known.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256 or file_sha256(path),
+        }
+        self._update(path, entry)
+        return entry
+
+    def remove(self, path):
+        self._update(os.path.abspath(path), None)
+
+    def _load(self):
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _update(self, path, entry):
+        with _manifest_lock:
+            manifest = self._load()
+            if entry is None:
+                if manifest.pop(path, None) is None:
+                    return
+            else:
+                manifest[path] = entry
+            temp_file = f"{self.manifest_file}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(temp_file, self.manifest_file)
+            except OSError as e:
+                logger.warning(
+                    f"Could not update model manifest "
+                    f"{self.manifest_file}: {e}"
+                )
+
+
+def file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
@@ -153,8 +153,9 @@ class OpenVision(Model):
 
         # Cache for image embedding
         self.cache_size = 1
-        self.preloaded_size = 1
-        self.image_embedding_cache = LRUCache(self.cache_size)
+        self.image_embedding_cache = LRUCache.from_config(
+            self.config, self.cache_size
+        )
 
         # Pre-inference worker
         self.pre_inference_thread = None
@@ -472,16 +473,15 @@ class OpenVision(Model):
         """
         Preload next files, run inference and cache results
         """
-        files = files[: self.preloaded_size]
+        files = files[: self.image_embedding_cache.capacity()]
         for filename in files:
             if self.image_embedding_cache.find(filename):
                 continue
-            image = self.load_image_from_filename(filename)
-            if image is None:
+            cv_image = self.load_cv_image_from_filename(filename)
+            if cv_image is None:
                 continue
             if self.stop_inference:
                 return
-            cv_image = qt_img_to_rgb_cv_img(image)
             image_embedding = self.model.encode(cv_image)
             self.image_embedding_cache.put(
                 filename,
@@ -21,9 +21,12 @@ class RTMO:
         std: tuple = None,
         backend: str = "onnxruntime",
         device: str = "cpu",
+        session_config: dict = None,
     ):
         super().__init__()
-        self.net = OnnxBaseModel(onnx_model, device_type=device)
+        self.net = OnnxBaseModel(
+            onnx_model, device_type=device, session_config=session_config
+        )
         self.model_input_size = self.net.get_input_shape()[-2:]
         if not isinstance(self.model_input_size[0], int):
             self.model_input_size = model_input_size
@@ -44,7 +44,11 @@ class PULC_Attribute(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.label = self.config["classes"]
         self.attributes = self.config["attributes"]
         self.input_shape = self.net.get_input_shape()[-2:][::-1]
@@ -51,7 +51,11 @@ class RFDETR(Model):
                     f"Could not download or initialize {self.model_type} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.classes = self.config["classes"]
 
         _, _, input_height, input_width = self.net.get_input_shape()
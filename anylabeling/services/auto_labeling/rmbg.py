@@ -43,7 +43,11 @@ class RMBG(Model):
                 )
             )
         self.model_path = model_abs_path
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.device = "cuda" if __preferred_device__ == "GPU" else "cpu"
         self.model_version = float(self.config.get("version", 1.4))
         assert self.model_version in [
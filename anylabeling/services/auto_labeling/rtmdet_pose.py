@@ -60,9 +60,14 @@ class RTMDet_Pose(Model):
             det_model_abs_path,
             score_thr=self.score_thr,
             device=__preferred_device__,
+            session_config=self.config.get("session"),
         )
         if self.config["pose"] == "rtmo":
-            self.pose = RTMO(pose_model_abs_path, device=__preferred_device__)
+            self.pose = RTMO(
+                pose_model_abs_path,
+                device=__preferred_device__,
+                session_config=self.config.get("session"),
+            )
         else:
             self.pose = None
 
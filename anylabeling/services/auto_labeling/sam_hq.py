@@ -20,7 +20,7 @@ from anylabeling.views.labeling.utils.opencv import (
 )
 from anylabeling.services.auto_labeling.utils import calculate_rotation_theta
 
-from .lru_cache import LRUCache
+from .embedding_cache import EmbeddingCache
 from .model import Model
 from .types import AutoLabelingResult
 from .__base__.clip import ChineseClipONNX
@@ -335,8 +335,9 @@ class SAM_HQ(Model):
 
         # Cache for image embedding
         self.cache_size = 10
-        self.preloaded_size = self.cache_size - 3
-        self.image_embedding_cache = LRUCache(self.cache_size)
+        self.image_embedding_cache = EmbeddingCache.from_config(
+            self.config, self.cache_size
+        )
 
         # Pre-inference worker
         self.pre_inference_thread = None
@@ -363,8 +364,13 @@ class SAM_HQ(Model):
                     clip_img_model_path,
                     model_arch,
                     device=__preferred_device__,
+                    session_config=self.config.get("session"),
                 )
             self.classes = self.config.get("classes", [])
+            if self.clip_net is not None and self.classes:
+                # Encode the class prompts once at load time, the features
+                # are cached and reused for every object
+                self.clip_net.txt_pipeline(self.classes)
 
         self.epsilon = 0.001
 
@@ -523,16 +529,15 @@ class SAM_HQ(Model):
         """
         Preload next files, run inference and cache results
         """
-        files = files[: self.preloaded_size]
+        files = files[: self.image_embedding_cache.capacity(reserve=3)]
         for filename in files:
             if self.image_embedding_cache.find(filename):
                 continue
-            image = self.load_image_from_filename(filename)
-            if image is None:
+            cv_image = self.load_cv_image_from_filename(filename)
+            if cv_image is None:
                 continue
             if self.stop_inference:
                 return
-            cv_image = qt_img_to_rgb_cv_img(image)
             image_embedding = self.model.encode(cv_image)
             self.image_embedding_cache.put(
                 filename,
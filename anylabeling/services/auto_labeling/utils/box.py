@@ -37,16 +37,157 @@ def numpy_nms(boxes, scores, iou_threshold):
     return keep
 
 
-def numpy_nms_rotated(boxes, scores, iou_threshold):
+# Upper bound on the number of box pairs looked at per block in
+# numpy_nms_rotated, keeps its temporaries at a few MB
+NMS_ROTATED_BLOCK_PAIRS = 1 << 18
+
+
+def numpy_nms_rotated(boxes, scores, iou_threshold, eps=1e-7):
+    """
+    Rotated NMS on xywhr boxes, returns the kept indices by descending score.
+
+    As with the full pairwise probiou matrix, a box is dropped when any
+    higher scoring box overlaps it by iou_threshold or more. Only pairs
+    whose bounding circles can reach that overlap get their probiou
+    computed: boxes are swept in order of their center x, so each box is
+    paired with the boxes in a strip around it, in blocks of at most
+    NMS_ROTATED_BLOCK_PAIRS pairs.
+    """
     if len(boxes) == 0:
         return np.empty((0,), dtype=np.int8)
 
     sorted_idx = np.argsort(scores)[::-1]
     boxes = boxes[sorted_idx]
-    ious = batch_probiou(boxes, boxes)
-    ious = np.triu(ious, k=1)
-    pick = np.nonzero(np.max(ious, axis=0) < iou_threshold)[0]
-    return sorted_idx[pick]
+    num_boxes = len(boxes)
+    centers = boxes[:, :2]
+    covariances = [c[:, 0] for c in _get_covariance_matrix(boxes)]
+    radii = _probiou_radius(boxes, covariances, iou_threshold, eps)
+
+    # Boxes of unbounded reach are paired with every box
+    unbounded = np.nonzero(np.isinf(radii))[0]
+    bounded = np.isfinite(radii)
+    max_radius = radii[bounded].max() if bounded.any() else 0.0
+    x_order = np.argsort(centers[:, 0], kind="stable")
+    x_sorted = centers[x_order, 0]
+    reach = np.where(bounded, radii + max_radius, np.inf)
+    lo = np.searchsorted(x_sorted, centers[:, 0] - reach, side="left")
+    hi = np.searchsorted(x_sorted, centers[:, 0] + reach, side="right")
+    bounds = np.cumsum(hi - lo + np.where(bounded, len(unbounded), 0))
+
+    keep = np.ones(num_boxes, dtype=bool)
+    start = 1
+    while start < num_boxes:
+        end = np.searchsorted(
+            bounds, bounds[start - 1] + NMS_ROTATED_BLOCK_PAIRS, side="right"
+        )
+        end = min(max(end, start + 1), num_boxes)
+        block = np.arange(start, end)
+        counts = hi[block] - lo[block]
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        rows = np.repeat(block, counts)
+        cols = x_order[np.repeat(lo[block], counts) + offsets]
+        if len(unbounded):
+            extra_rows = block[bounded[block]]
+            rows = np.concatenate(
+                (rows, np.repeat(extra_rows, len(unbounded)))
+            )
+            cols = np.concatenate((cols, np.tile(unbounded, len(extra_rows))))
+        # Pairs of a box with a higher scoring box in reach
+        candidates = (cols < rows) & (
+            np.sum(np.square(centers[rows] - centers[cols]), axis=-1)
+            <= np.square(radii[rows] + radii[cols])
+        )
+        rows, cols = rows[candidates], cols[candidates]
+        if len(rows):
+            ious = _pairwise_probiou(centers, covariances, cols, rows, eps)
+            keep[rows[ious >= iou_threshold]] = False
+        start = end
+    return sorted_idx[np.nonzero(keep)[0]]
+
+
+def batched_nms_rotated(boxes, scores, idxs, iou_threshold):
+    """
+    Rotated NMS run separately for every category in `idxs`, returns the
+    kept indices by descending score.
+    """
+    if len(boxes) == 0:
+        return np.empty((0,), dtype=np.int8)
+
+    keep = []
+    for category in np.unique(idxs):
+        indices = np.nonzero(idxs == category)[0]
+        keep.append(
+            indices[
+                numpy_nms_rotated(
+                    boxes[indices], scores[indices], iou_threshold
+                )
+            ]
+        )
+    keep = np.concatenate(keep)
+    return keep[np.argsort(scores[keep], kind="stable")[::-1]]
+
+
+def _probiou_radius(boxes, covariances, iou_threshold, eps=1e-7):
+    """
+    Radius around each box center such that two boxes whose circles do
+    not intersect have a probiou below iou_threshold.
+
+    The Bhattacharyya distance is at least 3 * d^2 / (m1^2 + m2^2) for
+    centers d apart and longest sides m1 and m2, up to the eps terms,
+    which only matter for boxes with an almost singular covariance. Those
+    get an infinite radius, so they are always compared.
+    """
+    # Largest Bhattacharyya distance that reaches iou_threshold
+    max_bd = -np.log(max(1.0 + eps - (1.0 - iou_threshold) ** 2, eps))
+    max_bd = max_bd * 1.01 + 1e-3
+    a, b, c = covariances
+    radii = np.max(boxes[:, 2:4], axis=1) * np.sqrt(max_bd / 3)
+    radii[a * b - c**2 < 1e-4] = np.inf
+    return radii
+
+
+def _pairwise_probiou(centers, covariances, idx1, idx2, eps=1e-7):
+    """
+    probiou of the box pairs (idx1[k], idx2[k]), with the same arithmetic
+    as batch_probiou so results match its matrix entries.
+    """
+    x1, y1 = centers[idx1, 0], centers[idx1, 1]
+    x2, y2 = centers[idx2, 0], centers[idx2, 1]
+    a1, b1, c1 = (x[idx1] for x in covariances)
+    a2, b2, c2 = (x[idx2] for x in covariances)
+    t1 = (
+        (
+            (a1 + a2) * (np.power(y1 - y2, 2))
+            + (b1 + b2) * (np.power(x1 - x2, 2))
+        )
+        / ((a1 + a2) * (b1 + b2) - (np.power(c1 + c2, 2)) + eps)
+    ) * 0.25
+    t2 = (
+        ((c1 + c2) * (x2 - x1) * (y1 - y2))
+        / ((a1 + a2) * (b1 + b2) - (np.power(c1 + c2, 2)) + eps)
+    ) * 0.5
+
+    t3 = (
+        np.log(
+            ((a1 + a2) * (b1 + b2) - (np.power(c1 + c2, 2)))
+            / (
+                4
+                * np.sqrt(
+                    (a1 * b1 - np.power(c1, 2)).clip(0)
+                    * (a2 * b2 - np.power(c2, 2)).clip(0)
+                )
+                + eps
+            )
+            + eps
+        )
+        * 0.5
+    )
+    bd = t1 + t2 + t3
+    bd = np.clip(bd, eps, 100.0)
+    hd = np.sqrt(1.0 - np.exp(-bd) + eps)
+    return 1 - hd
 
 
 def batch_probiou(obb1, obb2, eps=1e-7):
@@ -367,10 +508,8 @@ def non_max_suppression_v8(
         c = x[:, 5:6] * (0 if agnostic else max_wh)
         scores = x[:, 4]
         if task == "obb":
-            boxes = np.concatenate(
-                (x[:, :2] + c, x[:, 2:4], x[:, -1:]), axis=-1
-            )  # xywhr
-            i = numpy_nms_rotated(boxes, scores, iou_thres)
+            boxes = np.concatenate((x[:, :4], x[:, -1:]), axis=-1)  # xywhr
+            i = batched_nms_rotated(boxes, scores, c[:, 0], iou_thres)
         else:
             boxes = x[:, :4] + c
             i = numpy_nms(boxes, scores, iou_thres)
@@ -563,6 +563,39 @@ def masks2segments(masks, epsilon_factor=0):
     return segments
 
 
+def roi_masks2segments(masks, shape, epsilon_factor=0):
+    """
+    Like masks2segments, for masks given as regions of interest of an image
+
+    Args:
+      masks (List[Tuple[np.ndarray, Tuple[int, int]]]):
+        uint8 masks with the (x, y) offset of their region in the image
+      shape (tuple): the (height, width) of the image
+      epsilon_factor (float, optional):
+        Factor used for epsilon calculation in contour approximation.
+
+    Returns:
+      segments (List): list of segments in image coordinates
+    """
+    segments = []
+    img_area = shape[0] * shape[1]
+    for x, offset in masks:
+        if not x.size:
+            segments.append(np.zeros((0, 2), dtype="float32"))
+            continue
+        c = cv2.findContours(
+            x, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=offset
+        )[0]
+        c = refine_contours(c, img_area, epsilon_factor)
+        if c:
+            c = np.array([c[0] for c in c[0]])
+            c = np.concatenate([c, [c[0]]])  # Close the contour
+        else:
+            c = np.zeros((0, 2))  # no segments found
+        segments.append(c.astype("float32"))
+    return segments
+
+
 def tlwh_to_xyxy(x):
     """ " Convert tlwh to xyxy"""
     x1 = x[0]
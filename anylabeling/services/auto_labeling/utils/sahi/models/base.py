@@ -114,6 +114,24 @@ class DetectionModel:
         """
         raise NotImplementedError()
 
+    def perform_batch_inference(self, images: List[np.ndarray], executor=None):
+        """
+        Performs prediction for several images, e.g. all slices of an
+        image, and sets self._original_predictions to one prediction per
+        image. Models that can run several images in one call should
+        override this.
+        Args:
+            images: list of np.ndarray
+                Images to be predicted.
+            executor: concurrent.futures.Executor
+                Optional pool used to preprocess the images in parallel.
+        """
+        original_predictions = []
+        for image in images:
+            self.perform_inference(image)
+            original_predictions.extend(self._original_predictions)
+        self._original_predictions = original_predictions
+
     def _create_object_prediction_list_from_original_predictions(
         self,
         shift_amount_list: Optional[List[List[int]]] = [[0, 0]],
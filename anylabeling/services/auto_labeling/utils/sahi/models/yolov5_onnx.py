@@ -23,9 +23,16 @@ from anylabeling.views.labeling.logger import logger
 
 class Yolov5ONNX(object):
     def __init__(
-        self, model_path: str, device: str, conf_thres: float, nms_thres: float
+        self,
+        model_path: str,
+        device: str,
+        conf_thres: float,
+        nms_thres: float,
+        session_config: dict = None,
     ):
-        self.net = OnnxBaseModel(model_path, device)
+        self.net = OnnxBaseModel(
+            model_path, device, session_config=session_config
+        )
         self.conf_thres = conf_thres
         self.nms_thres = nms_thres
 
@@ -123,6 +130,15 @@ class Yolov5ONNX(object):
 
 
 class Yolov5OnnxDetectionModel(DetectionModel):
+    def __init__(self, *args, session_config: dict = None, **kwargs):
+        """
+        Args:
+            session_config: dict
+                ONNX Runtime session options, see OnnxBaseModel.
+        """
+        self.session_config = session_config
+        super().__init__(*args, **kwargs)
+
     def check_dependencies(self) -> None:
         check_requirements(["onnxruntime"])
 
@@ -139,6 +155,7 @@ class Yolov5OnnxDetectionModel(DetectionModel):
             device=self.device,
             conf_thres=self.conf_thres,
             nms_thres=self.nms_thres,
+            session_config=self.session_config,
         )
 
         # set category list
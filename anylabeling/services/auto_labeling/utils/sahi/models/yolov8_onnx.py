@@ -1,3 +1,5 @@
+from functools import partial
+
 import cv2
 import numpy as np
 from typing import List, Optional
@@ -23,12 +25,32 @@ from anylabeling.views.labeling.logger import logger
 
 class Yolov8ONNX(object):
     def __init__(
-        self, model_path: str, device: str, conf_thres: float, nms_thres: float
+        self,
+        model_path: str,
+        device: str,
+        conf_thres: float,
+        nms_thres: float,
+        batch_size: int = 8,
+        session_config: dict = None,
     ):
-        self.net = OnnxBaseModel(model_path, device)
+        self.net = OnnxBaseModel(
+            model_path, device, session_config=session_config
+        )
         self.conf_thres = conf_thres
         self.nms_thres = nms_thres
 
+        # Images per ORT call in `batch_inference`. A model exported with a
+        # fixed batch dimension > 1 gets its last batch padded.
+        input_shape = self.net.get_input_shape()
+        batch_dim, _, self.input_height, self.input_width = input_shape
+        self.fixed_batch_size = None
+        if not isinstance(batch_dim, int):
+            self.batch_size = max(int(batch_size), 1)
+        elif batch_dim > 1:
+            self.batch_size = self.fixed_batch_size = batch_dim
+        else:
+            self.batch_size = 1
+
     def inference(self, image):
         blob, img_size = self.preprocess(image)
         outputs = self.net.get_ort_inference(blob)
@@ -54,71 +76,118 @@ class Yolov8ONNX(object):
 
         return blob, input_image.shape[:2]
 
+    def batch_inference(self, images, executor=None):
+        """
+        Run the network on several images, `batch_size` images per call.
+        Images may be non-contiguous views, e.g. slices of a larger image,
+        and are resized straight into a preallocated float32 blob, in
+        parallel when an `executor` is given.
+        """
+        results = []
+        for start in range(0, len(images), self.batch_size):
+            chunk = images[start : start + self.batch_size]
+            blob = np.zeros(
+                (
+                    self.fixed_batch_size or len(chunk),
+                    3,
+                    self.input_height,
+                    self.input_width,
+                ),
+                dtype=np.float32,
+            )
+            if executor is None:
+                for index in range(len(chunk)):
+                    self._fill(chunk, blob, index)
+            else:
+                fill = partial(self._fill, chunk, blob)
+                list(executor.map(fill, range(len(chunk))))
+
+            outputs = self.net.get_ort_inference(blob)
+            for index, image in enumerate(chunk):
+                results.append(
+                    self.postprocess(
+                        outputs[index : index + 1], image.shape[:2]
+                    )
+                )
+        return results
+
+    def _fill(self, images, blob, index):
+        """Resize and normalize images[index] into blob[index]"""
+        input_img = cv2.resize(
+            images[index], (self.input_width, self.input_height)
+        )
+        # Dividing in float32 rounds to the same values as the float64
+        # division in preprocess
+        np.divide(
+            input_img.transpose(2, 0, 1), np.float32(255.0), out=blob[index]
+        )
+
     def postprocess(self, outputs, img_size):
         """
         Post-process the network's output, to get the bounding boxes and
         their confidence scores.
         """
-        outputs = np.transpose(outputs, (0, 2, 1))
-
-        # Lists to hold respective values while unwrapping.
-        _class_ids = []
-        _confidences = []
-        _boxes = []
-
-        # Rows.
-        rows = outputs.shape[1]
+        outputs = np.transpose(outputs, (0, 2, 1))[0]
 
         image_height, image_width = img_size
-        _, _, input_height, input_width = self.net.get_input_shape()
 
         # Resizing factor.
-        x_factor = image_width / input_width
-        y_factor = image_height / input_height
-
-        # Iterate through 8400 rows.
-        for r in range(rows):
-            row = outputs[0][r]
-            classes_scores = row[4:]
-
-            # Get the index of max class score and confidence.
-            _, confidence, _, (_, class_id) = cv2.minMaxLoc(classes_scores)
-
-            # Discard confidence lower than threshold
-            if confidence >= self.conf_thres:
-                _confidences.append(confidence)
-                _class_ids.append(class_id)
-
-                cx, cy, w, h = row[0], row[1], row[2], row[3]
-
-                left = int((cx - w / 2) * x_factor)
-                top = int((cy - h / 2) * y_factor)
-                width = int(w * x_factor)
-                height = int(h * y_factor)
-
-                box = np.array([left, top, width, height])
-                _boxes.append(box)
+        x_factor = image_width / self.input_width
+        y_factor = image_height / self.input_height
+
+        # Get the max class score and its index for every row at once and
+        # discard confidence lower than threshold.
+        classes_scores = outputs[:, 4:]
+        _class_ids = np.argmax(classes_scores, axis=1)
+        _confidences = classes_scores[
+            np.arange(len(classes_scores)), _class_ids
+        ]
+        mask = _confidences >= self.conf_thres
+        rows = outputs[mask]
+        _confidences = _confidences[mask]
+        _class_ids = _class_ids[mask]
+
+        # Corners in the model's precision, scaled in float64
+        cx, cy, w, h = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+        _boxes = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+        factors = np.array([x_factor, y_factor, x_factor, y_factor])
+        _boxes = (_boxes.astype(np.float64) * factors).astype(np.int64)
 
         # Perform non maximum suppression to eliminate redundant
         # overlapping boxes with lower confidences.
         indices = cv2.dnn.NMSBoxes(
-            _boxes,
-            _confidences,
+            _boxes.tolist(),
+            _confidences.tolist(),
             self.conf_thres,
             self.nms_thres,
         )
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)
 
-        bboxes, scores, class_ids = [], [], []
-        for i in indices:
-            _x, _y, _w, _h = _boxes[i]
-            bboxes.append([_x, _y, _x + _w, _y + _h])
-            scores.append(_confidences[i])
-            class_ids.append(_class_ids[i])
-
-        return np.array(bboxes), np.array(scores), np.array(class_ids)
+        bboxes = _boxes[indices]
+        bboxes[:, 2:] += bboxes[:, :2]
+        return bboxes, _confidences[indices], _class_ids[indices]
 
 
 class Yolov8OnnxDetectionModel(DetectionModel):
+    def __init__(
+        self,
+        *args,
+        batch_size: int = 8,
+        session_config: dict = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            batch_size: int
+                Images per inference call in perform_batch_inference, used
+                when the model has a dynamic batch dimension.
+            session_config: dict
+                ONNX Runtime session options, see OnnxBaseModel.
+        """
+        self.batch_size = batch_size
+        self.session_config = session_config
+        super().__init__(*args, **kwargs)
+
     def check_dependencies(self) -> None:
         check_requirements(["onnxruntime"])
 
@@ -135,6 +204,8 @@ class Yolov8OnnxDetectionModel(DetectionModel):
             device=self.device,
             conf_thres=self.conf_thres,
             nms_thres=self.nms_thres,
+            batch_size=self.batch_size,
+            session_config=self.session_config,
         )
 
         # set category list
@@ -160,6 +231,27 @@ class Yolov8OnnxDetectionModel(DetectionModel):
 
         self._original_predictions = [prediction_result]
 
+    def perform_batch_inference(self, images: List[np.ndarray], executor=None):
+        """
+        Prediction is performed for all images, several images per
+        inference call, and one prediction per image is set to
+        self._original_predictions.
+        Args:
+            images: list of np.ndarray
+                Images to be predicted, may be views into a larger image.
+            executor: concurrent.futures.Executor
+                Optional pool used to preprocess the images in parallel.
+        """
+
+        # Confirm model is loaded
+        assert (
+            self.model is not None
+        ), "Model is not loaded, load it by calling .load_model()"
+
+        self._original_predictions = self.model.batch_inference(
+            images, executor
+        )
+
     @property
     def num_categories(self):
         return self.category_name_list_len
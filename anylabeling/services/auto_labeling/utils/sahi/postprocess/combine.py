@@ -217,6 +217,73 @@ def greedy_nmm(
     return keep_to_merge_list
 
 
+def greedy_nmm_merge(
+    predictions, match_metric="IOU", match_threshold=0.5, class_agnostic=False
+):
+    """
+    Array counterpart of GreedyNMMPostprocess, for predictions that have
+    no masks. Gives the same boxes, scores and categories without building
+    an ObjectPrediction per raw prediction.
+
+    Args:
+        predictions: np.ndarray of size N x [x1, y1, x2, y2, score, category_id]
+    Returns:
+        np.ndarray of the merged predictions, in the same layout
+    """
+    predictions = np.asarray(predictions, dtype=np.float64)
+    if len(predictions) < 2:
+        return predictions
+
+    # Match in float32 like GreedyNMMPostprocess, so equal scores are
+    # ordered the same way
+    predictions_as_float32 = predictions.astype(np.float32)
+    if class_agnostic:
+        keep_to_merge_list = greedy_nmm(
+            predictions_as_float32,
+            match_threshold=match_threshold,
+            match_metric=match_metric,
+        )
+    else:
+        keep_to_merge_list = batched_greedy_nmm(
+            predictions_as_float32,
+            match_threshold=match_threshold,
+            match_metric=match_metric,
+        )
+
+    merged_predictions = np.empty((len(keep_to_merge_list), 6))
+    for ind, (keep_ind, merge_ind_list) in enumerate(
+        keep_to_merge_list.items()
+    ):
+        keep = predictions[keep_ind].copy()
+        # Only predictions still matching the growing kept box are merged
+        # into it, so this stays sequential
+        for merge in predictions[merge_ind_list]:
+            inter = np.prod(
+                (
+                    np.minimum(keep[2:4], merge[2:4])
+                    - np.maximum(keep[:2], merge[:2])
+                ).clip(min=0)
+            )
+            area1 = np.prod(keep[2:4] - keep[:2])
+            area2 = np.prod(merge[2:4] - merge[:2])
+            if match_metric == "IOU":
+                match_metric_value = inter / (area1 + area2 - inter)
+            elif match_metric == "IOS":
+                match_metric_value = inter / min(area1, area2)
+            else:
+                raise ValueError()
+            if not match_metric_value > match_threshold:
+                continue
+            if not keep[4] > merge[4]:
+                keep[5] = merge[5]
+            keep[:2] = np.minimum(keep[:2], merge[:2])
+            keep[2:4] = np.maximum(keep[2:4], merge[2:4])
+            keep[4] = max(keep[4], merge[4])
+        merged_predictions[ind] = keep
+
+    return merged_predictions
+
+
 def batched_nmm(
     object_predictions_as_tensor, match_metric="IOU", match_threshold=0.5
 ):
@@ -1,6 +1,7 @@
 # OBSS SAHI Tool
 # Code written by Fatih C Akyon, 2020.
 
+import concurrent.futures
 import logging
 import os
 import time
@@ -23,12 +24,16 @@ from anylabeling.services.auto_labeling.utils.sahi.postprocess.combine import (
     NMMPostprocess,
     NMSPostprocess,
     PostprocessPredictions,
+    greedy_nmm_merge,
 )
 from anylabeling.services.auto_labeling.utils.sahi.prediction import (
     ObjectPrediction,
     PredictionResult,
 )
-from anylabeling.services.auto_labeling.utils.sahi.slicing import slice_image
+from anylabeling.services.auto_labeling.utils.sahi.slicing import (
+    get_slice_bboxes,
+    slice_image,
+)
 from anylabeling.services.auto_labeling.utils.sahi.utils.coco import (
     Coco,
     CocoImage,
@@ -322,6 +327,188 @@ def get_sliced_prediction(
     )
 
 
+def get_batched_sliced_prediction(
+    image: np.ndarray,
+    detection_model: DetectionModel,
+    slice_height: int = None,
+    slice_width: int = None,
+    overlap_height_ratio: float = 0.2,
+    overlap_width_ratio: float = 0.2,
+    perform_standard_pred: bool = True,
+    postprocess_match_metric: str = "IOS",
+    postprocess_match_threshold: float = 0.5,
+    postprocess_class_agnostic: bool = False,
+    num_workers: Optional[int] = None,
+    verbose: int = 0,
+    auto_slice_resolution: bool = True,
+) -> PredictionResult:
+    """
+    Batched counterpart of get_sliced_prediction with GREEDYNMM merging.
+
+    Slices are numpy views into `image`, they are preprocessed in a thread
+    pool and handed to detection_model.perform_batch_inference all at once,
+    so models with a dynamic batch dimension see several slices per call.
+    Raw predictions are shifted, clipped and merged as arrays, and
+    ObjectPredictions are only built for the merged result. The model's
+    original predictions have to be (bboxes, scores, class_ids) per image,
+    as for the YOLO ONNX models.
+
+    Args:
+        image: np.ndarray
+            Numpy image matrix to slice, in the channel order of the model
+        detection_model: model.DetectionModel
+        slice_height: int
+            Height of each slice.  Defaults to ``None``.
+        slice_width: int
+            Width of each slice.  Defaults to ``None``.
+        overlap_height_ratio: float
+            Fractional overlap in height of each window. Default to ``0.2``.
+        overlap_width_ratio: float
+            Fractional overlap in width of each window. Default to ``0.2``.
+        perform_standard_pred: bool
+            Perform a standard prediction on top of sliced predictions to increase large object
+            detection accuracy. Default: True.
+        postprocess_match_metric: str
+            'IOU' for intersection over union, 'IOS' for intersection over smaller area.
+        postprocess_match_threshold: float
+            Sliced predictions having higher iou than postprocess_match_threshold will be
+            merged after sliced prediction.
+        postprocess_class_agnostic: bool
+            If True, postprocess will ignore category ids.
+        num_workers: int
+            Threads used for preprocessing, defaults to the executor default.
+        verbose: int
+            0: no print (default)
+            1: print number of slices
+            2: print number of slices and slice/prediction/postprocess durations
+        auto_slice_resolution: bool
+            if slice parameters (slice_height, slice_width) are not given,
+            it enables automatically calculate these params from image resolution and orientation.
+
+    Returns:
+        A PredictionResult with fields:
+            object_prediction_list: a list of sahi.prediction.ObjectPrediction
+            durations_in_seconds: a dict containing elapsed times for profiling
+            num_slices: the number of slices
+    """
+
+    # for profiling
+    durations_in_seconds = dict()
+    time_total = time.time()
+
+    # create slices from full image
+    time_start = time.time()
+    image_height, image_width = image.shape[:2]
+    slice_bboxes = get_slice_bboxes(
+        image_height=image_height,
+        image_width=image_width,
+        slice_height=slice_height,
+        slice_width=slice_width,
+        auto_slice_resolution=auto_slice_resolution,
+        overlap_height_ratio=overlap_height_ratio,
+        overlap_width_ratio=overlap_width_ratio,
+    )
+    num_slices = len(slice_bboxes)
+    images = [image[y1:y2, x1:x2] for x1, y1, x2, y2 in slice_bboxes]
+    shift_amounts = [[x1, y1] for x1, y1, _, _ in slice_bboxes]
+    # Slice boxes are clipped to the full image size in slice coordinates,
+    # like get_sliced_prediction does, the standard prediction is not
+    clip_maxes = [[image_width, image_height]] * num_slices
+    if num_slices > 1 and perform_standard_pred:
+        images.append(image)
+        shift_amounts.append([0, 0])
+        clip_maxes.append([np.inf, np.inf])
+    durations_in_seconds["slice"] = time.time() - time_start
+
+    if verbose == 1 or verbose == 2:
+        tqdm.write(f"Performing prediction on {num_slices} number of slices.")
+
+    # perform batched prediction
+    time_start = time.time()
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=num_workers
+    ) as executor:
+        detection_model.perform_batch_inference(images, executor=executor)
+    durations_in_seconds["prediction"] = time.time() - time_start
+
+    # shift, clip and merge predictions
+    time_start = time.time()
+    prediction_arrays = []
+    for (bboxes, scores, class_ids), shift_amount, clip_max in zip(
+        detection_model.original_predictions, shift_amounts, clip_maxes
+    ):
+        if len(scores) == 0:
+            continue
+        bboxes = np.asarray(bboxes).reshape(-1, 4).astype(np.int64)
+        bboxes = np.maximum(bboxes, 0).astype(np.float64)
+        bboxes = np.minimum(bboxes, clip_max * 2)
+        valid = (bboxes[:, 0] < bboxes[:, 2]) & (bboxes[:, 1] < bboxes[:, 3])
+        if not valid.all():
+            logger.warning(
+                f"ignoring {np.count_nonzero(~valid)} invalid predictions"
+            )
+        bboxes = bboxes[valid] + shift_amount * 2
+        prediction_arrays.append(
+            np.column_stack(
+                [
+                    bboxes,
+                    np.asarray(scores, dtype=np.float64)[valid],
+                    np.asarray(class_ids).astype(np.int64)[valid],
+                ]
+            )
+        )
+    predictions = (
+        np.concatenate(prediction_arrays)
+        if prediction_arrays
+        else np.zeros((0, 6))
+    )
+    predictions = greedy_nmm_merge(
+        predictions,
+        match_metric=postprocess_match_metric,
+        match_threshold=postprocess_match_threshold,
+        class_agnostic=postprocess_class_agnostic,
+    )
+    object_prediction_list = []
+    for x1, y1, x2, y2, score, category_id in predictions:
+        category_id = int(category_id)
+        object_prediction_list.append(
+            ObjectPrediction(
+                bbox=[int(x1), int(y1), int(x2), int(y2)],
+                category_id=category_id,
+                category_name=detection_model.category_mapping[
+                    str(category_id)
+                ],
+                score=float(score),
+            )
+        )
+    durations_in_seconds["postprocess"] = time.time() - time_start
+    durations_in_seconds["total"] = time.time() - time_total
+
+    if verbose == 2:
+        print(
+            "Slicing performed in",
+            durations_in_seconds["slice"],
+            "seconds.",
+        )
+        print(
+            "Prediction performed in",
+            durations_in_seconds["prediction"],
+            "seconds.",
+        )
+        print(
+            "Postprocess performed in",
+            durations_in_seconds["postprocess"],
+            "seconds.",
+        )
+
+    return PredictionResult(
+        image=image,
+        object_prediction_list=object_prediction_list,
+        durations_in_seconds=durations_in_seconds,
+        num_slices=num_slices,
+    )
+
+
 def bbox_sort(a, b, thresh):
     """
     a, b  - function receives two bounding bboxes
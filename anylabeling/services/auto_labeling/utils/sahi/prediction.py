@@ -177,6 +177,7 @@ class PredictionResult:
         object_prediction_list: List[ObjectPrediction],
         image: Union[Image.Image, str, np.ndarray],
         durations_in_seconds: Optional[Dict] = None,
+        num_slices: Optional[int] = None,
     ):
         self.image: Image.Image = read_image_as_pil(image)
         self.image_width, self.image_height = self.image.size
@@ -184,6 +185,7 @@ class PredictionResult:
             object_prediction_list
         )
         self.durations_in_seconds = durations_in_seconds
+        self.num_slices = num_slices
 
     def export_visuals(
         self,
@@ -258,7 +258,11 @@ class YOLO_NAS(Model):
                 )
             )
 
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         _, _, input_height, input_width = self.net.get_input_shape()
         self.preprocess = Preprocessing(
             YOLO_NAS_DEFAULT_PROCESSING_STEPS, (input_height, input_width)
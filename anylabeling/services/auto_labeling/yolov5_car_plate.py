@@ -47,7 +47,11 @@ class YOLOv5CarPlateDetRec(Model):
                     "Could not download or initialize YOLOv5CarPlate Detection model.",
                 )
             )
-        self.det_net = OnnxBaseModel(det_model_abs_path, __preferred_device__)
+        self.det_net = OnnxBaseModel(
+            det_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         rec_model_abs_path = self.get_model_abs_path(
             self.config, "rec_model_path"
         )
@@ -58,7 +62,11 @@ class YOLOv5CarPlateDetRec(Model):
                     "Could not download or initialize YOLOv5CarPlate Recognition model.",
                 )
             )
-        self.rec_net = OnnxBaseModel(rec_model_abs_path, __preferred_device__)
+        self.rec_net = OnnxBaseModel(
+            rec_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
 
         self.std = self.config.get("std", 0.193)
         self.mean = self.config.get("mean", 0.588)
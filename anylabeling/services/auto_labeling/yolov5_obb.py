@@ -57,7 +57,11 @@ class YOLOv5OBB(Model):
                 )
             )
 
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.stride = self.config["stride"]
         self.classes = self.config["classes"]
         self.nms_thres = self.config["iou_threshold"]
@@ -40,7 +40,11 @@ class YOLOv5_RAM(YOLO):
                     f"Could not download or initialize {self.config['type']} model.",
                 )
             )
-        self.ram_net = OnnxBaseModel(tag_model_abs_path, __preferred_device__)
+        self.ram_net = OnnxBaseModel(
+            tag_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.ram_input_shape = self.ram_net.get_input_shape()[-2:]
         self.tag_mode = self.config.get("tag_mode", "")  # ['en', 'cn']
         self.tag_list, self.tag_list_chinese = self.load_tag_list()
@@ -68,7 +72,11 @@ class YOLOv5_RAM(YOLO):
                     f"Could not download or initialize {self.config['type']} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         _, _, self.input_height, self.input_width = self.net.get_input_shape()
         if not isinstance(self.input_width, int):
             self.input_width = self.config.get("input_width", -1)
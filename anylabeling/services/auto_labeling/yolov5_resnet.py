@@ -41,7 +41,11 @@ class YOLOv5_ResNet(YOLO):
                     f"Could not download or initialize {self.config['type']} model.",
                 )
             )
-        self.cls_net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.cls_net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.cls_classes = self.config["cls_classes"]
         self.cls_input_shape = self.cls_net.get_input_shape()[-2:]
 
@@ -54,7 +58,11 @@ class YOLOv5_ResNet(YOLO):
                     f"Could not download or initialize {self.config['type']} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         _, _, self.input_height, self.input_width = self.net.get_input_shape()
         if not isinstance(self.input_width, int):
             self.input_width = self.config.get("input_width", -1)
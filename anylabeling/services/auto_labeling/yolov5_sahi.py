@@ -58,6 +58,7 @@ class YOLOv5_SAHI(Model):
             confidence_threshold=self.config["confidence_threshold"],
             category_mapping=category_mapping,
             device=__preferred_device__,
+            session_config=self.config.get("session"),
         )
         self.slice_height = self.config["slice_height"]
         self.slice_width = self.config["slice_width"]
@@ -64,7 +64,11 @@ class YOLOv5SegmentAnything(YOLO):
                     "Model", "Could not download or initialize YOLOv5 model."
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         _, _, self.input_height, self.input_width = self.net.get_input_shape()
         if not isinstance(self.input_width, int):
             self.input_width = self.config.get("input_width", -1)
@@ -136,10 +140,14 @@ class YOLOv5SegmentAnything(YOLO):
         self.target_size = self.config["target_size"]
         self.input_size = (max_height, max_width)
         self.encoder_session = OnnxBaseModel(
-            encoder_model_abs_path, __preferred_device__
+            encoder_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
         )
         self.decoder_session = OnnxBaseModel(
-            decoder_model_abs_path, __preferred_device__
+            decoder_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
         )
         self.model = SegmentAnythingONNX(
             self.encoder_session,
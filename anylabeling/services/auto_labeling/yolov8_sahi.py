@@ -10,7 +10,7 @@ from anylabeling.views.labeling.utils.opencv import qt_img_to_rgb_cv_img
 from .model import Model
 from .types import AutoLabelingResult
 
-from .utils.sahi.predict import get_sliced_prediction
+from .utils.sahi.predict import get_batched_sliced_prediction
 from .utils.sahi.models.yolov8_onnx import Yolov8OnnxDetectionModel
 
 
@@ -58,6 +58,8 @@ class YOLOv8_SAHI(Model):
             confidence_threshold=self.config["confidence_threshold"],
             category_mapping=category_mapping,
             device=__preferred_device__,
+            batch_size=self.config.get("batch_size", 8),
+            session_config=self.config.get("session"),
         )
         self.slice_height = self.config["slice_height"]
         self.slice_width = self.config["slice_width"]
@@ -79,14 +81,20 @@ class YOLOv8_SAHI(Model):
             logger.warning(e)
             return []
 
-        results = get_sliced_prediction(
+        results = get_batched_sliced_prediction(
             image,
             self.net,
             slice_height=self.slice_height,
             slice_width=self.slice_width,
             overlap_height_ratio=self.overlap_height_ratio,
             overlap_width_ratio=self.overlap_width_ratio,
-            verbose=0,
+        )
+        durations = results.durations_in_seconds
+        logger.debug(
+            f"SAHI prediction on {results.num_slices} slices in "
+            f"{durations['total']:.3f}s (slice {durations['slice']:.3f}s, "
+            f"inference {durations['prediction']:.3f}s, "
+            f"merge {durations['postprocess']:.3f}s)"
         )
         shapes = []
 
@@ -30,7 +30,11 @@ class YOLOW_RAM(YOLO, RecognizeAnything):
                     f"Could not download or initialize {self.config['type']} model.",
                 )
             )
-        self.ram_net = OnnxBaseModel(tag_model_abs_path, __preferred_device__)
+        self.ram_net = OnnxBaseModel(
+            tag_model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.ram_input_shape = self.ram_net.get_input_shape()[-2:]
         self.tag_mode = self.config.get("tag_mode", "")  # ['en', 'cn']
         self.tag_list, self.tag_list_chinese = self.load_tag_list()
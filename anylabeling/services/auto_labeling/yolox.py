@@ -52,7 +52,11 @@ class YOLOX(Model):
                     f"Could not download or initialize {model_name} model.",
                 )
             )
-        self.net = OnnxBaseModel(model_abs_path, __preferred_device__)
+        self.net = OnnxBaseModel(
+            model_abs_path,
+            __preferred_device__,
+            session_config=self.config.get("session"),
+        )
         self.p6 = self.config["p6"]
         self.classes = self.config["classes"]
         self.input_shape = self.net.get_input_shape()[-2:]
@@ -0,0 +1,242 @@
+import os
+import os.path as osp
+import sys
+
+from termcolor import colored
+from tqdm import tqdm
+
+from anylabeling import config as anylabeling_config
+from anylabeling.views.common.converter import (
+    SUPPORTED_TASKS,
+    get_image_files,
+    run_conversion,
+)
+from anylabeling.views.labeling.logger import logger
+
+EXPORT_FORMATS = ["xlabel"] + [
+    task[len("xlabel2") :] for task in SUPPORTED_TASKS if "xlabel2" in task
+]
+CHECKPOINT_FILE = ".xanylabeling_autolabel_{model_name}.txt"
+
+
+def get_checkpoint_file(output_dir, model_name):
+    safe_name = "".join(
+        c if c.isalnum() or c in "-_." else "_" for c in model_name
+    )
+    return osp.join(output_dir, CHECKPOINT_FILE.format(model_name=safe_name))
+
+
+def load_checkpoint(checkpoint_file):
+    """Return the names of the images already labeled by a previous run"""
+    if not osp.exists(checkpoint_file):
+        return set()
+    with open(checkpoint_file, "r", encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+def handle_autolabel_command(args):
+    """Handle the autolabel command from argparse"""
+    if not args.model or not args.images:
+        print(
+            colored(
+                "--model and --images are required, e.g.\n"
+                "  xanylabeling autolabel --model yolov8n "
+                "--images ./images --output ./labels",
+                "red",
+            )
+        )
+        sys.exit(1)
+    if args.format not in EXPORT_FORMATS:
+        print(
+            colored(
+                f"Unsupported format: {args.format}. "
+                f"Must be one of {EXPORT_FORMATS}",
+                "red",
+            )
+        )
+        sys.exit(1)
+    if not osp.isdir(args.images):
+        print(colored(f"Image directory not found: {args.images}", "red"))
+        sys.exit(1)
+
+    if args.qt_platform:
+        os.environ["QT_QPA_PLATFORM"] = args.qt_platform
+    # Models only need a core application, which does not open a display
+    from PyQt5.QtCore import QCoreApplication
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])  # noqa
+
+    anylabeling_config.current_config_file = args.config
+    config = anylabeling_config.get_config(args.config)
+    store_data = config["store_data"] and getattr(args, "store_data", True)
+
+    num_done = run_autolabel(
+        args.model,
+        args.images,
+        output_dir=args.output,
+        text_prompt=args.prompt,
+        batch_size=args.batch_size,
+        num_workers=args.workers,
+        store_data=store_data,
+        restart=args.restart,
+    )
+    if num_done is None:
+        sys.exit(1)
+
+    if args.format != "xlabel":
+        label_dir = args.output or args.images
+        run_conversion(
+            f"xlabel2{args.format}",
+            images=args.images,
+            labels=label_dir,
+            output=osp.join(label_dir, args.format),
+            classes_file=args.classes,
+            pose_cfg_file=args.pose_cfg,
+            mode=args.mode,
+            mapping_file=args.mapping,
+        )
+
+
+def run_autolabel(
+    model,
+    image_dir,
+    output_dir=None,
+    text_prompt=None,
+    batch_size=None,
+    num_workers=None,
+    store_data=False,
+    restart=False,
+):
+    """Auto label all images in a directory without a GUI.
+
+    Label files are written in XLABEL format next to the images, or into
+    `output_dir`. Every labeled image is appended to a checkpoint file, so
+    an interrupted run continues where it stopped unless `restart` is set.
+
+    Returns:
+        int: Number of images labeled by this run, or None on failure.
+    """
+    from PyQt5.QtGui import QImage
+
+    from anylabeling.services.auto_labeling import (
+        _BATCH_PROCESSING_INVALID_MODELS,
+        _BATCH_PROCESSING_TEXT_PROMPT_MODELS,
+        _BATCH_PROCESSING_VIDEO_MODELS,
+    )
+    from anylabeling.services.auto_labeling.model_manager import ModelManager
+    from anylabeling.views.labeling.utils.batch_pipeline import (
+        BatchPipeline,
+        write_label_file,
+    )
+
+    model_manager = ModelManager()
+    model_manager.new_model_status.connect(logger.info)
+    model_config = model_manager.load_model_blocking(model)
+    if model_config is None:
+        logger.error(f"Failed to load model: {model}")
+        return None
+
+    model_type = model_config["type"]
+    if model_type in (
+        _BATCH_PROCESSING_INVALID_MODELS + _BATCH_PROCESSING_VIDEO_MODELS
+    ):
+        logger.error(
+            f"The model `{model_type}` is not supported for auto labeling."
+        )
+        model_manager.unload_model()
+        return None
+    if model_type in _BATCH_PROCESSING_TEXT_PROMPT_MODELS and not text_prompt:
+        logger.warning(
+            f"The model `{model_type}` expects a text prompt, use --prompt."
+        )
+
+    output_dir = output_dir or image_dir
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_file = get_checkpoint_file(output_dir, model_config["name"])
+    if restart and osp.exists(checkpoint_file):
+        os.remove(checkpoint_file)
+    labeled = load_checkpoint(checkpoint_file)
+
+    image_files = [
+        image_file
+        for image_file in get_image_files(image_dir)
+        if osp.basename(image_file) not in labeled
+    ]
+    if labeled:
+        logger.info(
+            f"Resuming from checkpoint: {len(labeled)} images already "
+            f"labeled, {len(image_files)} remaining"
+        )
+    if not image_files:
+        print(
+            colored(f"✓ All images are already labeled: {output_dir}", "green")
+        )
+        model_manager.unload_model()
+        return 0
+
+    if text_prompt:
+        batch_size = 1
+    elif batch_size is None:
+        batch_size = model_manager.get_batch_size()
+
+    # Models read pixels through `qt_img_to_rgb_cv_img`, which returns the
+    # image decoded and pinned by the pipeline, so no canvas image is needed
+    placeholder = QImage()
+
+    def predict(image_files):
+        if len(image_files) > 1:
+            return model_manager.predict_shapes_batch(
+                [placeholder] * len(image_files), image_files
+            )
+        return [
+            model_manager.predict_shapes(
+                placeholder,
+                image_files[0],
+                text_prompt=text_prompt or None,
+                batch=True,
+            )
+        ]
+
+    progress_bar = tqdm(total=len(image_files), desc="Auto labeling")
+    with open(checkpoint_file, "a", encoding="utf-8") as checkpoint:
+
+        def save(image_file, auto_labeling_result):
+            write_label_file(
+                image_file,
+                auto_labeling_result,
+                output_dir=output_dir,
+                store_data=store_data,
+            )
+            # Failed predictions are retried when the run is resumed
+            if auto_labeling_result is not None:
+                checkpoint.write(osp.basename(image_file) + "\n")
+                checkpoint.flush()
+
+        pipeline = BatchPipeline(
+            image_files,
+            predict=predict,
+            save=save,
+            batch_size=batch_size,
+            num_workers=num_workers,
+            on_progress=lambda num_done: progress_bar.update(1),
+        )
+        try:
+            stats = pipeline.run()
+        except KeyboardInterrupt:
+            logger.warning(
+                f"Interrupted, run the same command again to resume "
+                f"from {checkpoint_file}"
+            )
+            return None
+        finally:
+            progress_bar.close()
+            model_manager.unload_model()
+
+    print(
+        colored(
+            f"✓ Labeled {stats['num_images']} images in "
+            f"{stats['total']:.2f}s: {output_dir}",
+            "green",
+        )
+    )
+    return stats["num_images"]
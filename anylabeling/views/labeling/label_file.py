@@ -35,19 +35,21 @@ class LabelFile:
 
     @staticmethod
     def _check_image_height_and_width(image_data, image_height, image_width):
-        img_arr = utils.img_b64_to_arr(image_data)
-        if image_height is not None and img_arr.shape[0] != image_height:
+        # Only the image header is parsed, pixels are never decoded
+        with utils.img_data_to_pil(image_data) as img:
+            actual_width, actual_height = img.size
+        if image_height is not None and actual_height != image_height:
             logger.error(
                 "image_height does not match with image_data or image_path, "
                 "so getting image_height from actual image."
             )
-            image_height = img_arr.shape[0]
-        if image_width is not None and img_arr.shape[1] != image_width:
+            image_height = actual_height
+        if image_width is not None and actual_width != image_width:
             logger.error(
                 "image_width does not match with image_data or image_path, "
                 "so getting image_width from actual image."
             )
-            image_width = img_arr.shape[1]
+            image_width = actual_width
         return image_height, image_width
 
     @staticmethod
@@ -113,7 +115,7 @@ class LabelFile:
             image_path = data["imagePath"]
 
             self._check_image_height_and_width(
-                base64.b64encode(image_data).decode("utf-8"),
+                image_data,
                 data.get("imageHeight"),
                 data.get("imageWidth"),
             )
@@ -304,10 +306,10 @@ class LabelFile:
     def _save_json(self, filename, shapes, image_path, image_height,
                    image_width, image_data, other_data, flags):
         if image_data is not None:
-            image_data = base64.b64encode(image_data).decode("utf-8")
             image_height, image_width = self._check_image_height_and_width(
                 image_data, image_height, image_width
             )
+            image_data = base64.b64encode(image_data).decode("utf-8")
 
         if other_data is None:
             other_data = {}
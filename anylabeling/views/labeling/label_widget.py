@@ -45,6 +45,7 @@ from ...config import get_config, save_config
 from .label_file import LabelFile, LabelFileError
 from .logger import logger
 from .shape import Shape
+from .utils.image_pyramid import ImagePyramid
 from .widgets import (
     AboutDialog,
     AutoLabelingWidget,
@@ -55,6 +56,7 @@ from .widgets import (
     VQADialog,
     CrosshairSettingsDialog,
     FileDialogPreview,
+    FileListWidget,
     ShapeModifyDialog,
     GroupIDFilterComboBox,
     LabelDialog,
@@ -113,7 +115,6 @@ class LabelingWidget(LabelDialog):
         self.supported_shape = Shape.get_supported_shape()
         self.label_info = {}
         self.image_flags = []
-        self.fn_to_index = {}
         self.cache_auto_label = None
         self.cache_auto_label_group_id = None
 
@@ -236,7 +237,7 @@ class LabelingWidget(LabelDialog):
         self.file_search = SearchBar()
         self.file_search.setPlaceholderText(self.tr("Search Filename"))
         self.file_search.textChanged.connect(self.file_search_changed)
-        self.file_list_widget = QtWidgets.QListWidget()
+        self.file_list_widget = FileListWidget()
         self.file_list_widget.itemSelectionChanged.connect(
             self.file_selection_changed
         )
@@ -273,6 +274,18 @@ class LabelingWidget(LabelDialog):
         )
         self.async_exif_scanner = utils.AsyncExifScanner(self)
         self.async_exif_scanner.exif_detected.connect(self.on_exif_detected)
+        self.folder_indexer = utils.AsyncFolderIndexer(self)
+        self.folder_indexer.images_scanned.connect(
+            self.on_folder_images_scanned
+        )
+        self.folder_indexer.annotations_checked.connect(
+            self.on_folder_annotations_checked
+        )
+        self.folder_indexer.labels_checked.connect(
+            self.on_folder_labels_checked
+        )
+        self.folder_pattern = None
+        self.file_label_index = utils.LabelIndex()
 
         self.setAcceptDrops(True)
 
@@ -281,6 +294,7 @@ class LabelingWidget(LabelDialog):
             epsilon=self._config["epsilon"],
             double_click=self._config["canvas"]["double_click"],
             num_backups=self._config["canvas"]["num_backups"],
+            history_memory_mb=self._config["canvas"].get("history_memory_mb"),
             wheel_rectangle_editing=self._config["canvas"][
                 "wheel_rectangle_editing"
             ],
@@ -2157,9 +2171,7 @@ class LabelingWidget(LabelDialog):
                 self.navigator_dialog.show()
 
                 if hasattr(self, "image") and not self.image.isNull():
-                    self.navigator_dialog.set_image(
-                        QtGui.QPixmap.fromImage(self.image)
-                    )
+                    self.navigator_dialog.set_image(self.canvas.pixmap)
                     self.update_navigator_viewport()
                 else:
                     self._should_restore_navigator = True
@@ -2447,12 +2459,19 @@ class LabelingWidget(LabelDialog):
             # Filter files by label
             shown_count = 0
             hidden_count = 0
+            label_files = self.file_label_index.get_files(selected_label)
             for i in range(self.file_list_widget.count()):
                 item = self.file_list_widget.item(i)
                 filename = item.text()
 
-                # Check if this file contains the selected label
-                has_label = self._check_file_has_label(filename, selected_label)
+                # Check if this file contains the selected label, files the
+                # folder scan has not indexed yet are parsed on demand
+                if filename in self.file_label_index:
+                    has_label = filename in label_files
+                else:
+                    has_label = self._check_file_has_label(
+                        filename, selected_label
+                    )
                 item.setHidden(not has_label)
 
                 if has_label:
@@ -2476,205 +2495,9 @@ class LabelingWidget(LabelDialog):
 
         # Get full file path
         file_path = osp.join(self.last_open_dir, filename)
-        base_path = osp.splitext(file_path)[0]
-
-        # Try XML format first
-        xml_file = base_path + ".xml"
-
-        # Also check output_dir if it's set
-        if self.output_dir:
-            xml_file_alt = osp.join(self.output_dir, osp.basename(base_path) + ".xml")
-            if osp.exists(xml_file_alt):
-                xml_file = xml_file_alt
-
-        if osp.exists(xml_file):
-            # XML file exists - not unannotated
-            if target_label == "[未标注]":
-                return False
-
-            # Handle special filter: [OK] - empty XML content
-            if target_label == "[OK]":
-                is_ok = self._is_xml_empty_or_ok(xml_file)
-                logger.debug(f"XML {osp.basename(xml_file)}: is_ok={is_ok}")
-                return is_ok
-
-            # Handle special filter: [ignore] - has empty flags
-            if target_label == "[ignore]":
-                has_ignore = self._has_ignore_flags(xml_file)
-                logger.debug(f"XML {osp.basename(xml_file)}: has_ignore={has_ignore}")
-                return has_ignore
-
-            # Normal label filtering
-            labels = self._load_labels_from_xml(xml_file)
-            result = target_label in labels
-            logger.debug(f"XML {osp.basename(xml_file)}: labels={labels}, has '{target_label}'={result}")
-            return result
-
-        # Try JSON format
-        json_file = base_path + ".json"
-
-        # Also check output_dir if it's set
-        if self.output_dir:
-            json_file_alt = osp.join(self.output_dir, osp.basename(base_path) + ".json")
-            if osp.exists(json_file_alt):
-                json_file = json_file_alt
-
-        if osp.exists(json_file):
-            # JSON file exists - not unannotated
-            if target_label == "[未标注]":
-                return False
-
-            # Handle special filter: [OK] - empty shapes
-            if target_label == "[OK]":
-                is_ok = self._is_json_empty_or_ok(json_file)
-                logger.debug(f"JSON {osp.basename(json_file)}: is_ok={is_ok}")
-                return is_ok
-
-            # JSON format doesn't have ignore concept, return False
-            if target_label == "[ignore]":
-                return False
-
-            # Normal label filtering
-            labels = self._load_labels_from_json(json_file)
-            result = target_label in labels
-            logger.debug(f"JSON {osp.basename(json_file)}: labels={labels}, has '{target_label}'={result}")
-            return result
-
-        # No annotation file found
-        logger.debug(f"No annotation file found for {filename}")
-        # For [未标注] filter, files without annotation file match
-        if target_label == "[未标注]":
-            return True
-        # For other filters, no annotation means no match
-        return False
-
-    def _is_xml_empty_or_ok(self, xml_file):
-        """Check if XML file is empty or represents an OK image (no defects)
-
-        An XML is considered OK if:
-        - File size is 0 (empty file)
-        - VisionMaster format: _ItemsData is empty or doesn't exist
-        - PASCAL VOC format: No object elements exist
-        """
-        import xml.etree.ElementTree as ET
-
-        try:
-            # Empty file
-            if osp.getsize(xml_file) == 0:
-                return True
-
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            # Check for VisionMaster XML format
-            items_data = root.find("_ItemsData")
-            if items_data is not None:
-                # Check if _ItemsData is empty (no child elements)
-                if len(items_data) == 0:
-                    return True
-                return False
-            else:
-                # Standard PASCAL VOC format - check if there are any objects
-                objects = root.findall(".//object")
-                return len(objects) == 0
-
-        except Exception as e:
-            logger.warning(f"Error checking if XML is OK {xml_file}: {e}")
-            return False
-
-    def _has_ignore_flags(self, xml_file):
-        """Check if XML file contains at least one empty <flags></flags> element
-
-        This is specific to VisionMaster format where empty flags indicate
-        an area that should be ignored.
-        """
-        import xml.etree.ElementTree as ET
-
-        try:
-            # Handle empty XML files
-            if osp.getsize(xml_file) == 0:
-                return False
-
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            # Check for VisionMaster XML format only
-            items_data = root.find("_ItemsData")
-            if items_data is not None:
-                # Look for any flags element that is empty or None
-                for flags_elem in items_data.iter("flags"):
-                    if not flags_elem.text or not flags_elem.text.strip():
-                        return True
-
-            return False
-
-        except Exception as e:
-            logger.warning(f"Error checking for ignore flags in XML {xml_file}: {e}")
-            return False
-
-    def _is_json_empty_or_ok(self, json_file):
-        """Check if JSON file represents an OK image (no shapes)"""
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Check if shapes list is empty or doesn't exist
-            shapes = data.get('shapes', [])
-            return len(shapes) == 0
-
-        except Exception as e:
-            logger.warning(f"Error checking if JSON is OK {json_file}: {e}")
-            return False
-
-    def _load_labels_from_xml(self, xml_file):
-        """Extract all labels from XML annotation file"""
-        import xml.etree.ElementTree as ET
-        labels = set()
-
-        try:
-            # Handle empty XML files
-            if osp.getsize(xml_file) == 0:
-                return labels
-
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
-
-            # Check for VisionMaster XML format
-            items_data = root.find("_ItemsData")
-            if items_data is not None:
-                # VisionMaster format - find all elements with "flags" tag
-                # This covers all parameter types: FlawCoverRoiParameter, FlawPolygonRoiParameter, etc.
-                for flags_elem in items_data.iter("flags"):
-                    if flags_elem.text and flags_elem.text.strip():
-                        labels.add(flags_elem.text.strip())
-            else:
-                # Standard PASCAL VOC format
-                for obj in root.findall(".//object"):
-                    name_elem = obj.find("name")
-                    if name_elem is not None and name_elem.text:
-                        labels.add(name_elem.text.strip())
-        except Exception as e:
-            logger.warning(f"Error loading labels from XML {xml_file}: {e}")
-
-        return labels
-
-    def _load_labels_from_json(self, json_file):
-        """Extract all labels from JSON annotation file"""
-        labels = set()
-
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            # Extract labels from shapes
-            for shape in data.get('shapes', []):
-                label = shape.get('label')
-                if label:
-                    labels.add(label)
-        except Exception as e:
-            logger.warning(f"Error loading labels from JSON {json_file}: {e}")
-
-        return labels
+        labels = utils.get_label_buckets(file_path, self.output_dir)
+        self.file_label_index.update(filename, labels)
+        return target_label in labels
 
     def _has_actual_annotations(self, annotation_file):
         """Check if annotation file has actual annotation content
@@ -2682,51 +2505,7 @@ class LabelingWidget(LabelDialog):
         Returns True if file has annotations, False if empty or doesn't exist.
         This is used to determine the checkmark state in the file list.
         """
-        if not osp.exists(annotation_file):
-            return False
-
-        # Check file extension
-        ext = osp.splitext(annotation_file)[1].lower()
-
-        if ext == '.xml':
-            # For XML, check if it has actual annotation data
-            try:
-                # Empty file means OK annotation (no defects)
-                if osp.getsize(annotation_file) == 0:
-                    return True  # Empty XML = OK annotation, should be marked as annotated
-
-                import xml.etree.ElementTree as ET
-                tree = ET.parse(annotation_file)
-                root = tree.getroot()
-
-                # Check for VisionMaster XML format
-                items_data = root.find("_ItemsData")
-                if items_data is not None:
-                    # VisionMaster format - check if _ItemsData has children
-                    # Empty <_ItemsData /> means no annotations
-                    return len(items_data) > 0
-                else:
-                    # Standard PASCAL VOC format - check for objects
-                    objects = root.findall(".//object")
-                    return len(objects) > 0
-
-            except Exception as e:
-                logger.warning(f"Error checking XML annotations {annotation_file}: {e}")
-                return False
-
-        elif ext == '.json':
-            # For JSON, check if shapes array is not empty
-            try:
-                with open(annotation_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                shapes = data.get('shapes', [])
-                return len(shapes) > 0
-            except Exception as e:
-                logger.warning(f"Error checking JSON annotations {annotation_file}: {e}")
-                return False
-
-        # Unknown format, assume has annotation if file exists
-        return True
+        return utils.has_actual_annotations(annotation_file)
 
     def _load_labels_from_label_color_file(self, dirpath):
         """Load labels from label_color.txt file in the directory
@@ -2992,14 +2771,12 @@ class LabelingWidget(LabelDialog):
             max_x = max([bbox[2] for bbox in rectangle_shapes])
             max_y = max([bbox[3] for bbox in rectangle_shapes])
 
-            union_shape.points[0].setX(min_x)
-            union_shape.points[0].setY(min_y)
-            union_shape.points[1].setX(max_x)
-            union_shape.points[1].setY(min_y)
-            union_shape.points[2].setX(max_x)
-            union_shape.points[2].setY(max_y)
-            union_shape.points[3].setX(min_x)
-            union_shape.points[3].setY(max_y)
+            union_shape.points = [
+                QtCore.QPointF(min_x, min_y),
+                QtCore.QPointF(max_x, min_y),
+                QtCore.QPointF(max_x, max_y),
+                QtCore.QPointF(min_x, max_y),
+            ]
         else:
             # Create a blank mask
             min_x = min([min(p[0] for p in poly) for poly in polygon_shapes])
@@ -3952,7 +3729,7 @@ class LabelingWidget(LabelDialog):
             data = s.other_data.copy()
             info = {
                 "label": s.label,
-                "points": [(p.x(), p.y()) for p in s.points],
+                "points": [tuple(p) for p in s.points.array.tolist()],
                 "group_id": s.group_id,
                 "description": s.description,
                 "difficult": s.difficult,
@@ -4010,6 +3787,10 @@ class LabelingWidget(LabelDialog):
                 if len(items) != 1:
                     raise RuntimeError("There are duplicate files.")
                 items[0].setCheckState(Qt.Checked)
+            self.file_label_index.update(
+                self.filename,
+                utils.get_label_buckets(self.filename, self.output_dir),
+            )
             # disable allows next and previous image to proceed
             # self.filename = filename
             return True
@@ -4312,6 +4093,10 @@ class LabelingWidget(LabelDialog):
                 if len(items) != 1:
                     raise RuntimeError("There are duplicate files.")
                 items[0].setCheckState(Qt.Checked)
+            self.file_label_index.update(
+                self.filename,
+                utils.get_label_buckets(self.filename, self.output_dir),
+            )
             # disable allows next and previous image to proceed
             # self.filename = filename
             return True
@@ -4524,7 +4309,7 @@ class LabelingWidget(LabelDialog):
         """
         num_images = len(self.image_list)
         if shape_height > 0 and shape_width > 0:
-            if num_images and self.filename in self.image_list:
+            if num_images and self.filename in self.fn_to_index:
                 self.status(
                     str(self.tr("X: %d, Y: %d | H: %d, W: %d"))
                     % (
@@ -4540,7 +4325,7 @@ class LabelingWidget(LabelDialog):
                     % (int(pos.x()), int(pos.y()), shape_height, shape_width)
                 )
         elif self.image_path:
-            if num_images and self.filename in self.image_list:
+            if num_images and self.filename in self.fn_to_index:
                 self.status(
                     str(self.tr("X: %d, Y: %d"))
                     % (
@@ -4773,9 +4558,7 @@ class LabelingWidget(LabelDialog):
         else:
             self.navigator_dialog.show()
             if hasattr(self, "image") and not self.image.isNull():
-                self.navigator_dialog.set_image(
-                    QtGui.QPixmap.fromImage(self.image)
-                )
+                self.navigator_dialog.set_image(self.canvas.pixmap)
                 self.update_navigator_viewport()
             if hasattr(self, "actions") and hasattr(
                 self.actions, "show_navigator"
@@ -4864,9 +4647,7 @@ class LabelingWidget(LabelDialog):
         self.canvas.update()
 
     def on_new_brightness_contrast(self, qimage):
-        self.canvas.load_pixmap(
-            QtGui.QPixmap.fromImage(qimage), clear_shapes=False
-        )
+        self.canvas.load_pixmap(qimage, clear_shapes=False)
 
     def brightness_contrast(self, _):
         self.brightness_contrast_dialog.update_image(
@@ -4958,7 +4739,7 @@ class LabelingWidget(LabelDialog):
         # self.inform_next_files(filename)
 
         # Changing file_list_widget loads file
-        if filename in self.image_list and (
+        if filename in self.fn_to_index and (
             self.file_list_widget.currentRow()
             != self.fn_to_index[str(filename)]
         ):
@@ -5059,7 +4840,9 @@ class LabelingWidget(LabelDialog):
             return False
         self.image = image
         self.filename = filename
-        self.navigator_dialog.set_image(QtGui.QPixmap.fromImage(image))
+        # The canvas and the navigator draw from the same tiles
+        pyramid = ImagePyramid(image)
+        self.navigator_dialog.set_image(pyramid)
         self.update_navigator_shapes()
         if (
             hasattr(self, "_should_restore_navigator")
@@ -5070,7 +4853,7 @@ class LabelingWidget(LabelDialog):
                 self.update_navigator_viewport()
         if self._config["keep_prev"]:
             prev_shapes = self.canvas.shapes
-        self.canvas.load_pixmap(QtGui.QPixmap.fromImage(image))
+        self.canvas.load_pixmap(pyramid)
 
         # load label flags
         flags = {k: False for k in self.image_flags or []}
@@ -5243,6 +5026,12 @@ class LabelingWidget(LabelDialog):
             except (RuntimeError, AttributeError):
                 pass
 
+        if hasattr(self, "folder_indexer") and self.folder_indexer:
+            try:
+                self.folder_indexer.stop_scan()
+            except (RuntimeError, AttributeError):
+                pass
+
         # ask the use for where to save the labels
         # self.settings.setValue('window/geometry', self.saveGeometry())
 
@@ -5275,12 +5064,13 @@ class LabelingWidget(LabelDialog):
         if not self.may_continue():
             return
         current_index = self.fn_to_index[str(self.filename)]
-        for i in range(current_index + step, end_index, step):
-            if self.file_list_widget.item(i).checkState() == Qt.Checked:
-                self.filename = self.image_list[i]
-                if self.filename and load:
-                    self.load_file(self.filename)
-                break
+        i = self.file_list_widget.model().find_row(
+            current_index + step, step, checked=True
+        )
+        if i >= 0 and (i - end_index) * step < 0:
+            self.filename = self.image_list[i]
+            if self.filename and load:
+                self.load_file(self.filename)
 
     def open_prev_unchecked_image(self):
         if self._config["switch_to_checked"]:
@@ -5295,12 +5085,13 @@ class LabelingWidget(LabelDialog):
             return
 
         current_index = self.fn_to_index[str(self.filename)]
-        for i in range(current_index - 1, -1, -1):
-            if self.file_list_widget.item(i).checkState() == Qt.Unchecked:
-                filename = self.image_list[i]
-                if filename:
-                    self.load_file(filename)
-                break
+        i = self.file_list_widget.model().find_row(
+            current_index - 1, -1, checked=False
+        )
+        if i >= 0:
+            filename = self.image_list[i]
+            if filename:
+                self.load_file(filename)
 
     def open_next_unchecked_image(self, _value=False):
         if self._config["switch_to_checked"]:
@@ -5315,12 +5106,13 @@ class LabelingWidget(LabelDialog):
             return
 
         current_index = self.fn_to_index[str(self.filename)]
-        for i in range(current_index + 1, len(self.image_list)):
-            if self.file_list_widget.item(i).checkState() == Qt.Unchecked:
-                filename = self.image_list[i]
-                if filename:
-                    self.load_file(filename)
-                break
+        i = self.file_list_widget.model().find_row(
+            current_index + 1, 1, checked=False
+        )
+        if i >= 0:
+            filename = self.image_list[i]
+            if filename:
+                self.load_file(filename)
 
     def open_prev_image(self, _value=False):
         if not self.may_continue():
@@ -5383,7 +5175,6 @@ class LabelingWidget(LabelDialog):
             filename = file_dialog.selectedFiles()[0]
             if filename:
                 self.file_list_widget.clear()
-                self.fn_to_index.clear()
                 self.load_file(filename)
 
     def change_output_dir_dialog(self, _value=False):
@@ -5416,7 +5207,7 @@ class LabelingWidget(LabelDialog):
         current_filename = self.filename
         self.import_image_folder(self.last_open_dir, load=False)
 
-        if current_filename in self.image_list:
+        if current_filename in self.fn_to_index:
             # retain currently selected file
             self.file_list_widget.setCurrentRow(
                 self.fn_to_index[str(current_filename)]
@@ -5545,6 +5336,10 @@ class LabelingWidget(LabelDialog):
         if osp.exists(label_file):
             os.remove(label_file)
             logger.info(f"Label file is removed: {label_file}")
+            self.file_label_index.update(
+                self.filename,
+                utils.get_label_buckets(self.filename, self.output_dir),
+            )
 
             item = self.file_list_widget.currentItem()
             item.setCheckState(Qt.Unchecked)
@@ -5734,11 +5529,13 @@ class LabelingWidget(LabelDialog):
 
     @property
     def image_list(self):
-        lst = []
-        for i in range(self.file_list_widget.count()):
-            item = self.file_list_widget.item(i)
-            lst.append(item.text())
-        return lst
+        """Image files of the file list, must not be modified"""
+        return self.file_list_widget.model().files
+
+    @property
+    def fn_to_index(self):
+        """Mapping from image file to its row in the file list"""
+        return self.file_list_widget.model().rows
 
     def import_dropped_image_files(self, image_files):
         extensions = [
@@ -5748,8 +5545,9 @@ class LabelingWidget(LabelDialog):
 
         self.filename = None
         valid_files = []
-        for file in image_files:
-            if file in self.image_list or not file.lower().endswith(
+        annotated_files = set()
+        for file in dict.fromkeys(image_files):
+            if file in self.fn_to_index or not file.lower().endswith(
                 tuple(extensions)
             ):
                 continue
@@ -5769,12 +5567,9 @@ class LabelingWidget(LabelDialog):
                 if self.output_dir:
                     alt_label_file = self.output_dir + "/" + osp.basename(alt_label_file)
                 has_annotation = self._has_actual_annotations(alt_label_file)
-
-            item = QtWidgets.QListWidgetItem(file)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            item.setCheckState(Qt.Checked if has_annotation else Qt.Unchecked)
-            self.file_list_widget.addItem(item)
-            self.fn_to_index[file] = self.file_list_widget.count() - 1
+            if has_annotation:
+                annotated_files.add(file)
+        self.file_list_widget.model().add_files(valid_files, annotated_files)
 
         if len(self.image_list) > 1:
             self.actions.open_next_image.setEnabled(True)
@@ -5802,35 +5597,26 @@ class LabelingWidget(LabelDialog):
         # Clear label dialog history when loading new folder
         self.label_dialog.label_list.clear()
 
-        image_files = []
-
-        for filename in utils.scan_all_images(dirpath):
-            if pattern and pattern not in filename:
-                continue
-            image_files.append(filename)
-
-            # Check for annotation file in current format or alternate format
-            base_name = osp.splitext(filename)[0]
-            label_file = base_name + LabelFile.suffix
-            if self.output_dir:
-                label_file_without_path = osp.basename(label_file)
-                label_file = self.output_dir + "/" + label_file_without_path
-
-            # Check if file exists AND has actual annotations
-            has_annotation = self._has_actual_annotations(label_file)
-            if not has_annotation:
-                # Check alternate format
-                alt_suffix = ".json" if LabelFile.suffix == ".xml" else ".xml"
-                alt_label_file = base_name + alt_suffix
-                if self.output_dir:
-                    alt_label_file = self.output_dir + "/" + osp.basename(alt_label_file)
-                has_annotation = self._has_actual_annotations(alt_label_file)
+        # Show the image list and annotation status of the last scan right
+        # away, the folder is rescanned in the background
+        cached = utils.AsyncFolderIndexer.load(dirpath)
+        self.file_label_index.clear()
+        annotation_status = {}
+        for filename, (has_annotation, labels) in cached.items():
+            annotation_status[filename] = has_annotation
+            self.file_label_index.update(filename, labels)
+        if cached:
+            all_image_files = list(cached)
+        else:
+            all_image_files = utils.scan_all_images(dirpath)
 
-            item = QtWidgets.QListWidgetItem(filename)
-            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            item.setCheckState(Qt.Checked if has_annotation else Qt.Unchecked)
-            self.file_list_widget.addItem(item)
-            self.fn_to_index[filename] = self.file_list_widget.count() - 1
+        self.folder_pattern = pattern
+        image_files = self._add_image_files_to_list(
+            all_image_files, annotation_status
+        )
+        self.folder_indexer.start_scan(
+            dirpath, all_image_files, LabelFile.suffix, self.output_dir
+        )
 
         self.actions.open_next_image.setEnabled(True)
         self.actions.open_prev_image.setEnabled(True)
@@ -5847,6 +5633,53 @@ class LabelingWidget(LabelDialog):
         if image_files:
             self.async_exif_scanner.start_scan(image_files)
 
+    def _add_image_files_to_list(self, image_files, annotation_status):
+        """Set the file list to the images matching the folder pattern"""
+        if self.folder_pattern:
+            image_files = [
+                filename
+                for filename in image_files
+                if self.folder_pattern in filename
+            ]
+        annotated_files = {
+            filename
+            for filename, has_annotation in annotation_status.items()
+            if has_annotation
+        }
+        self.file_list_widget.model().set_files(image_files, annotated_files)
+        return self.image_list
+
+    def on_folder_images_scanned(self, image_files):
+        """Rebuild the file list after the folder scan found changes"""
+        model = self.file_list_widget.model()
+        annotation_status = {
+            filename: model.is_checked(row)
+            for filename, row in self.fn_to_index.items()
+        }
+
+        self.file_list_widget.blockSignals(True)
+        self.file_list_widget.selectionModel().blockSignals(True)
+        self._add_image_files_to_list(image_files, annotation_status)
+        if self.filename in self.fn_to_index:
+            self.file_list_widget.setCurrentRow(
+                self.fn_to_index[self.filename]
+            )
+        self.file_list_widget.selectionModel().blockSignals(False)
+        self.file_list_widget.blockSignals(False)
+
+    def on_folder_annotations_checked(self, annotation_status):
+        """Update check marks of images whose label files changed"""
+        model = self.file_list_widget.model()
+        for filename, has_annotation in annotation_status.items():
+            row = model.row(filename)
+            if row >= 0:
+                model.set_checked(row, has_annotation)
+
+    def on_folder_labels_checked(self, file_labels):
+        """Update the label index of images whose label files changed"""
+        for filename, labels in file_labels.items():
+            self.file_label_index.update(filename, labels)
+
     def toggle_auto_labeling_widget(self):
         """Toggle auto labeling widget visibility."""
         if self.auto_labeling_widget.isVisible():
@@ -1,15 +1,11 @@
 import copy
 import math
 
+import numpy as np
 from PyQt5 import QtCore, QtGui
 
-from . import utils
 from ..labeling.logger import logger
 
-# TODO(unknown):
-# - [opt] Store paths instead of creating new ones at each paint.
-
-
 DEFAULT_LINE_COLOR = QtGui.QColor(0, 255, 0, 128)  # bf hovering
 DEFAULT_FILL_COLOR = QtGui.QColor(100, 100, 100, 100)  # hovering
 DEFAULT_SELECT_LINE_COLOR = QtGui.QColor(255, 255, 255)  # selected
@@ -18,6 +14,191 @@ DEFAULT_VERTEX_FILL_COLOR = QtGui.QColor(0, 255, 0, 255)  # hovering
 DEFAULT_HVERTEX_FILL_COLOR = QtGui.QColor(255, 255, 255, 255)  # hovering
 
 
+def _to_pair(point):
+    if isinstance(point, (QtCore.QPointF, QtCore.QPoint)):
+        return point.x(), point.y()
+    return point[0], point[1]
+
+
+def _to_array(points):
+    """Coordinates of QPointF or (x, y) pairs as an (n, 2) float64 array"""
+    if isinstance(points, _ShapePoints):
+        return points.array.copy()
+    if not isinstance(points, np.ndarray):
+        points = list(points)
+        if points and isinstance(points[0], (QtCore.QPointF, QtCore.QPoint)):
+            points = [(p.x(), p.y()) for p in points]
+    array = np.array(points, dtype=np.float64)
+    if array.size == 0:
+        return array.reshape(0, 2)
+    return np.ascontiguousarray(array.reshape(len(array), -1)[:, :2])
+
+
+class _ShapePoints:
+    """Points of a shape, stored as an (n, 2) float64 array.
+
+    It behaves like a list of QPointF, created when they are accessed, so
+    changing a returned point in place does not change the shape. Modifying
+    the points drops the cached paths of the shape.
+    """
+
+    __slots__ = ("shape", "_data", "_size")
+    __hash__ = None
+
+    def __init__(self, shape, points=()):
+        self.shape = shape
+        self._data = _to_array(points)
+        self._size = len(self._data)
+
+    @property
+    def array(self):
+        """
+        The coordinates, call `Shape.invalidate` after changing them in
+        place.
+        """
+        return self._data[: self._size]
+
+    def __reduce_ex__(self, protocol):
+        # Copies are plain arrays, not bound to this shape
+        return self.array.copy().__reduce_ex__(protocol)
+
+    def _set(self, array):
+        self._data = array
+        self._size = len(array)
+        self.shape.invalidate()
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            data = np.empty((max(size, 2 * len(self._data)), 2))
+            data[: self._size] = self.array
+            self._data = data
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for x, y in self.array.tolist():
+            yield QtCore.QPointF(x, y)
+
+    def __reversed__(self):
+        for x, y in self.array[::-1].tolist():
+            yield QtCore.QPointF(x, y)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [QtCore.QPointF(x, y) for x, y in self.array[key].tolist()]
+        x, y = self.array[key].tolist()
+        return QtCore.QPointF(x, y)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            points = self[:]
+            points[key] = value
+            self._set(_to_array(points))
+        else:
+            self.array[key] = _to_pair(value)
+            self.shape.invalidate()
+
+    def __delitem__(self, key):
+        self._set(np.delete(self.array, range(self._size)[key], axis=0))
+
+    def __eq__(self, other):
+        if isinstance(other, _ShapePoints):
+            return np.array_equal(self.array, other.array)
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._size and all(
+                p == q for p, q in zip(self, other)
+            )
+        return NotImplemented
+
+    def __contains__(self, point):
+        return any(p == point for p in self)
+
+    def __add__(self, points):
+        return self[:] + list(points)
+
+    def __radd__(self, points):
+        return list(points) + self[:]
+
+    def __iadd__(self, points):
+        self.extend(points)
+        return self
+
+    def __repr__(self):
+        return repr(self[:])
+
+    def index(self, point):
+        for i, p in enumerate(self):
+            if p == point:
+                return i
+        raise ValueError(f"{point} is not in points")
+
+    def count(self, point):
+        return sum(p == point for p in self)
+
+    def copy(self):
+        return self[:]
+
+    def append(self, point):
+        self._reserve(self._size + 1)
+        self._data[self._size] = _to_pair(point)
+        self._size += 1
+        self.shape.invalidate()
+
+    def extend(self, points):
+        array = _to_array(points)
+        self._reserve(self._size + len(array))
+        self._data[self._size : self._size + len(array)] = array
+        self._size += len(array)
+        self.shape.invalidate()
+
+    def insert(self, index, point):
+        # Clamp the index like list.insert
+        if index < 0:
+            index = max(0, self._size + index)
+        index = min(index, self._size)
+        self._set(np.insert(self.array, index, _to_pair(point), axis=0))
+
+    def pop(self, index=-1):
+        point = self[index]
+        del self[index]
+        return point
+
+    def remove(self, point):
+        del self[self.index(point)]
+
+    def clear(self):
+        self._set(np.empty((0, 2)))
+
+    def reverse(self):
+        self._set(self.array[::-1].copy())
+
+    def translate(self, dx, dy):
+        """Move all points by (dx, dy)"""
+        self.array[:] += (dx, dy)
+        self.shape.invalidate()
+
+    def to_polygon(self, start=None, end=None):
+        """
+        QPolygonF of the points, optionally with an extra `start` and `end`
+        point, filled from the array without creating a QPointF per point.
+        """
+        array = self.array
+        if start is not None or end is not None:
+            parts = [array]
+            if start is not None:
+                parts.insert(0, np.array([_to_pair(start)]))
+            if end is not None:
+                parts.append(np.array([_to_pair(end)]))
+            array = np.concatenate(parts)
+        polygon = QtGui.QPolygonF(len(array))
+        if len(array):
+            data = polygon.data()
+            data.setsize(array.nbytes)
+            np.frombuffer(data, dtype=np.float64).reshape(-1, 2)[:] = array
+        return polygon
+
+
 class Shape:
     """Shape data type"""
 
@@ -71,6 +252,12 @@ class Shape:
         attributes={},
         kie_linking=[],
     ):
+        # Path used for hit-testing and the spatial index holding the shape
+        self._path = None
+        # Counts changes of the points, for the undo history
+        self._revision = 0
+        self._line_path = None
+        self._shape_index = None
         self.label = label
         self.score = score
         self.group_id = group_id
@@ -115,7 +302,7 @@ class Shape:
         dictData = {
             "label": self.label,
             "score": self.score,
-            "points": [(p.x(), p.y()) for p in self.points],
+            "points": [tuple(p) for p in self.points.array.tolist()],
             "group_id": self.group_id,
             "description": self.description,
             "difficult": self.difficult,
@@ -135,7 +322,7 @@ class Shape:
     def load_from_dict(self, data: dict, close=True):
         self.label = data["label"]
         self.score = data.get("score")
-        self.points = [QtCore.QPointF(p[0], p[1]) for p in data["points"]]
+        self.points = data["points"]
         self.group_id = data.get("group_id")
         self.description = data.get("description", "")
         self.difficult = data.get("difficult", False)
@@ -150,6 +337,39 @@ class Shape:
             self.close()
         return self
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_path"] = None
+        state["_line_path"] = None
+        state["_shape_index"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._points = _ShapePoints(self, self._points)
+
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        self._points = _ShapePoints(self, points)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop the cached paths of the shape. Assigning, appending or removing
+        points calls this, e.g. `points[i] = QPointF(...)`. Call it only
+        after writing to `points.array` directly, since `points[i]` returns
+        a new QPointF and changing it with `setX` does not change the shape.
+        """
+        self._path = None
+        self._line_path = None
+        self._revision += 1
+        if self._shape_index is not None:
+            self._shape_index.invalidate(self)
+
     @property
     def shape_type(self):
         """Get shape type (polygon, rectangle, rotation, point, line, ...)"""
@@ -163,6 +383,7 @@ class Shape:
         if value not in self.get_supported_shape():
             raise ValueError(f"Unexpected shape_type: {value}")
         self._shape_type = value
+        self.invalidate()
 
     @staticmethod
     def get_supported_shape():
@@ -243,64 +464,34 @@ class Shape:
             pen.setWidth(max(1, int(round(self.line_width / self.scale))))
             painter.setPen(pen)
 
-            line_path = QtGui.QPainterPath()
+            line_path = self.get_line_path()
             vrtx_path = QtGui.QPainterPath()
 
-            if self.shape_type == "rectangle":
+            if self.shape_type in ["rectangle", "rotation"]:
                 assert len(self.points) in [1, 2, 4]
-                if len(self.points) == 2:
-                    rectangle = self.get_rect_from_line(*self.points)
-                    line_path.addRect(rectangle)
-                if len(self.points) == 4:
-                    line_path.moveTo(self.points[0])
-                    for i, p in enumerate(self.points):
-                        line_path.lineTo(p)
-                        if self.selected:
-                            self.draw_vertex(vrtx_path, i)
-                    if self.is_closed() or self.label is not None:
-                        line_path.lineTo(self.points[0])
-            elif self.shape_type == "rotation":
-                assert len(self.points) in [1, 2, 4]
-                if len(self.points) == 2:
-                    rectangle = self.get_rect_from_line(*self.points)
-                    line_path.addRect(rectangle)
-                if len(self.points) == 4:
-                    line_path.moveTo(self.points[0])
-                    for i, p in enumerate(self.points):
-                        line_path.lineTo(p)
-                        if self.selected:
-                            self.draw_vertex(vrtx_path, i)
-                    if self.is_closed() or self.label is not None:
-                        line_path.lineTo(self.points[0])
+                if len(self.points) == 4 and self.selected:
+                    for i in range(len(self.points)):
+                        self.draw_vertex(vrtx_path, i)
             elif self.shape_type == "circle":
                 assert len(self.points) in [1, 2]
-                if len(self.points) == 2:
-                    rectangle = self.get_circle_rect_from_line(self.points)
-                    line_path.addEllipse(rectangle)
                 if self.selected:
                     for i in range(len(self.points)):
                         self.draw_vertex(vrtx_path, i)
             elif self.shape_type == "linestrip":
-                line_path.moveTo(self.points[0])
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
+                for i in range(len(self.points)):
                     self.draw_vertex(vrtx_path, i)
             elif self.shape_type == "point":
                 assert len(self.points) == 1
                 self.draw_vertex(vrtx_path, 0, True)
             else:
-                line_path.moveTo(self.points[0])
                 # Uncommenting the following line will draw 2 paths
                 # for the 1st vertex, and make it non-filled, which
                 # may be desirable.
                 self.draw_vertex(vrtx_path, 0)
 
-                for i, p in enumerate(self.points):
-                    line_path.lineTo(p)
-                    if self.selected:
+                if self.selected:
+                    for i in range(len(self.points)):
                         self.draw_vertex(vrtx_path, i)
-                if self.is_closed():
-                    line_path.lineTo(self.points[0])
 
             painter.drawPath(line_path)
             painter.drawPath(vrtx_path)
@@ -314,6 +505,35 @@ class Shape:
                 )
                 painter.fillPath(line_path, color)
 
+    def get_line_path(self):
+        """Outline painted for the shape, cached until its points change"""
+        key = (self.is_closed(), self.label is not None)
+        if self._line_path is not None and self._line_path[0] == key:
+            return self._line_path[1]
+        line_path = QtGui.QPainterPath()
+        if self.shape_type in ["rectangle", "rotation"]:
+            if len(self.points) == 2:
+                rectangle = self.get_rect_from_line(*self.points)
+                line_path.addRect(rectangle)
+            if len(self.points) == 4:
+                closed = self.is_closed() or self.label is not None
+                line_path.addPolygon(self._outline(closed))
+        elif self.shape_type == "circle":
+            if len(self.points) == 2:
+                rectangle = self.get_circle_rect_from_line(self.points)
+                line_path.addEllipse(rectangle)
+        elif self.shape_type == "linestrip":
+            line_path.addPolygon(self._outline(False))
+        elif self.shape_type != "point":
+            line_path.addPolygon(self._outline(self.is_closed()))
+        self._line_path = (key, line_path)
+        return line_path
+
+    def _outline(self, closed):
+        # The outline starts with a zero length segment on the first point
+        first = self.points[0]
+        return self.points.to_polygon(first, first if closed else None)
+
     def draw_vertex(self, path, i, show_difficult=False):
         """Draw a vertex"""
         d = self.point_size / self.scale
@@ -357,30 +577,49 @@ class Shape:
         """Find the index of the nearest vertex to a point
         Only consider if the distance is smaller than epsilon
         """
-        min_distance = float("inf")
-        min_i = None
-        for i, p in enumerate(self.points):
-            dist = utils.distance(p - point)
-            if dist <= epsilon and dist < min_distance:
-                min_distance = dist
-                min_i = i
-        return min_i
+        if not self.points:
+            return None
+        offsets = self.points.array - (point.x(), point.y())
+        distances = np.sqrt(
+            offsets[:, 0] * offsets[:, 0] + offsets[:, 1] * offsets[:, 1]
+        )
+        i = int(np.argmin(distances))
+        return i if distances[i] <= epsilon else None
 
     def nearest_edge(self, point, epsilon):
         """Get nearest edge index"""
-        min_distance = float("inf")
-        post_i = None
-        for i in range(len(self.points)):
-            line = [self.points[i - 1], self.points[i]]
-            dist = utils.distance_to_line(point, line)
-            if dist <= epsilon and dist < min_distance:
-                min_distance = dist
-                post_i = i
-        return post_i
+        if not self.points:
+            return None
+        # Edge i goes from point i - 1 to point i, as in distance_to_line
+        p2 = self.points.array
+        p1 = np.roll(p2, 1, axis=0)
+        p3 = np.array([point.x(), point.y()])
+        edge = p2 - p1
+        length = np.linalg.norm(edge, axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            distances = np.where(
+                ((p3 - p1) * edge).sum(axis=1) < 0,
+                np.linalg.norm(p3 - p1, axis=1),
+                np.where(
+                    ((p3 - p2) * -edge).sum(axis=1) < 0,
+                    np.linalg.norm(p3 - p2, axis=1),
+                    np.where(
+                        length == 0,
+                        0.0,
+                        np.abs(
+                            edge[:, 0] * (p1[:, 1] - p3[1])
+                            - edge[:, 1] * (p1[:, 0] - p3[0])
+                        )
+                        / length,
+                    ),
+                ),
+            )
+        i = int(np.argmin(distances))
+        return i if distances[i] <= epsilon else None
 
     def contains_point(self, point):
         """Check if shape contains a point"""
-        return self.make_path().contains(point)
+        return self.get_path().contains(point)
 
     def get_circle_rect_from_line(self, line):
         """Computes parameters to draw with `QPainterPath::addEllipse`"""
@@ -394,28 +633,38 @@ class Shape:
 
     def make_path(self):
         """Create a path from shape"""
-        if self.shape_type == "rectangle":
-            path = QtGui.QPainterPath(self.points[0])
-            for p in self.points[1:]:
-                path.lineTo(p)
-        elif self.shape_type == "circle":
-            path = QtGui.QPainterPath()
+        path = QtGui.QPainterPath()
+        if self.shape_type == "circle":
             if len(self.points) == 2:
                 rectangle = self.get_circle_rect_from_line(self.points)
                 path.addEllipse(rectangle)
         else:
-            path = QtGui.QPainterPath(self.points[0])
-            for p in self.points[1:]:
-                path.lineTo(p)
+            path.addPolygon(self.points.to_polygon())
         return path
 
+    def get_path(self):
+        """Path of the shape, cached until its points change"""
+        if self._path is None:
+            self._path = self.make_path()
+        return self._path
+
     def bounding_rect(self):
         """Return bounding rectangle of the shape"""
-        return self.make_path().boundingRect()
+        return self.get_path().boundingRect()
 
     def move_by(self, offset):
         """Move all points by an offset"""
-        self.points = [p + offset for p in self.points]
+        self.points.translate(offset.x(), offset.y())
+
+    def rotate_by(self, theta, center):
+        """Rotate all points by `theta` radians around `center`"""
+        array = self.points.array
+        dx = array[:, 0] - center.x()
+        dy = array[:, 1] - center.y()
+        cos_theta, sin_theta = math.cos(theta), math.sin(theta)
+        array[:, 0] = center.x() + (cos_theta * dx + sin_theta * dy)
+        array[:, 1] = center.y() + (-sin_theta * dx + cos_theta * dy)
+        self.invalidate()
 
     def move_vertex_by(self, i, offset):
         """Move a specific vertex by an offset"""
@@ -4,6 +4,13 @@ from .async_exif import AsyncExifScanner, ExifProcessingDialog
 from .batch import run_all_images
 from .colormap import label_colormap
 from .crop import save_crop
+from .folder_index import (
+    AsyncFolderIndexer,
+    FolderIndex,
+    LabelIndex,
+    get_label_buckets,
+    has_actual_annotations,
+)
 from .export import (
     export_yolo_annotation,
     export_voc_annotation,
@@ -1,10 +1,8 @@
-import base64
-import json
+import threading
 import os.path as osp
-from PIL import Image
 
 from PyQt5 import QtWidgets
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
 from PyQt5.QtWidgets import (
     QVBoxLayout,
     QProgressDialog,
@@ -14,14 +12,16 @@ from PyQt5.QtWidgets import (
     QDialogButtonBox,
 )
 
-from anylabeling.app_info import __version__
 from anylabeling.services.auto_labeling import (
     _BATCH_PROCESSING_INVALID_MODELS,
     _BATCH_PROCESSING_TEXT_PROMPT_MODELS,
     _BATCH_PROCESSING_VIDEO_MODELS,
 )
 from anylabeling.views.labeling.logger import logger
-from anylabeling.views.labeling.utils._io import io_open
+from anylabeling.views.labeling.utils.batch_pipeline import (
+    BatchPipeline,
+    write_label_file,
+)
 from anylabeling.views.labeling.utils.qt import new_icon_path
 from anylabeling.views.labeling.utils.style import get_msg_box_style
 from anylabeling.views.labeling.widgets.popup import Popup
@@ -131,11 +131,6 @@ class TextInputDialog(QDialog):
         return ""
 
 
-def get_image_size(image_path):
-    with Image.open(image_path) as img:
-        return img.size
-
-
 def finish_processing(self, progress_dialog):
     self.filename = self.image_list[self.current_index]
     self.import_image_folder(osp.dirname(self.filename))
@@ -161,59 +156,12 @@ def cancel_operation(self):
 
 def save_auto_labeling_result(self, image_file, auto_labeling_result):
     try:
-        label_file = osp.splitext(image_file)[0] + ".json"
-        if self.output_dir:
-            label_file = osp.join(self.output_dir, osp.basename(label_file))
-
-        if auto_labeling_result is None:
-            new_shapes = []
-            new_description = ""
-            replace = True
-        else:
-            new_shapes = [
-                shape.to_dict() for shape in auto_labeling_result.shapes
-            ]
-            new_description = auto_labeling_result.description
-            replace = auto_labeling_result.replace
-
-        if osp.exists(label_file):
-            with io_open(label_file, "r") as f:
-                data = json.load(f)
-
-            if replace:
-                data["shapes"] = new_shapes
-                data["description"] = new_description
-            else:
-                data["shapes"].extend(new_shapes)
-                if "description" in data:
-                    data["description"] += new_description
-                else:
-                    data["description"] = new_description
-        else:
-            if self._config["store_data"]:
-                with open(image_file, "rb") as f:
-                    image_data = f.read()
-                image_data = base64.b64encode(image_data).decode("utf-8")
-            else:
-                image_data = None
-
-            image_path = osp.basename(image_file)
-            image_width, image_height = get_image_size(image_file)
-
-            data = {
-                "version": __version__,
-                "flags": {},
-                "shapes": new_shapes,
-                "imagePath": image_path,
-                "imageData": image_data,
-                "imageHeight": image_height,
-                "imageWidth": image_width,
-                "description": new_description,
-            }
-
-        with io_open(label_file, "w") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
+        write_label_file(
+            image_file,
+            auto_labeling_result,
+            output_dir=self.output_dir,
+            store_data=self._config["store_data"],
+        )
     except Exception as e:
         logger.error(
             f"Failed to save auto labeling result for image file '{image_file}': {str(e)}"
@@ -287,6 +235,91 @@ def process_next_image(self, progress_dialog):
         popup.show_popup(self, position="center")
 
 
+class BatchPipelineSignals(QObject):
+    """Forwards pipeline events from worker threads to the GUI thread."""
+
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+
+
+def predict_image_files(self, image_files):
+    model_manager = self.auto_labeling_widget.model_manager
+    if len(image_files) > 1:
+        return model_manager.predict_shapes_batch(
+            [self.image] * len(image_files), image_files
+        )
+
+    image_file = image_files[0]
+    if self.text_prompt:
+        auto_labeling_result = model_manager.predict_shapes(
+            self.image, image_file, text_prompt=self.text_prompt, batch=True
+        )
+    elif self.run_tracker:
+        auto_labeling_result = model_manager.predict_shapes(
+            self.image, image_file, run_tracker=self.run_tracker, batch=True
+        )
+    else:
+        auto_labeling_result = model_manager.predict_shapes(
+            self.image, image_file, batch=True
+        )
+    return [auto_labeling_result]
+
+
+def process_images_in_pipeline(self, progress_dialog):
+    """Decode, infer and write label files in background stages, keeping
+    the GUI responsive while all images are processed."""
+    start_index = self.image_index
+    batch_size = 1
+    if not self.text_prompt and not self.run_tracker:
+        batch_size = self.auto_labeling_widget.model_manager.get_batch_size()
+
+    signals = BatchPipelineSignals()
+    pipeline = BatchPipeline(
+        self.image_list[start_index:],
+        predict=lambda image_files: predict_image_files(self, image_files),
+        save=lambda image_file, result: save_auto_labeling_result(
+            self, image_file, result
+        ),
+        batch_size=batch_size,
+        is_cancelled=lambda: self.cancel_processing,
+        on_progress=signals.progress.emit,
+    )
+
+    def on_progress(num_done):
+        self.image_index = start_index + num_done
+        progress_dialog.setValue(self.image_index - 1)
+
+    def on_finished(error):
+        self.batch_pipeline_signals = None
+        if error is None:
+            finish_processing(self, progress_dialog)
+            return
+
+        progress_dialog.close()
+
+        logger.error(f"Error occurred while processing images: {error}")
+        popup = Popup(
+            self.tr("Error occurred while processing images!"),
+            self,
+            icon=new_icon_path("error", "svg"),
+        )
+        popup.show_popup(self, position="center")
+
+    def run_pipeline():
+        try:
+            pipeline.run()
+        except Exception as e:  # noqa
+            signals.finished.emit(e)
+        else:
+            signals.finished.emit(None)
+
+    signals.progress.connect(on_progress)
+    signals.finished.connect(on_finished)
+    # Keep a reference until the pipeline finished
+    self.batch_pipeline_signals = signals
+    threading.Thread(target=run_pipeline, daemon=True).start()
+
+
 def show_progress_dialog_and_process(self):
     self.cancel_processing = False
 
@@ -373,7 +406,19 @@ def show_progress_dialog_and_process(self):
     progress_dialog.canceled.connect(lambda: cancel_operation(self))
     progress_dialog.show()
 
-    QTimer.singleShot(200, lambda: process_next_image(self, progress_dialog))
+    if (
+        self.auto_labeling_widget.model_manager.loaded_model_config["type"]
+        in _BATCH_PROCESSING_VIDEO_MODELS
+    ):
+        # Video models load every frame into the canvas, so they have to
+        # run sequentially on the GUI thread.
+        QTimer.singleShot(
+            200, lambda: process_next_image(self, progress_dialog)
+        )
+    else:
+        QTimer.singleShot(
+            200, lambda: process_images_in_pipeline(self, progress_dialog)
+        )
 
 
 def run_all_images(self):
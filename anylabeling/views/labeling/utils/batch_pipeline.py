@@ -0,0 +1,295 @@
+import base64
+import json
+import os
+import os.path as osp
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from anylabeling.app_info import __version__
+from anylabeling.views.labeling.logger import logger
+from anylabeling.views.labeling.utils._io import io_open
+from anylabeling.views.labeling.utils.opencv import (
+    decode_rgb_cv_img,
+    pinned_cv_images,
+)
+
+__all__ = ["BatchPipeline", "write_label_file"]
+
+_STOP = object()
+
+
+def decode_image(image_file):
+    """Decode an image file into an 8bit RGB array."""
+    # Images are pinned while they are used, so they do not need to
+    # go through the shared decoded image cache
+    return decode_rgb_cv_img(image_file)
+
+
+def get_image_size(image_path):
+    with Image.open(image_path) as img:
+        return img.size
+
+
+def write_label_file(
+    image_file, auto_labeling_result, output_dir=None, store_data=False
+):
+    """Write an auto labeling result to the label file of an image.
+
+    An existing label file is updated in place: its shapes are replaced or
+    extended, depending on `auto_labeling_result.replace`.
+    """
+    label_file = osp.splitext(image_file)[0] + ".json"
+    if output_dir:
+        label_file = osp.join(output_dir, osp.basename(label_file))
+
+    if auto_labeling_result is None:
+        new_shapes = []
+        new_description = ""
+        replace = True
+    else:
+        new_shapes = [shape.to_dict() for shape in auto_labeling_result.shapes]
+        new_description = auto_labeling_result.description
+        replace = auto_labeling_result.replace
+
+    if osp.exists(label_file):
+        with io_open(label_file, "r") as f:
+            data = json.load(f)
+
+        if replace:
+            data["shapes"] = new_shapes
+            data["description"] = new_description
+        else:
+            data["shapes"].extend(new_shapes)
+            if "description" in data:
+                data["description"] += new_description
+            else:
+                data["description"] = new_description
+    else:
+        if store_data:
+            with open(image_file, "rb") as f:
+                image_data = f.read()
+            image_data = base64.b64encode(image_data).decode("utf-8")
+        else:
+            image_data = None
+
+        image_path = osp.basename(image_file)
+        image_width, image_height = get_image_size(image_file)
+
+        data = {
+            "version": __version__,
+            "flags": {},
+            "shapes": new_shapes,
+            "imagePath": image_path,
+            "imageData": image_data,
+            "imageHeight": image_height,
+            "imageWidth": image_width,
+            "description": new_description,
+        }
+
+    with io_open(label_file, "w") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class BatchPipeline:
+    """Staged decode -> inference -> write pipeline for batch labeling.
+
+    A thread pool decodes images ahead of the inference stage, which runs
+    the model on the calling thread and hands results to a writer thread.
+    The stages are connected by bounded queues, so a slow stage applies
+    backpressure instead of letting decoded images or results pile up.
+
+    Args:
+        image_files (list): Image paths to process, in order.
+        predict (callable): Takes a list of image paths and returns one
+            auto labeling result per path. Decoded images are pinned
+            while it runs, so `qt_img_to_rgb_cv_img` does not decode again.
+        save (callable): Takes an image path and its result.
+        batch_size (int): Number of images passed to `predict` at once.
+        num_workers (int): Number of decoding threads.
+        queue_size (int): Capacity of each queue between two stages.
+        is_cancelled (callable): Polled by every stage, returns True to stop.
+        on_progress (callable): Called from the writer thread with the
+            number of images written so far.
+        decode (callable): Takes an image path and returns the decoded image.
+    """
+
+    def __init__(
+        self,
+        image_files,
+        predict,
+        save,
+        batch_size=1,
+        num_workers=None,
+        queue_size=8,
+        is_cancelled=None,
+        on_progress=None,
+        decode=decode_image,
+    ):
+        self.image_files = list(image_files)
+        self.predict = predict
+        self.save = save
+        self.batch_size = max(int(batch_size), 1)
+        self.num_workers = num_workers or min(4, os.cpu_count() or 1)
+        self.queue_size = max(queue_size, self.batch_size)
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.on_progress = on_progress
+        self.decode = decode
+
+        self.num_done = 0
+        self.timings = {"decode": 0.0, "inference": 0.0, "write": 0.0}
+        self._timings_lock = threading.Lock()
+        self._error = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Run all stages and block until they finished.
+
+        Returns:
+            dict: Number of processed images, wall time and the time spent
+            in each stage. Decoding time is summed over all workers.
+        """
+        start_time = time.perf_counter()
+        decode_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+
+        with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+            feeder = threading.Thread(
+                target=self._feed, args=(executor, decode_queue), daemon=True
+            )
+            writer = threading.Thread(
+                target=self._write, args=(write_queue,), daemon=True
+            )
+            feeder.start()
+            writer.start()
+            try:
+                self._infer(decode_queue, write_queue)
+            except Exception as e:  # noqa
+                self._fail(e)
+            finally:
+                drop_pending = self._should_stop()
+                self._stopped.set()
+                # Unblock the feeder if it waits on a full queue
+                while feeder.is_alive():
+                    try:
+                        decode_queue.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                self._stop_writer(writer, write_queue, drop_pending)
+
+        stats = {
+            "num_images": self.num_done,
+            "total": time.perf_counter() - start_time,
+            **self.timings,
+        }
+        logger.info(
+            "Batch processing finished: {num_images} images in {total:.2f}s "
+            "(decode {decode:.2f}s, inference {inference:.2f}s, "
+            "write {write:.2f}s)".format(**stats)
+        )
+        if self._error is not None:
+            raise self._error
+        return stats
+
+    def _feed(self, executor, decode_queue):
+        for image_file in self.image_files:
+            if self._should_stop():
+                break
+            future = executor.submit(self._decode, image_file)
+            if not self._put(decode_queue, (image_file, future)):
+                future.cancel()
+                break
+        self._put(decode_queue, _STOP)
+
+    def _decode(self, image_file):
+        start_time = time.perf_counter()
+        try:
+            return self.decode(image_file)
+        except Exception as e:  # noqa
+            logger.warning(f"Could not decode {image_file}: {e}")
+            return None
+        finally:
+            self._add_time("decode", start_time)
+
+    def _infer(self, decode_queue, write_queue):
+        finished = False
+        while not finished and not self._should_stop():
+            image_files, cv_images = [], {}
+            while len(image_files) < self.batch_size:
+                item = decode_queue.get()
+                if item is _STOP:
+                    finished = True
+                    break
+                image_file, future = item
+                cv_image = future.result()
+                image_files.append(image_file)
+                if cv_image is not None:
+                    cv_images[image_file] = cv_image
+            if not image_files or self._should_stop():
+                break
+
+            start_time = time.perf_counter()
+            with pinned_cv_images(cv_images):
+                results = self.predict(image_files)
+            self._add_time("inference", start_time)
+
+            for image_file, result in zip(image_files, results):
+                if not self._put(write_queue, (image_file, result)):
+                    return
+
+    def _write(self, write_queue):
+        while True:
+            item = write_queue.get()
+            if item is _STOP:
+                break
+            image_file, result = item
+            start_time = time.perf_counter()
+            try:
+                self.save(image_file, result)
+            except Exception as e:  # noqa
+                self._fail(e)
+                break
+            finally:
+                self._add_time("write", start_time)
+            self.num_done += 1
+            if self.on_progress is not None:
+                self.on_progress(self.num_done)
+
+    def _stop_writer(self, writer, write_queue, drop_pending):
+        """Let the writer flush pending results, or drop them if cancelled."""
+        while writer.is_alive():
+            try:
+                write_queue.put(_STOP, timeout=0.1)
+                break
+            except queue.Full:
+                if drop_pending or self._error is not None:
+                    try:
+                        write_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+        writer.join()
+
+    def _put(self, target_queue, item):
+        """Put an item into a bounded queue, giving up once stopped."""
+        while True:
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stopped.is_set():
+                    return False
+
+    def _should_stop(self):
+        return self._stopped.is_set() or self.is_cancelled()
+
+    def _fail(self, error):
+        if self._error is None:
+            self._error = error
+        self._stopped.set()
+
+    def _add_time(self, stage, start_time):
+        with self._timings_lock:
+            self.timings[stage] += time.perf_counter() - start_time
@@ -0,0 +1,461 @@
+import hashlib
+import json
+import os
+import os.path as osp
+import sqlite3
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from ...labeling.logger import logger
+from .qt import scan_all_images
+
+DEFAULT_FOLDER_INDEX_DIR = osp.join(
+    osp.expanduser("~"), "xanylabeling_data", "folder_index"
+)
+
+# Special buckets of the file label filter
+OK_LABEL = "[OK]"  # Empty annotation, e.g. an image without defects
+IGNORE_LABEL = "[ignore]"  # VisionMaster XML with an empty <flags> element
+UNANNOTATED_LABEL = "[未标注]"  # No annotation file at all
+
+_CHUNK_SIZE = 512
+_SCHEMA_VERSION = 2
+
+
+def has_actual_annotations(annotation_file):
+    """Check if annotation file has actual annotation content
+
+    Returns True if file has annotations, False if empty or doesn't exist.
+    This is used to determine the checkmark state in the file list.
+    """
+    if not osp.exists(annotation_file):
+        return False
+
+    # Check file extension
+    ext = osp.splitext(annotation_file)[1].lower()
+
+    if ext == ".xml":
+        # For XML, check if it has actual annotation data
+        try:
+            # Empty file means OK annotation (no defects)
+            if osp.getsize(annotation_file) == 0:
+                return True  # Empty XML = OK annotation, marked as annotated
+
+            tree = ET.parse(annotation_file)
+            root = tree.getroot()
+
+            # Check for VisionMaster XML format
+            items_data = root.find("_ItemsData")
+            if items_data is not None:
+                # VisionMaster format - check if _ItemsData has children
+                # Empty <_ItemsData /> means no annotations
+                return len(items_data) > 0
+            else:
+                # Standard PASCAL VOC format - check for objects
+                objects = root.findall(".//object")
+                return len(objects) > 0
+
+        except Exception as e:
+            logger.warning(
+                f"Error checking XML annotations {annotation_file}: {e}"
+            )
+            return False
+
+    elif ext == ".json":
+        # For JSON, check if shapes array is not empty
+        try:
+            with open(annotation_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            shapes = data.get("shapes", [])
+            return len(shapes) > 0
+        except Exception as e:
+            logger.warning(
+                f"Error checking JSON annotations {annotation_file}: {e}"
+            )
+            return False
+
+    # Unknown format, assume has annotation if file exists
+    return True
+
+
+def get_label_buckets(image_file, output_dir=None):
+    """Return the labels of an image plus the special filter buckets.
+
+    An XML annotation takes precedence over a JSON one, and a file in
+    `output_dir` over one next to the image. Images without annotation
+    file fall into UNANNOTATED_LABEL.
+    """
+    base_path = osp.splitext(image_file)[0]
+    for ext, get_buckets in (
+        (".xml", _get_xml_label_buckets),
+        (".json", _get_json_label_buckets),
+    ):
+        label_file = base_path + ext
+        if output_dir:
+            alt_label_file = osp.join(
+                output_dir, osp.basename(base_path) + ext
+            )
+            if osp.exists(alt_label_file):
+                label_file = alt_label_file
+        if osp.exists(label_file):
+            return get_buckets(label_file)
+    return {UNANNOTATED_LABEL}
+
+
+def _get_xml_label_buckets(xml_file):
+    buckets = set()
+    try:
+        # Empty file means OK annotation (no defects)
+        if osp.getsize(xml_file) == 0:
+            return {OK_LABEL}
+        root = ET.parse(xml_file).getroot()
+    except Exception as e:
+        logger.warning(f"Error loading labels from XML {xml_file}: {e}")
+        return buckets
+
+    # Check for VisionMaster XML format
+    items_data = root.find("_ItemsData")
+    if items_data is not None:
+        if len(items_data) == 0:
+            buckets.add(OK_LABEL)
+        # Covers all parameter types: FlawCoverRoiParameter,
+        # FlawPolygonRoiParameter, etc.
+        for flags_elem in items_data.iter("flags"):
+            if flags_elem.text and flags_elem.text.strip():
+                buckets.add(flags_elem.text.strip())
+            else:
+                buckets.add(IGNORE_LABEL)
+    else:
+        # Standard PASCAL VOC format
+        objects = root.findall(".//object")
+        if not objects:
+            buckets.add(OK_LABEL)
+        for obj in objects:
+            name_elem = obj.find("name")
+            if name_elem is not None and name_elem.text:
+                buckets.add(name_elem.text.strip())
+    return buckets
+
+
+def _get_json_label_buckets(json_file):
+    buckets = set()
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        shapes = data.get("shapes", [])
+    except Exception as e:
+        logger.warning(f"Error loading labels from JSON {json_file}: {e}")
+        return buckets
+
+    if not shapes:
+        buckets.add(OK_LABEL)
+    for shape in shapes:
+        label = shape.get("label")
+        if label:
+            buckets.add(label)
+    return buckets
+
+
+class LabelIndex:
+    """Inverted index from label (or special bucket) to image files.
+
+    Used by the file label filter, so that changing the filter is a set
+    lookup instead of parsing every annotation file again.
+    """
+
+    def __init__(self):
+        self._files = defaultdict(set)
+        self._labels = {}
+
+    def __contains__(self, image_file):
+        return image_file in self._labels
+
+    def clear(self):
+        self._files.clear()
+        self._labels.clear()
+
+    def update(self, image_file, labels):
+        """Set the labels of an image, replacing the previous ones"""
+        for label in self._labels.pop(image_file, ()):
+            self._files[label].discard(image_file)
+        self._labels[image_file] = set(labels)
+        for label in labels:
+            self._files[label].add(image_file)
+
+    def get_files(self, label):
+        """Return the indexed image files that have the label"""
+        return self._files.get(label, set())
+
+
+def get_label_files(image_file, label_suffix, output_dir=None):
+    """Return the label file of an image and its alternate format file"""
+    base_name = osp.splitext(image_file)[0]
+    alt_suffix = ".json" if label_suffix == ".xml" else ".xml"
+    label_files = []
+    for suffix in (label_suffix, alt_suffix):
+        label_file = base_name + suffix
+        if output_dir:
+            label_file = output_dir + "/" + osp.basename(label_file)
+        label_files.append(label_file)
+    return label_files
+
+
+def get_label_stamp(image_file, output_dir=None):
+    """Return a string that changes whenever a label file of an image does"""
+    base_path = osp.splitext(image_file)[0]
+    label_files = [base_path + ".xml", base_path + ".json"]
+    if output_dir:
+        label_files += [
+            osp.join(output_dir, osp.basename(label_file))
+            for label_file in label_files
+        ]
+    parts = []
+    for label_file in label_files:
+        try:
+            stat = os.stat(label_file)
+            parts.append(f"{label_file}:{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            parts.append(f"{label_file}:-")
+    return "|".join(parts)
+
+
+class FolderIndex:
+    """Persistent index of the images in a folder.
+
+    Stores the sorted image list, and the annotation status and labels of
+    every image in a SQLite file under `~/xanylabeling_data/folder_index`,
+    one file per folder. Both are stored together with a stamp of the
+    label files (path, mtime and size), so only images whose label files
+    changed since the last scan have to be parsed again.
+    """
+
+    def __init__(self, dirpath, index_dir=None):
+        self.dirpath = osp.normpath(osp.abspath(dirpath))
+        name = hashlib.sha1(self.dirpath.encode("utf-8")).hexdigest()
+        self.index_file = osp.join(
+            index_dir or DEFAULT_FOLDER_INDEX_DIR, f"{name}.sqlite"
+        )
+
+    def load(self):
+        """Return {image path: (label stamp, has annotation, labels)} in
+        image order.
+
+        Returns an empty dict if the folder was never indexed or the index
+        cannot be read.
+        """
+        if not osp.exists(self.index_file):
+            return {}
+        try:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    "SELECT path, label_stamp, has_annotation, labels "
+                    "FROM images ORDER BY position"
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read folder index: {e}")
+            return {}
+        return {
+            path: (stamp, bool(has), json.loads(labels))
+            for path, stamp, has, labels in rows
+        }
+
+    def save(self, entries):
+        """Replace the index with {image path: (label stamp, has annotation,
+        labels)}"""
+        try:
+            os.makedirs(osp.dirname(self.index_file), exist_ok=True)
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM images")
+                conn.executemany(
+                    "INSERT INTO images VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (path, position, stamp, int(has), json.dumps(labels))
+                        for position, (
+                            path,
+                            (stamp, has, labels),
+                        ) in enumerate(entries.items())
+                    ),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write folder index: {e}")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_file, timeout=10)
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != _SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS images")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            "path TEXT PRIMARY KEY, position INTEGER, "
+            "label_stamp TEXT, has_annotation INTEGER, labels TEXT)"
+        )
+        return conn
+
+
+class FolderIndexWorker(QObject):
+    images_scanned = pyqtSignal(list)
+    annotations_checked = pyqtSignal(dict)
+    labels_checked = pyqtSignal(dict)
+    scan_finished = pyqtSignal()
+
+    def __init__(
+        self,
+        index: FolderIndex,
+        shown_files: List[str],
+        label_suffix: str,
+        output_dir: Optional[str] = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.index = index
+        self.shown_files = shown_files
+        self.label_suffix = label_suffix
+        self.output_dir = output_dir
+        self._should_stop = False
+        self.finished = False
+
+    def stop(self):
+        self._should_stop = True
+
+    def scan_files(self):
+        try:
+            self._scan_files()
+        except Exception as e:  # noqa
+            logger.error(f"Error indexing folder {self.index.dirpath}: {e}")
+        self.finished = True
+        self.scan_finished.emit()
+
+    def _scan_files(self):
+        cached = self.index.load()
+        image_files = scan_all_images(
+            self.index.dirpath, should_stop=lambda: self._should_stop
+        )
+        if self._should_stop:
+            return
+        if image_files != self.shown_files:
+            self.images_scanned.emit(image_files)
+
+        entries = {}
+        changed: Dict[str, bool] = {}
+        changed_labels: Dict[str, List[str]] = {}
+        for image_file in image_files:
+            if self._should_stop:
+                return
+            stamp = get_label_stamp(image_file, self.output_dir)
+            cached_stamp, has_annotation, labels = cached.get(
+                image_file, (None, None, None)
+            )
+            if stamp != cached_stamp:
+                has_annotation = any(
+                    has_actual_annotations(label_file)
+                    for label_file in get_label_files(
+                        image_file, self.label_suffix, self.output_dir
+                    )
+                )
+                labels = sorted(get_label_buckets(image_file, self.output_dir))
+                changed[image_file] = has_annotation
+                changed_labels[image_file] = labels
+            entries[image_file] = (stamp, has_annotation, labels)
+            if len(changed) >= _CHUNK_SIZE:
+                self._emit_changes(changed, changed_labels)
+                changed, changed_labels = {}, {}
+
+        if changed:
+            self._emit_changes(changed, changed_labels)
+        self.index.save(entries)
+
+    def _emit_changes(self, changed, changed_labels):
+        self.annotations_checked.emit(changed)
+        self.labels_checked.emit(changed_labels)
+
+
+class AsyncFolderIndexer(QObject):
+    """Keeps the file list in sync with a folder without blocking the GUI.
+
+    `load` returns the image list, annotation status and labels stored by
+    the last scan right away. `start_scan` then rescans the folder in a
+    thread, emitting `images_scanned` if the image list changed, and
+    `annotations_checked` and `labels_checked` for images whose label
+    files changed, and stores the result for the next time.
+    """
+
+    images_scanned = pyqtSignal(list)
+    annotations_checked = pyqtSignal(dict)
+    labels_checked = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.worker = None
+        self.thread = None
+
+    @staticmethod
+    def load(dirpath):
+        """Return {image path: (has annotation, labels)} from the last scan"""
+        cached = FolderIndex(dirpath).load()
+        return {
+            path: (has, labels) for path, (_, has, labels) in cached.items()
+        }
+
+    def start_scan(self, dirpath, shown_files, label_suffix, output_dir=None):
+        if self.thread and self.thread.isRunning():
+            self.stop_scan()
+
+        self.thread = QtCore.QThread(self)
+        self.worker = FolderIndexWorker(
+            FolderIndex(dirpath), shown_files, label_suffix, output_dir
+        )
+        self.worker.moveToThread(self.thread)
+
+        self.thread.started.connect(self.worker.scan_files)
+        self.worker.images_scanned.connect(self.images_scanned)
+        self.worker.annotations_checked.connect(self.annotations_checked)
+        self.worker.labels_checked.connect(self.labels_checked)
+        self.worker.scan_finished.connect(self._cleanup_thread)
+
+        self.thread.start()
+
+    def _cleanup_thread(self):
+        if self.worker and not self.worker.finished:
+            # `scan_finished` of a stopped scan, queued after a new scan
+            # started; the stopped one was already cleaned up by stop_scan.
+            return
+        self._release_thread()
+
+    def _release_thread(self):
+        if self.thread:
+            try:
+                if self.thread.isRunning():
+                    self.thread.quit()
+                    if not self.thread.wait(3000):
+                        self.thread.terminate()
+                        self.thread.wait()
+                self.thread.deleteLater()
+                self.thread = None
+            except RuntimeError:
+                self.thread = None
+        if self.worker:
+            try:
+                self.worker.deleteLater()
+            except RuntimeError:
+                pass
+            self.worker = None
+
+    def stop_scan(self):
+        if self.worker:
+            self.worker.stop()
+            try:
+                self.worker.images_scanned.disconnect(self.images_scanned)
+                self.worker.annotations_checked.disconnect(
+                    self.annotations_checked
+                )
+                self.worker.labels_checked.disconnect(self.labels_checked)
+                self.worker.scan_finished.disconnect(self._cleanup_thread)
+            except TypeError:
+                pass
+        self._release_thread()
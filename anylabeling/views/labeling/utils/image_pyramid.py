@@ -0,0 +1,176 @@
+"""Tiled, multi-resolution source of the image shown on the canvas."""
+
+import math
+
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtCore import Qt
+
+from anylabeling.services.auto_labeling.lru_cache import LRUCache
+
+DEFAULT_TILE_SIZE = 256
+# About 128 MB of 32 bit tiles, a few screens worth at 4K
+DEFAULT_MAX_TILES = 512
+
+
+class ImagePyramid:
+    """Image split into tiles at successively halved resolutions.
+
+    Painting picks the level closest to, but not coarser than, the zoom
+    factor and draws only the tiles under the exposed area, so the cost of
+    a frame depends on the size of the screen rather than of the image.
+    Reduced levels are built the first time they are needed, and tiles are
+    converted to pixmaps on demand and kept in an LRU cache.
+
+    The size accessors mirror those of `QPixmap`, so an `ImagePyramid` can
+    stand in for the pixmap of the canvas.
+    """
+
+    def __init__(
+        self,
+        image=None,
+        tile_size=DEFAULT_TILE_SIZE,
+        max_tiles=DEFAULT_MAX_TILES,
+    ):
+        if image is None:
+            image = QtGui.QImage()
+        elif isinstance(image, QtGui.QPixmap):
+            image = image.toImage()
+        self.tile_size = tile_size
+        self.levels = [image]
+        self.num_levels = 1
+        longest = max(image.width(), image.height())
+        while longest > tile_size:
+            longest = (longest + 1) // 2
+            self.num_levels += 1
+        self.tiles = LRUCache(maxsize=max_tiles)
+
+    @property
+    def image(self):
+        """The full resolution image"""
+        return self.levels[0]
+
+    def isNull(self):
+        return self.image.isNull()
+
+    def width(self):
+        return self.image.width()
+
+    def height(self):
+        return self.image.height()
+
+    def size(self):
+        return self.image.size()
+
+    def rect(self):
+        return self.image.rect()
+
+    def level_for_scale(self, scale):
+        """Coarsest level with at least one pixel per screen pixel"""
+        if scale <= 0:
+            return self.num_levels - 1
+        level = math.floor(math.log2(1 / scale)) if scale < 1 else 0
+        return min(level, self.num_levels - 1)
+
+    def level_image(self, level):
+        """The image at `level`, halved `level` times"""
+        while len(self.levels) <= level:
+            previous = self.levels[-1]
+            self.levels.append(
+                previous.scaled(
+                    max(1, (previous.width() + 1) // 2),
+                    max(1, (previous.height() + 1) // 2),
+                    Qt.IgnoreAspectRatio,
+                    Qt.SmoothTransformation,
+                )
+            )
+        return self.levels[level]
+
+    def tile_image(self, level, col, row):
+        """
+        A tile of `level` with a one pixel border taken from its neighbours,
+        so smooth scaling does not show seams, and the offset of the tile
+        inside it.
+        """
+        image = self.level_image(level)
+        size = self.tile_size
+        rect = QtCore.QRect(col * size - 1, row * size - 1, size + 2, size + 2)
+        rect = rect.intersected(image.rect())
+        offset = QtCore.QPointF(col * size - rect.x(), row * size - rect.y())
+        return image.copy(rect), offset
+
+    def tile(self, level, col, row):
+        """Pixmap of a tile and the offset of the tile inside it"""
+        key = (level, col, row)
+        tile = self.tiles.get(key)
+        if tile is None:
+            image, offset = self.tile_image(level, col, row)
+            tile = (QtGui.QPixmap.fromImage(image), offset)
+            self.tiles.put(key, tile)
+        return tile
+
+    def draw(self, painter, rect, scale):
+        """
+        Draw the part of the image under `rect`, given in full resolution
+        coordinates, for a painter zoomed by `scale`.
+        """
+        if self.isNull():
+            return
+        rect = QtCore.QRectF(rect).intersected(QtCore.QRectF(self.rect()))
+        if rect.isEmpty():
+            return
+        level = self.level_for_scale(scale)
+        image = self.level_image(level)
+        sx = self.width() / image.width()
+        sy = self.height() / image.height()
+        size = self.tile_size
+        col0 = max(0, math.floor(rect.left() / sx / size))
+        row0 = max(0, math.floor(rect.top() / sy / size))
+        col1 = min(
+            math.ceil(rect.right() / sx / size),
+            math.ceil(image.width() / size),
+        )
+        row1 = min(
+            math.ceil(rect.bottom() / sy / size),
+            math.ceil(image.height() / size),
+        )
+        # Antialiased tile edges would let the background show between
+        # adjacent tiles
+        antialiasing = painter.testRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, False)
+        for row in range(row0, row1):
+            for col in range(col0, col1):
+                pixmap, offset = self.tile(level, col, row)
+                x, y = col * size, row * size
+                width = min(size, image.width() - x)
+                height = min(size, image.height() - y)
+                painter.drawPixmap(
+                    QtCore.QRectF(x * sx, y * sy, width * sx, height * sy),
+                    pixmap,
+                    QtCore.QRectF(offset.x(), offset.y(), width, height),
+                )
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, antialiasing)
+
+    def scaled(
+        self,
+        size,
+        aspect_mode=Qt.KeepAspectRatio,
+        transform_mode=Qt.SmoothTransformation,
+    ):
+        """
+        Pixmap of the whole image scaled to `size`, made from the smallest
+        level that is still at least as large.
+        """
+        target = self.size().scaled(size, aspect_mode)
+        level = 0
+        if target.width() > 0 and target.height() > 0:
+            level = self.level_for_scale(
+                max(
+                    target.width() / self.width(),
+                    target.height() / self.height(),
+                )
+            )
+        return QtGui.QPixmap.fromImage(
+            self.level_image(level).scaled(
+                target, Qt.IgnoreAspectRatio, transform_mode
+            )
+        )
@@ -1,4 +1,6 @@
-import os.path
+import os
+import threading
+from contextlib import contextmanager
 
 import cv2
 import numpy as np
@@ -6,26 +8,98 @@ import qimage2ndarray
 from PyQt5 import QtGui
 from PyQt5.QtGui import QImage
 
+from anylabeling.services.auto_labeling.lru_cache import LRUCache
+
+DECODED_IMAGE_CACHE_SIZE_MB = 512
+
+_pinned_cv_images = {}
+_pinned_cv_images_lock = threading.Lock()
+_decoded_cv_images = LRUCache(
+    maxsize=None, max_bytes=DECODED_IMAGE_CACHE_SIZE_MB * 1024 * 1024
+)
+
+
+@contextmanager
+def pinned_cv_images(images):
+    """
+    Serve already decoded images from qt_img_to_rgb_cv_img while active.
+
+    Args:
+        images (dict): Mapping of image path to 8bit RGB image.
+    """
+    with _pinned_cv_images_lock:
+        _pinned_cv_images.update(images)
+    try:
+        yield
+    finally:
+        with _pinned_cv_images_lock:
+            for img_path in images:
+                _pinned_cv_images.pop(img_path, None)
+
+
+def decode_rgb_cv_img(img_path):
+    """
+    Decode an image file into an 8bit RGB image, bypassing the cache
+    """
+    # NOTE: Potential issue - unable to handle the flipped image.
+    # Temporary workaround: cv_image = cv2.imread(img_path)
+    cv_image = cv2.imdecode(np.fromfile(img_path, dtype=np.uint8), -1)
+    cv_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
+    return _to_rgb_uint8(cv_image)
+
+
+def load_rgb_cv_img(img_path):
+    """
+    Return the 8bit RGB image of a file, decoding it at most once.
+
+    Decoded images are shared between preloading of the next files and
+    model inference, through `qt_img_to_rgb_cv_img`, in an LRU cache
+    keyed by path and modification time, and bounded by
+    DECODED_IMAGE_CACHE_SIZE_MB. The returned array is
+    read-only, copy it before modifying it in place.
+    """
+    try:
+        stat = os.stat(img_path)
+    except OSError:
+        return None
+    key = (img_path, stat.st_mtime_ns, stat.st_size)
+    cv_image = _decoded_cv_images.get(key)
+    if cv_image is None:
+        cv_image = decode_rgb_cv_img(img_path)
+        cv_image.flags.writeable = False
+        _decoded_cv_images.put(key, cv_image)
+    return cv_image
+
+
+def get_decoded_image_cache_stats():
+    """Return usage and hit/miss counters of the decoded image cache"""
+    return _decoded_cv_images.stats()
+
 
 def qt_img_to_rgb_cv_img(qt_img, img_path=None):
     """
     Convert 8bit/16bit RGB image or 8bit/16bit Gray image to 8bit RGB image
     """
-    if img_path is not None and os.path.exists(img_path):
-        # Load Image From Path Directly
-        # NOTE: Potential issue - unable to handle the flipped image.
-        # Temporary workaround: cv_image = cv2.imread(img_path)
-        cv_image = cv2.imdecode(np.fromfile(img_path, dtype=np.uint8), -1)
-        cv_image = cv2.cvtColor(cv_image, cv2.COLOR_BGR2RGB)
+    if img_path is not None:
+        with _pinned_cv_images_lock:
+            cv_image = _pinned_cv_images.get(img_path)
+        if cv_image is None and os.path.exists(img_path):
+            # Load Image From Path Directly
+            cv_image = load_rgb_cv_img(img_path)
+        if cv_image is not None:
+            return cv_image.copy()
+    if (
+        qt_img.format() == QImage.Format_RGB32
+        or qt_img.format() == QImage.Format_ARGB32
+        or qt_img.format() == QImage.Format_ARGB32_Premultiplied
+    ):
+        cv_image = qimage2ndarray.rgb_view(qt_img)
     else:
-        if (
-            qt_img.format() == QImage.Format_RGB32
-            or qt_img.format() == QImage.Format_ARGB32
-            or qt_img.format() == QImage.Format_ARGB32_Premultiplied
-        ):
-            cv_image = qimage2ndarray.rgb_view(qt_img)
-        else:
-            cv_image = qimage2ndarray.raw_view(qt_img)
+        cv_image = qimage2ndarray.raw_view(qt_img)
+    return _to_rgb_uint8(cv_image)
+
+
+def _to_rgb_uint8(cv_image):
     # To uint8
     if cv_image.dtype != np.uint8:
         cv2.normalize(cv_image, cv_image, 0, 255, cv2.NORM_MINMAX)
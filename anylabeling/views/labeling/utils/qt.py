@@ -10,7 +10,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from anylabeling.views.labeling.logger import logger
 
 
-def scan_all_images(folder_path):
+def scan_all_images(folder_path, should_stop=None):
     try:
         extensions = [
             f".{fmt.data().decode().lower()}"
@@ -21,6 +21,8 @@ def scan_all_images(folder_path):
         folder_path = osp.normpath(osp.abspath(folder_path))
 
         for root, _, files in os.walk(folder_path):
+            if should_stop is not None and should_stop():
+                return []
             for file in files:
                 if file.lower().endswith(tuple(extensions)):
                     relative_path = osp.normpath(osp.join(root, file))
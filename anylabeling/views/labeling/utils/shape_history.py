@@ -0,0 +1,149 @@
+"""Undo history of canvas shapes."""
+
+DEFAULT_MAX_STATES = 10
+
+# Rough memory taken by a recorded shape and by each of its points
+SHAPE_NBYTES = 1024
+POINT_NBYTES = 16
+
+# Attributes that, besides the points, make up the state of a shape
+STATE_FIELDS = (
+    "label",
+    "score",
+    "group_id",
+    "description",
+    "difficult",
+    "flags",
+    "attributes",
+    "kie_linking",
+    "direction",
+    "other_data",
+    "visible",
+    "center",
+    "_closed",
+)
+
+
+def get_shape_state(shape):
+    """Values of the attributes of `shape` that are kept in the history"""
+    return tuple(getattr(shape, name, None) for name in STATE_FIELDS)
+
+
+class ShapeRecord:
+    """Frozen copy of a shape as it was when a state was stored"""
+
+    __slots__ = ("shape", "state", "nbytes")
+
+    def __init__(self, shape):
+        self.shape = shape.copy()
+        self.state = get_shape_state(self.shape)
+        self.nbytes = SHAPE_NBYTES + POINT_NBYTES * len(self.shape.points)
+
+
+class ShapeHistory:
+    """Stack of the states of the canvas shapes, for undo.
+
+    A state is a list of `ShapeRecord`, and a record is shared by every
+    state in which its shape did not change. Storing a state only copies
+    the shapes whose points (tracked through `Shape.invalidate`) or
+    attributes changed since they were last recorded, so the time and
+    memory taken by an edit grow with what it changed rather than with the
+    number of shapes. Restoring a state likewise reuses the shapes that
+    still match their record and copies only the others.
+
+    At most `max_states` edits are kept and, if `max_bytes` is set, the
+    oldest states are dropped once the records take more than that, while
+    always keeping the latest edit undoable.
+    """
+
+    def __init__(self, max_states=DEFAULT_MAX_STATES, max_bytes=None):
+        self.max_states = max_states
+        self.max_bytes = max_bytes
+        self.states = []
+        # Live shape -> (revision, record) it matched when last seen
+        self.records = {}
+        self.refs = {}
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def clear(self):
+        self.states = []
+        self.records = {}
+        self.refs = {}
+        self.nbytes = 0
+
+    def is_modified(self, shape):
+        """Whether the points of `shape` changed since it was recorded"""
+        entry = self.records.get(shape)
+        return entry is None or entry[0] != shape._revision
+
+    def push(self, shapes):
+        """Store the state of `shapes`"""
+        records = {}
+        state = []
+        for shape in shapes:
+            entry = self.records.get(shape)
+            if (
+                entry is None
+                or entry[0] != shape._revision
+                or entry[1].state != get_shape_state(shape)
+            ):
+                entry = (shape._revision, ShapeRecord(shape))
+            records[shape] = entry
+            state.append(entry[1])
+        self.records = records
+        self.states.append(state)
+        self._add_refs(state)
+        while len(self.states) > self.max_states + 1 or (
+            self.max_bytes is not None
+            and self.nbytes > self.max_bytes
+            and len(self.states) > 2
+        ):
+            self._remove_refs(self.states.pop(0))
+
+    def pop(self):
+        """Drop the latest state and return its records"""
+        state = self.states.pop()
+        self._remove_refs(state)
+        return state
+
+    def restore(self):
+        """
+        Drop the latest state and the one before it, and return the shapes
+        of the one before it. The caller is expected to store them again.
+        """
+        self.pop()
+        state = self.pop()
+        unchanged = {}
+        for shape, (revision, record) in self.records.items():
+            if (
+                revision == shape._revision
+                and record.state == get_shape_state(shape)
+            ):
+                unchanged[record] = shape
+        shapes = []
+        for record in state:
+            shape = unchanged.pop(record, None)
+            if shape is None:
+                shape = record.shape.copy()
+                self.records[shape] = (shape._revision, record)
+            shapes.append(shape)
+        return shapes
+
+    def _add_refs(self, state):
+        for record in state:
+            count = self.refs.get(record, 0)
+            if count == 0:
+                self.nbytes += record.nbytes
+            self.refs[record] = count + 1
+
+    def _remove_refs(self, state):
+        for record in state:
+            count = self.refs[record] - 1
+            if count == 0:
+                del self.refs[record]
+                self.nbytes -= record.nbytes
+            else:
+                self.refs[record] = count
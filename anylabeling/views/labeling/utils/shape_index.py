@@ -0,0 +1,210 @@
+"""Spatial index of canvas shapes for hover and hit-testing."""
+
+import math
+
+DEFAULT_CELL_SIZE = 64
+# Shapes covering more cells than this are checked on every query
+DEFAULT_MAX_CELLS = 256
+
+
+class ShapeList(list):
+    """List of shapes that counts its modifications.
+
+    `ShapeIndex` compares the count to tell when shapes were added,
+    removed or reordered, without comparing the whole list.
+    """
+
+    def __init__(self, shapes=()):
+        super().__init__(shapes)
+        self.version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def __iadd__(self, shapes):
+        self.extend(shapes)
+        return self
+
+    def append(self, shape):
+        super().append(shape)
+        self.version += 1
+
+    def extend(self, shapes):
+        super().extend(shapes)
+        self.version += 1
+
+    def insert(self, index, shape):
+        super().insert(index, shape)
+        self.version += 1
+
+    def pop(self, index=-1):
+        shape = super().pop(index)
+        self.version += 1
+        return shape
+
+    def remove(self, shape):
+        super().remove(shape)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.version += 1
+
+
+class ShapeIndex:
+    """Uniform grid over the bounding boxes of the shapes of a canvas.
+
+    The index follows a `ShapeList`: shapes added or removed since the last
+    query are inserted or dropped, and shapes whose points changed report
+    themselves through `invalidate` and are binned again. A query only
+    looks at the shapes in the cells around a point, so its cost depends
+    on the number of shapes nearby rather than on the number of shapes.
+    """
+
+    def __init__(
+        self, cell_size=DEFAULT_CELL_SIZE, max_cells=DEFAULT_MAX_CELLS
+    ):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self.shapes = None
+        self.version = None
+        self.cells = {}
+        self.large = set()
+        self.entries = {}
+        self.order = {}
+        self.dirty = set()
+
+    def invalidate(self, shape):
+        """Mark a shape whose points changed"""
+        self.dirty.add(shape)
+
+    def sync(self, shapes):
+        """Bring the index up to date with `shapes`"""
+        version = getattr(shapes, "version", None)
+        if (
+            shapes is not self.shapes
+            or version is None
+            or version != self.version
+        ):
+            current = set(shapes)
+            for shape in [s for s in self.entries if s not in current]:
+                self._remove(shape)
+                if shape._shape_index is self:
+                    shape._shape_index = None
+            for shape in shapes:
+                if shape not in self.entries:
+                    self._insert(shape)
+            self.order = {shape: i for i, shape in enumerate(shapes)}
+            self.shapes = shapes
+            self.version = version
+        if self.dirty:
+            for shape in self.dirty:
+                if shape in self.entries:
+                    self._remove(shape)
+                    self._insert(shape)
+            self.dirty.clear()
+
+    def query(self, shapes, point, margin=0.0):
+        """
+        Shapes whose bounding box, grown by `margin`, contains `point`,
+        topmost first, i.e. in the reverse order of `shapes`.
+        """
+        x, y = point.x(), point.y()
+        hits = self._query(shapes, x, y, x, y, margin)
+        hits.sort(key=self.order.__getitem__, reverse=True)
+        return hits
+
+    def query_rect(self, shapes, rect, margin=0.0):
+        """
+        Shapes whose bounding box, grown by `margin`, intersects `rect`,
+        in the order of `shapes`.
+        """
+        hits = self._query(
+            shapes,
+            rect.left(),
+            rect.top(),
+            rect.right(),
+            rect.bottom(),
+            margin,
+        )
+        hits.sort(key=self.order.__getitem__)
+        return hits
+
+    def _query(self, shapes, x0, y0, x1, y1, margin):
+        self.sync(shapes)
+        x0, y0, x1, y1 = x0 - margin, y0 - margin, x1 + margin, y1 + margin
+        # Scanning every shape is cheaper than visiting more cells
+        keys = self._cell_keys(x0, y0, x1, y1, len(self.entries))
+        if keys is None:
+            candidates = [s for s, e in self.entries.items() if e[1]]
+        else:
+            candidates = set(self.large)
+            for key in keys:
+                candidates.update(self.cells.get(key, ()))
+        hits = []
+        for shape in candidates:
+            left, top, right, bottom = self.entries[shape][1]
+            if left <= x1 and x0 <= right and top <= y1 and y0 <= bottom:
+                hits.append(shape)
+        return hits
+
+    def _cell_keys(self, x0, y0, x1, y1, max_cells=None):
+        size = self.cell_size
+        i0, i1 = math.floor(x0 / size), math.floor(x1 / size)
+        j0, j1 = math.floor(y0 / size), math.floor(y1 / size)
+        if max_cells is None:
+            max_cells = self.max_cells
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > max_cells:
+            return None
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def _insert(self, shape):
+        shape._shape_index = self
+        if not shape.points:
+            # Nothing to hit until the shape gets points
+            self.entries[shape] = (None, None)
+            return
+        array = shape.points.array
+        bounds = (*array.min(axis=0).tolist(), *array.max(axis=0).tolist())
+        # The path of a point shape has a null bounding box at the origin
+        rect = shape.bounding_rect()
+        if not rect.isNull():
+            bounds = (
+                min(bounds[0], rect.left()),
+                min(bounds[1], rect.top()),
+                max(bounds[2], rect.right()),
+                max(bounds[3], rect.bottom()),
+            )
+        keys = self._cell_keys(*bounds)
+        if keys is None:
+            self.large.add(shape)
+        else:
+            for key in keys:
+                self.cells.setdefault(key, set()).add(shape)
+        self.entries[shape] = (keys, bounds)
+
+    def _remove(self, shape):
+        keys, bounds = self.entries.pop(shape)
+        if bounds is None:
+            return
+        if keys is None:
+            self.large.discard(shape)
+            return
+        for key in keys:
+            cell = self.cells[key]
+            cell.discard(shape)
+            if not cell:
+                del self.cells[key]
@@ -9,6 +9,7 @@ from .classifier_dialog import ClassifierDialog
 from .color_dialog import ColorDialog
 from .crosshair_settings_dialog import CrosshairSettingsDialog
 from .file_dialog_preview import FileDialogPreview
+from .file_list_widget import FileListItem, FileListModel, FileListWidget
 from .filter_label_widget import (
     GroupIDFilterComboBox,
     LabelFilterComboBox,
@@ -8,6 +8,9 @@ from PyQt5.QtGui import QWheelEvent
 
 from anylabeling.services.auto_labeling.types import AutoLabelingMode
 from anylabeling.views.labeling.utils.colormap import label_colormap
+from anylabeling.views.labeling.utils.image_pyramid import ImagePyramid
+from anylabeling.views.labeling.utils.shape_history import ShapeHistory
+from anylabeling.views.labeling.utils.shape_index import ShapeIndex, ShapeList
 
 from .. import utils
 from ..shape import Shape
@@ -22,6 +25,13 @@ AUTO_DECODE_DELAY_MS = 100
 MAX_AUTO_DECODE_MARKS = 42
 AUTO_DECODE_MOVE_THRESHOLD = 5.0
 MOVE_SPEED = 5.0
+# Screen pixels around the viewport in which shapes are still painted,
+# covering vertex handles, pen widths and rotation degrees
+PAINT_MARGIN = 64
+# Texts of shapes outside the viewport are looked up this many characters
+# around it, longer texts of shapes further away are not painted
+TEXT_MARGIN_CHARS = 32
+MAX_TEXT_METRICS = 10000
 LARGE_ROTATION_INCREMENT = math.radians(1.0)
 SMALL_ROTATION_INCREMENT = math.radians(0.1)
 
@@ -65,6 +75,7 @@ class Canvas(
                 f"Unexpected value for double_click event: {self.double_click}"
             )
         self.num_backups = kwargs.pop("num_backups", 10)
+        self.history_memory_mb = kwargs.pop("history_memory_mb", None)
         self.wheel_rectangle_editing = kwargs.pop(
             "wheel_rectangle_editing", {}
         )
@@ -87,8 +98,13 @@ class Canvas(
         self.is_move_editing = False
         self.auto_labeling_mode: AutoLabelingMode = None
         self.is_image_ok = False  # Track OK status for display
+        self.shape_index = ShapeIndex()
+        self.text_metrics = {}
         self.shapes = []
-        self.shapes_backups = []
+        history_bytes = None
+        if self.history_memory_mb is not None:
+            history_bytes = int(self.history_memory_mb * 1024 * 1024)
+        self.shapes_backups = ShapeHistory(self.num_backups, history_bytes)
         self.current = None
         self.selected_shapes = []  # save the selected shapes here
         self.selected_shapes_copy = []
@@ -103,7 +119,7 @@ class Canvas(
         self.prev_move_point = QtCore.QPoint()
         self.offsets = QtCore.QPointF(), QtCore.QPointF()
         self.scale = 1.0
-        self.pixmap = QtGui.QPixmap()
+        self.pixmap = ImagePyramid()
         self.visible = {}
         self._hide_backround = False
         self.hide_backround = False
@@ -234,14 +250,18 @@ class Canvas(
             raise ValueError(f"Unsupported create_mode: {value}")
         self._create_mode = value
 
+    @property
+    def shapes(self):
+        return self._shapes
+
+    @shapes.setter
+    def shapes(self, shapes):
+        # Tracks modifications for the spatial index used by hit-testing
+        self._shapes = ShapeList(shapes)
+
     def store_shapes(self):
         """Store shapes for restoring later (Undo feature)"""
-        shapes_backup = []
-        for shape in self.shapes:
-            shapes_backup.append(shape.copy())
-        if len(self.shapes_backups) > self.num_backups:
-            self.shapes_backups = self.shapes_backups[-self.num_backups - 1 :]
-        self.shapes_backups.append(shapes_backup)
+        self.shapes_backups.push(self.shapes)
 
     def store_moving_shape(self):
         """Store a moving shape"""
@@ -252,17 +272,14 @@ class Canvas(
                 else self.selected_shapes.copy()
             )
             for shape in moving_shapes:
-                if shape in self.shapes:
-                    index = self.shapes.index(shape)
-                    if (
-                        len(self.shapes_backups) > 0
-                        and index < len(self.shapes_backups[-1])
-                        and self.shapes_backups[-1][index].points
-                        != self.shapes[index].points
-                    ):
-                        self.store_shapes()
-                        self.shape_moved.emit()
-                        break
+                if (
+                    shape in self.shapes
+                    and len(self.shapes_backups) > 0
+                    and self.shapes_backups.is_modified(shape)
+                ):
+                    self.store_shapes()
+                    self.shape_moved.emit()
+                    break
 
             self.moving_shape = False
 
@@ -277,10 +294,8 @@ class Canvas(
         if len(points) != 4:
             return True
 
-        x_coords = [p.x() for p in points]
-        y_coords = [p.y() for p in points]
-        min_x, max_x = min(x_coords), max(x_coords)
-        min_y, max_y = min(y_coords), max(y_coords)
+        min_x, min_y = points.array.min(axis=0).tolist()
+        max_x, max_y = points.array.max(axis=0).tolist()
 
         clipped_min_x = max(0, min_x)
         clipped_min_y = max(0, min_y)
@@ -315,12 +330,10 @@ class Canvas(
         # and app.py::load_shapes and our own Canvas::load_shapes function.
         if not self.is_shape_restorable:
             return
-        self.shapes_backups.pop()  # latest
-
-        # The application will eventually call Canvas.load_shapes which will
-        # push this right back onto the stack.
-        shapes_backup = self.shapes_backups.pop()
-        self.shapes = shapes_backup
+        # Drops the latest state. The application will eventually call
+        # Canvas.load_shapes which will push the restored one right back
+        # onto the stack.
+        self.shapes = self.shapes_backups.restore()
         self.selected_shapes = []
         for shape in self.shapes:
             shape.selected = False
@@ -426,7 +439,7 @@ class Canvas(
 
         prev_hover_shape = self.h_hape
         self.prev_move_point = pos
-        self.repaint()
+        self.update()
 
         # Handle auto decode mode
         if (
@@ -500,7 +513,7 @@ class Canvas(
             elif self.create_mode == "point":
                 self.line.points = [self.current[0]]
                 self.line.close()
-            self.repaint()
+            self.update()
             self.current.highlight_clear()
             return
 
@@ -509,12 +522,12 @@ class Canvas(
             if self.selected_shapes_copy and self.prev_point:
                 self.override_cursor(CURSOR_MOVE)
                 self.bounded_move_shapes(self.selected_shapes_copy, pos)
-                self.repaint()
+                self.update()
             elif self.selected_shapes:
                 self.selected_shapes_copy = [
                     s.copy() for s in self.selected_shapes
                 ]
-                self.repaint()
+                self.update()
             return
 
         # Polygon/Vertex moving.
@@ -523,7 +536,7 @@ class Canvas(
                 self.is_move_editing = False
                 try:
                     self.bounded_move_vertex(pos)
-                    self.repaint()
+                    self.update()
                     self.moving_shape = True
                 except IndexError:
                     return
@@ -536,7 +549,7 @@ class Canvas(
             elif self.selected_shapes and self.prev_point:
                 self.override_cursor(CURSOR_MOVE)
                 self.bounded_move_shapes(self.selected_shapes, pos)
-                self.repaint()
+                self.update()
                 self.moving_shape = True
                 if self.selected_shapes[-1].shape_type == "rectangle":
                     p1 = self.selected_shapes[-1][0]
@@ -562,7 +575,7 @@ class Canvas(
                         Qt.Vertical,
                         1,
                     )
-                    self.repaint()
+                    self.update()
             return
 
         if self.editing() and self.is_move_editing:
@@ -570,7 +583,7 @@ class Canvas(
             if self.selected_vertex():
                 try:
                     self.bounded_move_vertex(pos)
-                    self.repaint()
+                    self.update()
                     self.moving_shape = True
                 except IndexError:
                     return
@@ -592,7 +605,10 @@ class Canvas(
         # - Highlight vertex
         # Update shape/vertex fill and tooltip value accordingly.
         self.setToolTip(self.tr("Image"))
-        for shape in reversed([s for s in self.shapes if self.is_visible(s)]):
+        candidates = self.shape_index.query(
+            self.shapes, pos, self.epsilon * 3 / self.scale
+        )
+        for shape in [s for s in candidates if self.is_visible(s)]:
             # Look for a nearby vertex to highlight. If that fails,
             # check if we happen to be inside a shape.
             index = shape.nearest_vertex(pos, self.epsilon / self.scale)
@@ -863,7 +879,7 @@ class Canvas(
                 )
                 self.prev_point = pos
                 self.prev_pan_point = ev.localPos()
-                self.repaint()
+                self.update()
         elif ev.button() == QtCore.Qt.RightButton and self.editing():
             group_mode = int(ev.modifiers()) == QtCore.Qt.ControlModifier
             if not self.selected_shapes or (
@@ -873,7 +889,7 @@ class Canvas(
                 self.select_shape_point(
                     pos, multiple_selection_mode=group_mode
                 )
-                self.repaint()
+                self.update()
             self.prev_point = pos
 
     # QT Overload
@@ -890,7 +906,7 @@ class Canvas(
             ):
                 # Cancel the move by deleting the shadow copy.
                 self.selected_shapes_copy = []
-                self.repaint()
+                self.update()
         elif ev.button() == QtCore.Qt.LeftButton:
             if self.editing():
                 if (
@@ -917,7 +933,7 @@ class Canvas(
             for i, shape in enumerate(self.selected_shapes_copy):
                 self.selected_shapes[i].points = shape.points
         self.selected_shapes_copy = []
-        self.repaint()
+        self.update()
         self.store_shapes()
         return True
 
@@ -990,7 +1006,10 @@ class Canvas(
                 return
 
         else:
-            for shape in reversed(self.shapes):
+            candidates = self.shape_index.query(
+                self.shapes, point, self.epsilon * 3 / self.scale
+            )
+            for shape in candidates:
                 shape_selectable = False
                 if shape.shape_type in ["point", "line", "linestrip"]:
                     if (
@@ -1163,15 +1182,6 @@ class Canvas(
             return True
         return False
 
-    def rotate_point(self, p, center, theta):
-        order = p - center
-        cosTheta = math.cos(theta)
-        sinTheta = math.sin(theta)
-        pResx = cosTheta * order.x() + sinTheta * order.y()
-        pResy = -sinTheta * order.x() + cosTheta * order.y()
-        pRes = QtCore.QPointF(center.x() + pResx, center.y() + pResy)
-        return pRes
-
     def bounded_rotate_shapes(self, i, shape, theta):
         """Rotate shapes. Adjust position to be bounded by pixmap border"""
         new_shape = deepcopy(shape)
@@ -1192,12 +1202,9 @@ class Canvas(
             (new_shape.points[0].x() + new_shape.points[2].x()) / 2,
             (new_shape.points[0].y() + new_shape.points[2].y()) / 2,
         )
-        for j, p in enumerate(new_shape.points):
-            pos = self.rotate_point(p, center, theta)
-            # TODO: Reserved for now
-            # if self.out_off_pixmap(pos):
-            #     return False  # No need to rotate
-            new_shape.points[j] = pos
+        # TODO: Reserved for now, check the rotated points with
+        # self.out_off_pixmap and return False if one is out
+        new_shape.rotate_by(theta, center)
         new_shape.direction = (new_shape.direction - theta) % (2 * math.pi)
         self.selected_shapes[i].points = new_shape.points
         self.selected_shapes[i].direction = new_shape.direction
@@ -1276,7 +1283,15 @@ class Canvas(
         p.scale(self.scale, self.scale)
         p.translate(self.offset_to_center())
 
-        p.drawPixmap(0, 0, self.pixmap)
+        # Only the exposed part of the image is painted
+        exposed = event.rect()
+        visible_rect = QtCore.QRectF(
+            self.transform_pos(QtCore.QPointF(exposed.topLeft())),
+            self.transform_pos(
+                QtCore.QPointF(exposed.bottomRight() + QtCore.QPoint(1, 1))
+            ),
+        )
+        self.pixmap.draw(p, visible_rect.adjusted(-2, -2, 2, 2), self.scale)
         Shape.scale = self.scale
 
         # Draw loading/waiting screen
@@ -1440,7 +1455,10 @@ class Canvas(
                 p.drawPolygon(arrow_points)
 
         # Draw degrees
-        for shape in self.shapes:
+        visible_shapes = self.shape_index.query_rect(
+            self.shapes, visible_rect, PAINT_MARGIN / self.scale
+        )
+        for shape in visible_shapes:
             if (
                 shape.selected or not self._hide_backround
             ) and self.is_visible(shape):
@@ -1532,54 +1550,44 @@ class Canvas(
                     "Arial", int(max(6.0, int(round(8.0 / Shape.scale))))
                 )
             )
-            pen = QtGui.QPen(QtGui.QColor(background_color), 8, Qt.SolidLine)
-            p.setPen(pen)
-            for shape in self.shapes:
+            descriptions = []
+            for shape in self.get_text_shapes(p.font(), visible_rect):
                 if not shape.visible:
                     continue
                 description = shape.description
                 if description:
                     bbox = shape.bounding_rect()
-                    fm = QtGui.QFontMetrics(p.font())
-                    text_rect = fm.tightBoundingRect(description)
+                    metrics = self.get_text_metrics(p.font(), description)
+                    text_width, text_height, _, descent = metrics
 
                     padding_x = 4
                     padding_y = 2
-                    rect_width = text_rect.width() + 2 * padding_x
-                    rect_height = fm.height() + 2 * padding_y
+                    rect_width = text_width + 2 * padding_x
+                    rect_height = text_height + 2 * padding_y
 
                     bg_x = int(bbox.x())
                     bg_y = int(bbox.y() - rect_height)
+                    rect = QtCore.QRect(bg_x, bg_y, rect_width, rect_height)
+                    if not visible_rect.intersects(QtCore.QRectF(rect)):
+                        continue
 
-                    p.fillRect(
-                        bg_x,
-                        bg_y,
-                        rect_width,
-                        rect_height,
-                        QtGui.QColor(background_color),
-                    )
+                    text_x = int(bbox.x() + padding_x)
+                    text_y = int(bbox.y() - padding_y - descent)
+                    descriptions.append((rect, text_x, text_y, description))
 
-            pen = QtGui.QPen(QtGui.QColor(text_color), 8, Qt.SolidLine)
+            pen = QtGui.QPen(QtGui.QColor(background_color), 8, Qt.SolidLine)
             p.setPen(pen)
-            for shape in self.shapes:
-                if not shape.visible:
-                    continue
-                description = shape.description
-                if description:
-                    bbox = shape.bounding_rect()
-                    fm = QtGui.QFontMetrics(p.font())
+            for rect, _, _, _ in descriptions:
+                p.fillRect(rect, QtGui.QColor(background_color))
 
-                    padding_x = 4
-                    padding_y = 2
-
-                    text_x = int(bbox.x() + padding_x)
-                    text_y = int(bbox.y() - padding_y - fm.descent())
-
-                    p.drawText(
-                        text_x,
-                        text_y,
-                        description,
-                    )
+            pen = QtGui.QPen(QtGui.QColor(text_color), 8, Qt.SolidLine)
+            p.setPen(pen)
+            for _, text_x, text_y, description in descriptions:
+                p.drawText(
+                    text_x,
+                    text_y,
+                    description,
+                )
 
         # Draw labels
         if self.show_labels:
@@ -1589,7 +1597,7 @@ class Canvas(
                 )
             )
             labels = []
-            for shape in self.shapes:
+            for shape in self.get_text_shapes(p.font(), visible_rect):
                 if not shape.visible:
                     continue
                 d_react = shape.point_size / shape.scale
@@ -1616,12 +1624,13 @@ class Canvas(
                 )
                 if not label_text:
                     continue
-                fm = QtGui.QFontMetrics(p.font())
-                text_rect = fm.tightBoundingRect(label_text)
+                text_width, text_height, _, descent = self.get_text_metrics(
+                    p.font(), label_text
+                )
                 padding_x = 4
                 padding_y = 2
-                rect_width = text_rect.width() + 2 * padding_x
-                rect_height = fm.height() + 2 * padding_y
+                rect_width = text_width + 2 * padding_x
+                rect_height = text_height + 2 * padding_y
 
                 if shape.shape_type in ["rectangle", "polygon", "rotation"]:
                     try:
@@ -1638,7 +1647,7 @@ class Canvas(
                     )
                     text_pos = QtCore.QPoint(
                         int(bbox.x() + bbox.width() + label_offset + padding_x),
-                        int(bbox.y() + bbox.height() + label_offset + rect_height - padding_y - fm.descent()),
+                        int(bbox.y() + bbox.height() + label_offset + rect_height - padding_y - descent),
                     )
                 elif shape.shape_type == "circle":
                     points = shape.points
@@ -1653,12 +1662,7 @@ class Canvas(
                     )
                     text_pos = QtCore.QPoint(
                         int(point.x() - rect_width / 2 + padding_x),
-                        int(
-                            point.y()
-                            + rect_height / 2
-                            - padding_y
-                            - fm.descent()
-                        ),
+                        int(point.y() + rect_height / 2 - padding_y - descent),
                     )
                 elif shape.shape_type in [
                     "line",
@@ -1678,15 +1682,13 @@ class Canvas(
                     text_pos = QtCore.QPoint(
                         int(point.x() + d_react + padding_x),
                         int(
-                            point.y()
-                            - 15
-                            + rect_height
-                            - padding_y
-                            - fm.descent()
+                            point.y() - 15 + rect_height - padding_y - descent
                         ),
                     )
                 else:
                     continue
+                if not visible_rect.intersects(QtCore.QRectF(rect)):
+                    continue
                 labels.append((shape, rect, text_pos, label_text))
 
             # Draw label text without background
@@ -1724,7 +1726,7 @@ class Canvas(
             p.setFont(font)
             attributes_list = []
 
-            for shape in self.shapes:
+            for shape in self.get_text_shapes(font, visible_rect):
                 if not shape.visible:
                     continue
                 if not hasattr(shape, "attributes") or not shape.attributes:
@@ -1748,13 +1750,14 @@ class Canvas(
                     line_attrs = attrs_text[i : i + max_attrs_per_line]
                     attribute_lines.append(" | ".join(line_attrs))
 
-                fm = QtGui.QFontMetrics(font)
                 max_width = 0
                 line_heights = []
                 for line in attribute_lines:
-                    line_rect = fm.tightBoundingRect(line)
-                    max_width = max(max_width, line_rect.width())
-                    line_heights.append(fm.height())
+                    line_width, line_height, ascent, _ = self.get_text_metrics(
+                        font, line
+                    )
+                    max_width = max(max_width, line_width)
+                    line_heights.append(line_height)
                 total_height = sum(line_heights)
 
                 padding_x = 8
@@ -1787,7 +1790,7 @@ class Canvas(
                                 + 1
                                 + padding_y
                                 + y_offset
-                                + fm.ascent()
+                                + ascent
                             ),
                         )
                         text_positions.append(text_pos)
@@ -1816,18 +1819,14 @@ class Canvas(
                     for i, line_height in enumerate(line_heights):
                         text_pos = QtCore.QPoint(
                             int(point.x() + d_react + padding_x),
-                            int(
-                                point.y()
-                                + 1
-                                + padding_y
-                                + y_offset
-                                + fm.ascent()
-                            ),
+                            int(point.y() + 1 + padding_y + y_offset + ascent),
                         )
                         text_positions.append(text_pos)
                         y_offset += line_height
                 else:
                     continue
+                if not visible_rect.intersects(QtCore.QRectF(rect)):
+                    continue
 
                 attributes_list.append(
                     (shape, rect, text_positions, attribute_lines)
@@ -1893,6 +1892,28 @@ class Canvas(
 
         p.end()
 
+    def get_text_shapes(self, font, visible_rect):
+        """Shapes whose texts in `font` may reach into `visible_rect`"""
+        margin = TEXT_MARGIN_CHARS * QtGui.QFontMetrics(font).maxWidth()
+        return self.shape_index.query_rect(self.shapes, visible_rect, margin)
+
+    def get_text_metrics(self, font, text):
+        """Tight width, height, ascent and descent of a text in a font"""
+        key = (font.key(), text)
+        metrics = self.text_metrics.get(key)
+        if metrics is None:
+            if len(self.text_metrics) >= MAX_TEXT_METRICS:
+                self.text_metrics.clear()
+            fm = QtGui.QFontMetrics(font)
+            metrics = (
+                fm.tightBoundingRect(text).width(),
+                fm.height(),
+                fm.ascent(),
+                fm.descent(),
+            )
+            self.text_metrics[key] = metrics
+        return metrics
+
     def transform_pos(self, point):
         """Convert from widget-logical coordinates to painter-logical ones."""
         return point / self.scale - self.offset_to_center()
@@ -2256,7 +2277,7 @@ class Canvas(
             self.bounded_move_shapes(
                 self.selected_shapes, self.prev_point + offset
             )
-            self.repaint()
+            self.update()
             self.moving_shape = True
 
     def rotate_by_keyboard(self, theta):
@@ -2265,7 +2286,7 @@ class Canvas(
             for i, shape in enumerate(self.selected_shapes):
                 if shape._shape_type == "rotation":
                     self.bounded_rotate_shapes(i, shape, theta)
-                    self.repaint()
+                    self.update()
                     self.rotating_shape = True
 
     # QT Overload
@@ -2325,11 +2346,7 @@ class Canvas(
                 and self.selected_shapes
                 and self.selected_shapes[0] in self.shapes
             ):
-                index = self.shapes.index(self.selected_shapes[0])
-                if (
-                    self.shapes_backups[-1][index].points
-                    != self.shapes[index].points
-                ):
+                if self.shapes_backups.is_modified(self.selected_shapes[0]):
                     self.store_shapes()
                     if self.moving_shape:
                         self.shape_moved.emit()
@@ -2380,7 +2397,9 @@ class Canvas(
         self.update()
 
     def load_pixmap(self, pixmap, clear_shapes=True):
-        """Load pixmap"""
+        """Load an image, given as an ImagePyramid, QImage or QPixmap"""
+        if not isinstance(pixmap, ImagePyramid):
+            pixmap = ImagePyramid(pixmap)
         self.pixmap = pixmap
         if clear_shapes:
             self.shapes = []
@@ -2429,7 +2448,7 @@ class Canvas(
         """Clear shapes and pixmap"""
         self.restore_cursor()
         self.pixmap = None
-        self.shapes_backups = []
+        self.shapes_backups.clear()
         self.is_move_editing = False
         self.update()
 
@@ -0,0 +1,209 @@
+from PyQt5 import QtCore, QtWidgets
+from PyQt5.QtCore import Qt
+
+
+class FileListModel(QtCore.QAbstractListModel):
+    """Image files of the file list with their annotation check state.
+
+    Files are kept in a plain list, with a dict from filename to row and a
+    bytearray of check states, so the view only asks for the rows it
+    shows and lookups do not depend on the number of files.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._files = []
+        self._rows = {}
+        self._checked = bytearray()
+
+    # QT Overload
+    def rowCount(self, parent=None):
+        if parent is not None and parent.isValid():
+            return 0
+        return len(self._files)
+
+    # QT Overload
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._files[row]
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self._checked[row] else Qt.Unchecked
+        return None
+
+    # QT Overload
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    @property
+    def files(self):
+        """The image files in list order, must not be modified"""
+        return self._files
+
+    @property
+    def rows(self):
+        """Mapping from image file to its row, must not be modified"""
+        return self._rows
+
+    def set_files(self, files, checked=()):
+        """Replace all files, `checked` is the set of annotated files"""
+        self.beginResetModel()
+        self._files = list(dict.fromkeys(files))
+        self._rows = {
+            filename: row for row, filename in enumerate(self._files)
+        }
+        self._checked = bytearray(
+            filename in checked for filename in self._files
+        )
+        self.endResetModel()
+
+    def add_files(self, files, checked=()):
+        """Append files that are not in the list yet"""
+        files = [
+            filename
+            for filename in dict.fromkeys(files)
+            if filename not in self._rows
+        ]
+        if not files:
+            return
+        first = len(self._files)
+        self.beginInsertRows(
+            QtCore.QModelIndex(), first, first + len(files) - 1
+        )
+        # Build a new list, so lists handed out by `files` stay unchanged
+        self._files = self._files + files
+        for row, filename in enumerate(files, first):
+            self._rows[filename] = row
+        self._checked.extend(filename in checked for filename in files)
+        self.endInsertRows()
+
+    def clear(self):
+        self.set_files([])
+
+    def row(self, filename):
+        """Return the row of a file, or -1 if it is not in the list"""
+        return self._rows.get(filename, -1)
+
+    def is_checked(self, row):
+        return bool(self._checked[row])
+
+    def set_checked(self, row, checked):
+        if bool(self._checked[row]) == bool(checked):
+            return
+        self._checked[row] = bool(checked)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+    def find_row(self, start, step, checked):
+        """Return the first row from `start` on, going forward for a
+        positive `step` and backward otherwise, whose check state is
+        `checked`, or -1 if there is none.
+        """
+        state = b"\x01" if checked else b"\x00"
+        if step > 0:
+            return self._checked.find(state, max(start, 0))
+        if start < 0:
+            return -1
+        return self._checked.rfind(state, 0, start + 1)
+
+
+class FileListItem:
+    """Lightweight handle to a row of a FileListWidget.
+
+    Offers the part of the QListWidgetItem API used by the labeling widget
+    and its dialogs, without keeping an object per file.
+    """
+
+    def __init__(self, view, row):
+        self._view = view
+        self._row = row
+
+    def row(self):
+        return self._row
+
+    def text(self):
+        return self._view.model().files[self._row]
+
+    def checkState(self):
+        if self._view.model().is_checked(self._row):
+            return Qt.Checked
+        return Qt.Unchecked
+
+    def setCheckState(self, state):
+        self._view.model().set_checked(self._row, state == Qt.Checked)
+
+    def isHidden(self):
+        return self._view.isRowHidden(self._row)
+
+    def setHidden(self, hidden):
+        self._view.setRowHidden(self._row, hidden)
+
+
+class FileListWidget(QtWidgets.QListView):
+    """Virtualized file list backed by a FileListModel.
+
+    Keeps the QListWidget methods the labeling widget relies on, so items
+    are only materialized as FileListItem handles on demand.
+    """
+
+    itemSelectionChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setModel(FileListModel(self))
+        # All rows have the same height, so the view does not have to
+        # measure every file name to lay out the list
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.selectionModel().selectionChanged.connect(
+            lambda selected, deselected: self.itemSelectionChanged.emit()
+        )
+
+    def count(self):
+        return self.model().rowCount()
+
+    def item(self, row):
+        if 0 <= row < self.count():
+            return FileListItem(self, row)
+        return None
+
+    def findItems(self, text, flags=Qt.MatchExactly):
+        if flags == Qt.MatchExactly:
+            row = self.model().row(text)
+            return [] if row < 0 else [FileListItem(self, row)]
+        return [
+            FileListItem(self, index.row())
+            for index in self.model().match(
+                self.model().index(0),
+                Qt.DisplayRole,
+                text,
+                -1,
+                flags,
+            )
+        ]
+
+    def selectedItems(self):
+        return [
+            FileListItem(self, index.row())
+            for index in self.selectionModel().selectedRows()
+        ]
+
+    def currentItem(self):
+        row = self.currentRow()
+        return None if row < 0 else FileListItem(self, row)
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
+
+    def setCurrentRow(self, row):
+        self.setCurrentIndex(self.model().index(row))
+
+    def clear(self):
+        self.model().clear()
@@ -29,6 +29,7 @@ from PyQt5.QtWidgets import (
 )
 
 from anylabeling.views.labeling.chatbot import ChatbotDialogStyle
+from anylabeling.views.labeling.utils.image_pyramid import ImagePyramid
 
 
 class ClickableSlider(QSlider):
@@ -127,7 +128,8 @@ class NavigatorWidget(QWidget):
             pixmap = QPixmap()
             pixmap.loadFromData(image_data)
             self.original_image = pixmap
-        elif isinstance(image_data, QPixmap):
+        elif isinstance(image_data, (QPixmap, ImagePyramid)):
+            # A pyramid makes the thumbnail from its smallest fitting level
             self.original_image = image_data
         else:
             try:
@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+import unittest
+from argparse import Namespace
+from unittest import mock
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import QPointF
+
+from anylabeling.services.auto_labeling.types import AutoLabelingResult
+from anylabeling.views.common.autolabel import (
+    get_checkpoint_file,
+    handle_autolabel_command,
+    run_autolabel,
+)
+from anylabeling.views.labeling.shape import Shape
+
+
+class StubModelManager:
+    """Model manager that labels every image with one rectangle"""
+
+    models = {"stub_model": {"type": "yolov8", "name": "stub_model"}}
+
+    def __init__(self):
+        self.new_model_status = mock.Mock()
+        self.label = "cat"
+        self.interrupt_at = None
+        self.predicted = []
+
+    def load_model_blocking(self, model):
+        return self.models.get(model)
+
+    def get_batch_size(self):
+        return 1
+
+    def unload_model(self):
+        pass
+
+    def predict_shapes(self, image, image_file, text_prompt=None, batch=False):
+        name = os.path.basename(image_file)
+        if name == self.interrupt_at:
+            raise KeyboardInterrupt
+        self.predicted.append(name)
+        shape = Shape(label=self.label, shape_type="rectangle")
+        shape.points = [QPointF(0, 0), QPointF(4, 4)]
+        return AutoLabelingResult([shape])
+
+    def predict_shapes_batch(self, images, image_files):
+        return [
+            self.predict_shapes(image, image_file)
+            for image, image_file in zip(images, image_files)
+        ]
+
+
+class TestAutolabel(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.temp_dir.name, "images")
+        self.output_dir = os.path.join(self.temp_dir.name, "labels")
+        os.makedirs(self.image_dir)
+        self.names = [f"{i}.png" for i in range(5)]
+        for name in self.names:
+            cv2.imwrite(
+                os.path.join(self.image_dir, name),
+                np.zeros((8, 8, 3), np.uint8),
+            )
+        self.model_manager = StubModelManager()
+        patcher = mock.patch(
+            "anylabeling.services.auto_labeling.model_manager.ModelManager",
+            return_value=self.model_manager,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, model="stub_model", **kwargs):
+        return run_autolabel(
+            model, self.image_dir, output_dir=self.output_dir, **kwargs
+        )
+
+    def _labels(self, name):
+        label_file = os.path.join(
+            self.output_dir, os.path.splitext(name)[0] + ".json"
+        )
+        with open(label_file, encoding="utf-8") as f:
+            return [shape["label"] for shape in json.load(f)["shapes"]]
+
+    def test_resume_from_checkpoint(self):
+        self.model_manager.interrupt_at = "2.png"
+        self.assertIsNone(self._run())
+        checkpoint_file = get_checkpoint_file(self.output_dir, "stub_model")
+        self.assertEqual(
+            os.path.basename(checkpoint_file),
+            ".xanylabeling_autolabel_stub_model.txt",
+        )
+        with open(checkpoint_file, encoding="utf-8") as f:
+            self.assertEqual(f.read().split(), ["0.png", "1.png"])
+
+        # Images labeled by the interrupted run are not labeled again
+        self.model_manager.interrupt_at = None
+        self.model_manager.predicted = []
+        self.model_manager.label = "dog"
+        self.assertEqual(self._run(), 3)
+        self.assertEqual(
+            self.model_manager.predicted, ["2.png", "3.png", "4.png"]
+        )
+        self.assertEqual(self._labels("0.png"), ["cat"])
+        self.assertEqual(self._labels("4.png"), ["dog"])
+        with open(checkpoint_file, encoding="utf-8") as f:
+            self.assertEqual(sorted(f.read().split()), self.names)
+
+        self.model_manager.predicted = []
+        self.assertEqual(self._run(), 0)
+        self.assertEqual(self.model_manager.predicted, [])
+
+        self.assertEqual(self._run(restart=True), 5)
+        self.assertEqual(self.model_manager.predicted, self.names)
+        self.assertEqual(self._labels("0.png"), ["dog"])
+
+    def test_unknown_model(self):
+        self.assertIsNone(self._run(model="unknown_model"))
+        self.assertFalse(os.path.exists(self.output_dir))
+
+    def test_command_exit_codes(self):
+        args = Namespace(
+            model="unknown_model",
+            images=self.image_dir,
+            output=self.output_dir,
+            format="xlabel",
+            qt_platform=None,
+            config=None,
+            prompt=None,
+            batch_size=None,
+            workers=None,
+            restart=False,
+        )
+        config_patcher = mock.patch(
+            "anylabeling.config.get_config",
+            return_value={"store_data": False},
+        )
+        config_file_patcher = mock.patch(
+            "anylabeling.config.current_config_file"
+        )
+        with config_patcher, config_file_patcher:
+            with self.assertRaises(SystemExit) as context:
+                handle_autolabel_command(args)
+            self.assertEqual(context.exception.code, 1)
+
+            args.model = "stub_model"
+            args.images = os.path.join(self.temp_dir.name, "missing")
+            with self.assertRaises(SystemExit) as context:
+                handle_autolabel_command(args)
+            self.assertEqual(context.exception.code, 1)
+            self.assertEqual(self.model_manager.predicted, [])
+
+            args.images = self.image_dir
+            handle_autolabel_command(args)
+            self.assertEqual(self.model_manager.predicted, self.names)
+
+
+if __name__ == "__main__":
+    unittest.main()
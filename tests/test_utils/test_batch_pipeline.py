@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from anylabeling.views.labeling.utils.batch_pipeline import BatchPipeline
+from anylabeling.views.labeling.utils.opencv import qt_img_to_rgb_cv_img
+
+
+class TestBatchPipeline(unittest.TestCase):
+
+    def _decode(self, image_file):
+        return f"decoded {image_file}"
+
+    def test_processes_all_images_in_order(self):
+        saved = []
+        progress = []
+        pipeline = BatchPipeline(
+            [f"{i}.jpg" for i in range(10)],
+            predict=lambda files: [f"result {f}" for f in files],
+            save=lambda f, result: saved.append((f, result)),
+            batch_size=3,
+            queue_size=2,
+            on_progress=progress.append,
+            decode=self._decode,
+        )
+        stats = pipeline.run()
+        self.assertEqual(
+            saved, [(f"{i}.jpg", f"result {i}.jpg") for i in range(10)]
+        )
+        self.assertEqual(progress, list(range(1, 11)))
+        self.assertEqual(stats["num_images"], 10)
+
+    def test_decoded_images_are_pinned_during_predict(self):
+        image = np.zeros((4, 4, 3), np.uint8)
+        seen = []
+
+        def predict(files):
+            seen.extend(qt_img_to_rgb_cv_img(None, f).shape for f in files)
+            return [None] * len(files)
+
+        BatchPipeline(
+            ["a.jpg", "b.jpg"],
+            predict=predict,
+            save=lambda f, result: None,
+            decode=lambda f: image,
+        ).run()
+        self.assertEqual(seen, [(4, 4, 3), (4, 4, 3)])
+
+    def test_cancel_stops_processing(self):
+        cancelled = threading.Event()
+        saved = []
+
+        def predict(files):
+            time.sleep(0.01)
+            if len(saved) >= 2:
+                cancelled.set()
+            return files
+
+        pipeline = BatchPipeline(
+            [f"{i}.jpg" for i in range(100)],
+            predict=predict,
+            save=lambda f, result: saved.append(f),
+            is_cancelled=cancelled.is_set,
+            decode=self._decode,
+        )
+        pipeline.run()
+        self.assertLess(len(saved), 100)
+
+    def test_save_error_is_raised(self):
+        def save(f, result):
+            raise IOError("disk full")
+
+        pipeline = BatchPipeline(
+            [f"{i}.jpg" for i in range(20)],
+            predict=lambda files: files,
+            save=save,
+            queue_size=1,
+            decode=self._decode,
+        )
+        with self.assertRaises(IOError):
+            pipeline.run()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.utils.box import (
+    batch_probiou,
+    batched_nms_rotated,
+    numpy_nms_rotated,
+)
+
+
+def full_matrix_nms_rotated(boxes, scores, iou_threshold):
+    sorted_idx = np.argsort(scores)[::-1]
+    boxes = boxes[sorted_idx]
+    ious = np.triu(batch_probiou(boxes, boxes), k=1)
+    pick = np.nonzero(np.max(ious, axis=0) < iou_threshold)[0]
+    return sorted_idx[pick]
+
+
+class TestNmsRotated(unittest.TestCase):
+
+    def _boxes(self, seed, num_boxes, spread):
+        rng = np.random.default_rng(seed)
+        boxes = np.column_stack(
+            [
+                rng.random((num_boxes, 2)) * spread,
+                rng.random((num_boxes, 2)) * 60 + 1,
+                rng.random(num_boxes) * np.pi,
+            ]
+        )
+        return boxes, rng.random(num_boxes)
+
+    def test_matches_full_matrix(self):
+        for seed, spread in enumerate((30, 300, 3000)):
+            boxes, scores = self._boxes(seed, 300, spread)
+            for iou_threshold in (0.2, 0.45, 0.8):
+                np.testing.assert_array_equal(
+                    numpy_nms_rotated(boxes, scores, iou_threshold),
+                    full_matrix_nms_rotated(boxes, scores, iou_threshold),
+                )
+
+    def test_batched_keeps_categories_apart(self):
+        boxes, scores = self._boxes(0, 200, 100)
+        idxs = np.arange(200) % 3
+        keep = batched_nms_rotated(boxes, scores, idxs, 0.45)
+        expected = np.concatenate(
+            [
+                np.nonzero(idxs == category)[0][
+                    numpy_nms_rotated(
+                        boxes[idxs == category], scores[idxs == category], 0.45
+                    )
+                ]
+                for category in range(3)
+            ]
+        )
+        self.assertEqual(sorted(keep), sorted(expected))
+        self.assertTrue(np.all(np.diff(scores[keep]) <= 0))
+
+    def test_empty(self):
+        self.assertEqual(
+            len(numpy_nms_rotated(np.zeros((0, 5)), np.zeros(0), 0.45)), 0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.__base__.clip import (
+    ChineseClipONNX,
+    TextFeatureCache,
+)
+
+
+class TestTextFeatureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.model_path = os.path.join(self.temp_dir.name, "txt.onnx")
+        with open(self.model_path, "wb") as f:
+            f.write(b"model")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_persists_features(self):
+        cache = TextFeatureCache(self.model_path, 52, self.cache_dir)
+        features = np.eye(2, 4, dtype=np.float32)
+        cache.update(["猫", "dog"], features)
+
+        cache = TextFeatureCache(self.model_path, 52, self.cache_dir)
+        np.testing.assert_array_equal(cache.get("猫"), features[0])
+        np.testing.assert_array_equal(cache.get("dog"), features[1])
+        self.assertIsNone(cache.get("bird"))
+
+    def test_new_model_file_invalidates_features(self):
+        cache = TextFeatureCache(self.model_path, 52, self.cache_dir)
+        cache.update(["dog"], np.ones((1, 4), np.float32))
+        with open(self.model_path, "wb") as f:
+            f.write(b"new model")
+        cache = TextFeatureCache(self.model_path, 52, self.cache_dir)
+        self.assertIsNone(cache.get("dog"))
+
+
+class TestClipPreprocess(unittest.TestCase):
+
+    def test_batch_matches_single_image_preprocess(self):
+        clip = ChineseClipONNX.__new__(ChineseClipONNX)
+        clip.image_size = 32
+        rng = np.random.RandomState(0)
+        crops = [
+            rng.randint(0, 255, (h, w, 3), dtype=np.uint8)
+            for h, w in [(10, 40), (64, 64), (7, 3)]
+        ]
+        blob = clip.batch_preprocess(crops)
+        self.assertEqual(blob.shape, (3, 3, 32, 32))
+        self.assertEqual(blob.dtype, np.float32)
+        for i, crop in enumerate(crops):
+            np.testing.assert_allclose(
+                blob[i], clip.image_preprocess(crop, 32)[0], atol=1e-5
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.images = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir.name, f"{i}.jpg")
+            with open(path, "wb") as f:
+                f.write(bytes([i]) * 128)
+            self.images.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _embedding(self, value=1.0):
+        return {
+            "image_embedding": np.full((1, 4, 8, 8), value, np.float32),
+            "original_size": (480, 640),
+        }
+
+    def test_persists_across_instances(self):
+        cache = EmbeddingCache("sam", 1024, cache_dir=self.cache_dir)
+        cache.put(self.images[0], self._embedding(2.0))
+
+        cache = EmbeddingCache("sam", 1024, cache_dir=self.cache_dir)
+        self.assertTrue(cache.find(self.images[0]))
+        embedding = cache.get(self.images[0])
+        self.assertEqual(embedding["original_size"], (480, 640))
+        np.testing.assert_array_equal(
+            embedding["image_embedding"],
+            self._embedding(2.0)["image_embedding"],
+        )
+
+    def test_key_includes_model_and_input_size(self):
+        cache = EmbeddingCache("sam", 1024, cache_dir=self.cache_dir)
+        cache.put(self.images[0], self._embedding())
+        other_size = EmbeddingCache("sam", 512, cache_dir=self.cache_dir)
+        other_model = EmbeddingCache("sam2", 1024, cache_dir=self.cache_dir)
+        self.assertFalse(other_size.find(self.images[0]))
+        self.assertFalse(other_model.find(self.images[0]))
+
+    def test_evicts_least_recently_used(self):
+        nbytes = self._embedding()["image_embedding"].nbytes
+        cache = EmbeddingCache(
+            "sam",
+            maxsize=1,
+            max_bytes=2 * nbytes + 1024,
+            cache_dir=self.cache_dir,
+        )
+        cache.put(self.images[0], self._embedding())
+        cache.put(self.images[1], self._embedding())
+        cache.get(self.images[0])
+        cache.put(self.images[2], self._embedding())
+
+        cache = EmbeddingCache(
+            "sam", max_bytes=2 * nbytes + 1024, cache_dir=self.cache_dir
+        )
+        self.assertTrue(cache.find(self.images[0]))
+        self.assertFalse(cache.find(self.images[1]))
+        self.assertTrue(cache.find(self.images[2]))
+
+    def test_disabled_disk_cache(self):
+        cache = EmbeddingCache("sam", max_bytes=0, cache_dir=self.cache_dir)
+        cache.put(self.images[0], self._embedding())
+        self.assertTrue(cache.find(self.images[0]))
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
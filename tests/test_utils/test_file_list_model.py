@@ -0,0 +1,41 @@
+import unittest
+
+from anylabeling.views.labeling.widgets.file_list_widget import FileListModel
+
+
+class TestFileListModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = FileListModel()
+        self.files = [f"img{i}.jpg" for i in range(6)]
+        self.model.set_files(self.files, {"img1.jpg", "img4.jpg"})
+
+    def test_lookups(self):
+        self.assertEqual(self.model.rowCount(), 6)
+        self.assertEqual(self.model.files, self.files)
+        self.assertEqual(self.model.row("img3.jpg"), 3)
+        self.assertEqual(self.model.row("missing.jpg"), -1)
+        self.assertTrue(self.model.is_checked(4))
+        self.assertFalse(self.model.is_checked(3))
+
+    def test_add_files_skips_known_files(self):
+        files = self.model.files
+        self.model.add_files(["img2.jpg", "new.jpg", "new.jpg"], {"new.jpg"})
+        self.assertEqual(self.model.rowCount(), 7)
+        self.assertEqual(self.model.row("new.jpg"), 6)
+        self.assertTrue(self.model.is_checked(6))
+        # Lists handed out before are not changed
+        self.assertEqual(len(files), 6)
+
+    def test_find_row(self):
+        self.assertEqual(self.model.find_row(2, 1, checked=True), 4)
+        self.assertEqual(self.model.find_row(3, -1, checked=True), 1)
+        self.assertEqual(self.model.find_row(0, -1, checked=True), -1)
+        self.assertEqual(self.model.find_row(5, 1, checked=True), -1)
+        self.model.set_checked(5, True)
+        self.assertEqual(self.model.find_row(5, 1, checked=True), 5)
+        self.assertEqual(self.model.find_row(5, -1, checked=False), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from PyQt5 import QtCore, QtWidgets
+
+from anylabeling.views.labeling.label_widget import LabelingWidget
+from anylabeling.views.labeling.utils import folder_index
+from anylabeling.views.labeling.utils.folder_index import (
+    IGNORE_LABEL,
+    OK_LABEL,
+    UNANNOTATED_LABEL,
+    AsyncFolderIndexer,
+    FolderIndex,
+    FolderIndexWorker,
+    LabelIndex,
+    get_label_buckets,
+)
+
+
+class TestFolderIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_dir = os.path.join(self.temp_dir.name, "images")
+        self.index_dir = os.path.join(self.temp_dir.name, "index")
+        os.makedirs(self.image_dir)
+        self.images = []
+        for i in range(3):
+            path = os.path.join(self.image_dir, f"{i}.jpg")
+            with open(path, "wb") as f:
+                f.write(b"\xff")
+            self.images.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_label(self, image_file, num_shapes, label="cat"):
+        label_file = os.path.splitext(image_file)[0] + ".json"
+        with open(label_file, "w", encoding="utf-8") as f:
+            json.dump({"shapes": [{"label": label}] * num_shapes}, f)
+        return label_file
+
+    def _scan(self, shown_files, labels_checked=None):
+        scanned, checked = [], {}
+        worker = FolderIndexWorker(
+            FolderIndex(self.image_dir, self.index_dir), shown_files, ".json"
+        )
+        worker.images_scanned.connect(scanned.append)
+        worker.annotations_checked.connect(checked.update)
+        if labels_checked is not None:
+            worker.labels_checked.connect(labels_checked.update)
+        worker.scan_files()
+        return scanned, checked
+
+    def test_first_scan_checks_every_image(self):
+        self._write_label(self.images[1], 2)
+        scanned, checked = self._scan([])
+        self.assertEqual(scanned, [self.images])
+        self.assertEqual(
+            checked,
+            {
+                self.images[0]: False,
+                self.images[1]: True,
+                self.images[2]: False,
+            },
+        )
+        cached = FolderIndex(self.image_dir, self.index_dir).load()
+        self.assertEqual(list(cached), self.images)
+        self.assertTrue(cached[self.images[1]][1])
+
+    def test_rescan_only_checks_changed_labels(self):
+        self._scan([])
+        label_file = self._write_label(self.images[2], 1)
+        scanned, checked = self._scan(self.images)
+        self.assertEqual(scanned, [])
+        self.assertEqual(checked, {self.images[2]: True})
+
+        os.remove(label_file)
+        os.remove(self.images[0])
+        scanned, checked = self._scan(self.images)
+        self.assertEqual(scanned, [self.images[1:]])
+        self.assertEqual(checked, {self.images[2]: False})
+
+    def test_label_buckets(self):
+        self._write_label(self.images[0], 2, label="dog")
+        self._write_label(self.images[1], 0)
+        xml_file = os.path.splitext(self.images[2])[0] + ".xml"
+        with open(xml_file, "w", encoding="utf-8") as f:
+            f.write(
+                "<root><_ItemsData><Item><flags>scratch</flags></Item>"
+                "<Item><flags></flags></Item></_ItemsData></root>"
+            )
+        self.assertEqual(get_label_buckets(self.images[0]), {"dog"})
+        self.assertEqual(get_label_buckets(self.images[1]), {OK_LABEL})
+        self.assertEqual(
+            get_label_buckets(self.images[2]), {"scratch", IGNORE_LABEL}
+        )
+        os.remove(xml_file)
+        self.assertEqual(
+            get_label_buckets(self.images[2]), {UNANNOTATED_LABEL}
+        )
+
+    def test_label_index_follows_rescans(self):
+        labels_checked = {}
+        self._write_label(self.images[0], 1, label="dog")
+        self._scan([], labels_checked)
+        label_index = LabelIndex()
+        for image_file, labels in labels_checked.items():
+            label_index.update(image_file, labels)
+        self.assertEqual(label_index.get_files("dog"), {self.images[0]})
+        self.assertEqual(
+            label_index.get_files(UNANNOTATED_LABEL), set(self.images[1:])
+        )
+
+        labels_checked.clear()
+        self._write_label(self.images[0], 1, label="bird")
+        self._scan(self.images, labels_checked)
+        self.assertEqual(list(labels_checked), [self.images[0]])
+        label_index.update(self.images[0], labels_checked[self.images[0]])
+        self.assertEqual(label_index.get_files("dog"), set())
+        self.assertEqual(label_index.get_files("bird"), {self.images[0]})
+
+    def test_label_index_follows_deleted_label_file(self):
+        label_file = self._write_label(self.images[0], 1)
+        label_index = LabelIndex()
+        for image_file in self.images:
+            label_index.update(image_file, get_label_buckets(image_file))
+        self.assertEqual(label_index.get_files("cat"), {self.images[0]})
+
+        widget = mock.Mock(
+            _config={},
+            filename=self.images[0],
+            output_dir=None,
+            file_label_index=label_index,
+        )
+        widget.get_label_file.return_value = label_file
+        with mock.patch(
+            "PyQt5.QtWidgets.QMessageBox.warning",
+            return_value=QtWidgets.QMessageBox.Yes,
+        ):
+            LabelingWidget.delete_file(widget)
+        self.assertFalse(os.path.exists(label_file))
+        self.assertEqual(label_index.get_files("cat"), set())
+        self.assertEqual(
+            label_index.get_files(UNANNOTATED_LABEL), set(self.images)
+        )
+        widget.load_file.assert_called_once_with(self.images[0])
+
+    def _process_events_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline)
+            QtCore.QCoreApplication.processEvents()
+            time.sleep(0.01)
+
+    def test_restart_scan_while_running(self):
+        app = QtCore.QCoreApplication.instance()
+        if app is None:
+            app = QtCore.QCoreApplication([])
+        first_started = threading.Event()
+        release_second = threading.Event()
+        calls = []
+
+        def scan_all_images(dirpath, should_stop):
+            calls.append(dirpath)
+            if len(calls) == 1:
+                first_started.set()
+                while not should_stop():
+                    time.sleep(0.01)
+                return []
+            release_second.wait(5)
+            return list(self.images)
+
+        scanned = []
+        indexer = AsyncFolderIndexer()
+        indexer.images_scanned.connect(scanned.append)
+        with mock.patch.object(
+            folder_index, "DEFAULT_FOLDER_INDEX_DIR", self.index_dir
+        ), mock.patch.object(
+            folder_index, "scan_all_images", scan_all_images
+        ):
+            indexer.start_scan(self.image_dir, [], ".json")
+            self.assertTrue(first_started.wait(5))
+            indexer.start_scan(self.image_dir, [], ".json")
+            thread = indexer.thread
+
+            # Deliver anything the stopped scan queued; it must not touch
+            # the scan that replaced it.
+            for _ in range(10):
+                app.processEvents()
+                time.sleep(0.01)
+            self.assertIs(indexer.thread, thread)
+            self.assertTrue(thread.isRunning())
+
+            release_second.set()
+            self._process_events_until(lambda: indexer.thread is None)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(scanned, [self.images])
+        self.assertEqual(
+            list(FolderIndex(self.image_dir, self.index_dir).load()),
+            self.images,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from argparse import Namespace
+
+import cv2
+import numpy as np
+
+from anylabeling.services.auto_labeling.grounding_dino import Grounding_DINO
+from anylabeling.services.auto_labeling.lru_cache import LRUCache
+
+MEAN = np.array([0.485, 0.456, 0.406])
+STD = np.array([0.229, 0.224, 0.225])
+
+
+class TestGroundingDINOPreprocess(unittest.TestCase):
+
+    def setUp(self):
+        self.model = Grounding_DINO.__new__(Grounding_DINO)
+        self.model.net = Namespace(
+            max_text_len=256,
+            tokenizer=Grounding_DINO.get_tokenlizer("bert-base-uncased"),
+        )
+        self.model.box_threshold = 0.3
+        self.model.text_threshold = 0.25
+        self.model.target_size = (64, 48)
+        self.model.text_inputs_cache = LRUCache(maxsize=16)
+        self.image = np.random.RandomState(0).randint(
+            0, 256, (30, 50, 3), dtype=np.uint8
+        )
+
+    def test_normalization(self):
+        blob, inputs, _ = self.model.preprocess(self.image, "cat")
+        self.assertEqual(blob.dtype, np.float32)
+        self.assertEqual(blob.shape, (1, 3, 48, 64))
+        self.assertIs(inputs["img"], blob)
+        resized = cv2.resize(
+            self.image, (64, 48), interpolation=cv2.INTER_LINEAR
+        )
+        expected = (resized / 255.0 - MEAN) / STD
+        np.testing.assert_allclose(
+            blob[0], expected.transpose(2, 0, 1), rtol=1e-6, atol=1e-5
+        )
+
+    def test_cached_text_inputs(self):
+        prompt = "Cat . dog . traffic light"
+        _, inputs, captions = self.model.preprocess(self.image, prompt)
+        _, cached_inputs, _ = self.model.preprocess(self.image, prompt)
+        self.assertEqual(captions, "cat . dog . traffic light.")
+        self.assertIs(
+            self.model.get_text_inputs(captions),
+            self.model.text_inputs_cache.get(captions),
+        )
+
+        expected = self.model.encode_text(captions)["inputs"]
+        for text_inputs in (inputs, cached_inputs):
+            self.assertEqual(set(text_inputs), set(expected) | {"img"})
+            for name, value in expected.items():
+                self.assertEqual(text_inputs[name].dtype, value.dtype)
+                np.testing.assert_array_equal(text_inputs[name], value)
+        # The image is not stored with the cached text inputs
+        self.assertNotIn(
+            "img", self.model.text_inputs_cache.get(captions)["inputs"]
+        )
+
+    def test_cached_phrases(self):
+        captions = "cat . dog . traffic light."
+        tokenizer = self.model.net.tokenizer
+        ids = tokenizer.encode(captions).ids
+        # Queries pointing at "cat", "traffic light" and "cat" again, and
+        # one under the box threshold
+        token_sets = [[1], [5, 6], [1], [3]]
+        logits = np.full((1, len(token_sets), 256), -10.0, np.float32)
+        for i, tokens in enumerate(token_sets):
+            logits[0, i, tokens] = 2.0 if i < 3 else -2.0
+        boxes = np.random.RandomState(0).rand(1, len(token_sets), 4)
+
+        expected = []
+        for logit in self.model.sig(logits[0, :3]):
+            expected.append(
+                Grounding_DINO.get_phrases_from_posmap(
+                    logit > self.model.text_threshold,
+                    {"input_ids": np.array(ids, dtype=np.int64)},
+                    tokenizer,
+                )
+            )
+        self.assertEqual(expected, ["cat", "traffic light", "cat"])
+
+        for _ in range(2):
+            boxes_filt, pred_phrases = self.model.postprocess(
+                (logits, boxes), captions
+            )
+            np.testing.assert_array_equal(boxes_filt, boxes[0, :3])
+            self.assertEqual([phrase for phrase, _ in pred_phrases], expected)
+        phrases = self.model.get_text_inputs(captions)["phrases"]
+        self.assertEqual(sorted(phrases.values()), ["cat", "traffic light"])
+
+
+if __name__ == "__main__":
+    unittest.main()
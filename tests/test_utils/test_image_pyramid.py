@@ -0,0 +1,49 @@
+import unittest
+
+from PyQt5.QtGui import QColor, QImage
+
+from anylabeling.views.labeling.utils.image_pyramid import ImagePyramid
+
+
+class TestImagePyramid(unittest.TestCase):
+
+    def setUp(self):
+        self.image = QImage(1000, 600, QImage.Format_RGB32)
+        for x in range(1000):
+            for y in (0, 299, 599):
+                self.image.setPixelColor(x, y, QColor(x % 256, y % 256, 0))
+        self.pyramid = ImagePyramid(self.image, tile_size=256)
+
+    def test_levels(self):
+        self.assertEqual(self.pyramid.num_levels, 3)
+        self.assertEqual(self.pyramid.level_for_scale(2.0), 0)
+        self.assertEqual(self.pyramid.level_for_scale(1.0), 0)
+        self.assertEqual(self.pyramid.level_for_scale(0.5), 1)
+        self.assertEqual(self.pyramid.level_for_scale(0.3), 1)
+        self.assertEqual(self.pyramid.level_for_scale(0.01), 2)
+        self.assertEqual(self.pyramid.level_image(2).width(), 250)
+        self.assertEqual(self.pyramid.level_image(2).height(), 150)
+        self.assertEqual(self.pyramid.size(), self.image.size())
+
+    def test_tile_image(self):
+        tile, offset = self.pyramid.tile_image(0, 1, 1)
+        self.assertEqual((offset.x(), offset.y()), (1, 1))
+        self.assertEqual((tile.width(), tile.height()), (258, 258))
+        self.assertEqual(tile.pixel(1, 1), self.image.pixel(256, 256))
+        self.assertEqual(tile.pixel(0, 44), self.image.pixel(255, 299))
+
+        # Tiles on the border are clipped to the image
+        tile, offset = self.pyramid.tile_image(0, 0, 2)
+        self.assertEqual((offset.x(), offset.y()), (0, 1))
+        self.assertEqual((tile.width(), tile.height()), (257, 89))
+        self.assertEqual(tile.pixel(3, 88), self.image.pixel(3, 599))
+
+    def test_null_image(self):
+        pyramid = ImagePyramid()
+        self.assertTrue(pyramid.isNull())
+        self.assertEqual(pyramid.num_levels, 1)
+        self.assertEqual(pyramid.width(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import io
+import unittest
+from unittest import mock
+
+import PIL.Image
+
+from anylabeling.views.labeling import utils
+from anylabeling.views.labeling.label_file import LabelFile
+
+
+def make_image_data(width, height, image_format, orientation=None):
+    image = PIL.Image.new("RGB", (width, height), (255, 0, 0))
+    kwargs = {}
+    if orientation is not None:
+        exif = PIL.Image.Exif()
+        exif[0x0112] = orientation
+        kwargs["exif"] = exif.tobytes()
+    f = io.BytesIO()
+    image.save(f, format=image_format, **kwargs)
+    return f.getvalue()
+
+
+class TestCheckImageHeightAndWidth(unittest.TestCase):
+
+    def _check(self, image_data, image_height, image_width):
+        with mock.patch(
+            "anylabeling.views.labeling.label_file.logger"
+        ) as logger:
+            size = LabelFile._check_image_height_and_width(
+                image_data, image_height, image_width
+            )
+        return size, logger.error.call_count
+
+    def test_matching_size(self):
+        for image_format in ("PNG", "JPEG"):
+            image_data = make_image_data(20, 10, image_format)
+            self.assertEqual(self._check(image_data, 10, 20), ((10, 20), 0))
+            self.assertEqual(
+                self._check(image_data, None, None), ((None, None), 0)
+            )
+
+    def test_mismatched_size(self):
+        for image_format in ("PNG", "JPEG"):
+            image_data = make_image_data(20, 10, image_format)
+            self.assertEqual(self._check(image_data, 20, 10), ((10, 20), 2))
+            self.assertEqual(self._check(image_data, 10, 30), ((10, 20), 1))
+
+    def test_exif_rotated_jpeg(self):
+        # The size stored in the file is kept, as when the pixels are
+        # decoded, rather than the size after applying the orientation
+        image_data = make_image_data(20, 10, "JPEG", orientation=6)
+        with utils.img_data_to_pil(image_data) as img:
+            self.assertEqual(img.getexif()[0x0112], 6)
+        self.assertEqual(utils.img_data_to_arr(image_data).shape[:2], (10, 20))
+        self.assertEqual(self._check(image_data, 10, 20), ((10, 20), 0))
+        self.assertEqual(self._check(image_data, 20, 10), ((10, 20), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
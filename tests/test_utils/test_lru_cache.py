@@ -0,0 +1,47 @@
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.lru_cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_evicts_by_count(self):
+        cache = LRUCache(maxsize=2)
+        for key in "abc":
+            cache.put(key, key)
+        self.assertFalse(cache.find("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_evicts_by_nbytes(self):
+        cache = LRUCache(maxsize=None, max_bytes=3000)
+        cache.put("small", np.zeros(100, np.uint8))
+        cache.put("large", {"embedding": np.zeros(2000, np.uint8)})
+        cache.get("small")
+        cache.put("other", np.zeros(1000, np.uint8))
+        self.assertTrue(cache.find("small"))
+        self.assertFalse(cache.find("large"))
+        self.assertEqual(cache.stats()["nbytes"], 1100)
+
+    def test_stats_counts_hits_and_misses(self):
+        cache = LRUCache()
+        cache.put("a", np.zeros(8, np.uint8))
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_capacity_from_config(self):
+        cache = LRUCache.from_config({"embedding_cache_memory_mb": 1})
+        self.assertIsNone(cache.maxsize)
+        cache.put("a", np.zeros(1024 * 100, np.uint8))
+        self.assertEqual(cache.capacity(), 10)
+        self.assertEqual(cache.capacity(reserve=3), 7)
+        self.assertEqual(LRUCache(maxsize=10).capacity(reserve=3), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
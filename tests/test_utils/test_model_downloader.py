@@ -0,0 +1,116 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from anylabeling.services.auto_labeling.model_downloader import (
+    DownloadError,
+    download_file,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        data = server.data
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if match and server.support_ranges:
+            start, end = int(match.group(1)), int(match.group(2))
+            with server.lock:
+                server.ranges.append((start, end))
+                fail = start in server.fail_at
+                server.fail_at.discard(start)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(data)}"
+            )
+            body = data[start : end + 1]
+        else:
+            fail = False
+            self.send_response(200)
+            body = data
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        # Drop the connection halfway through a failing chunk
+        self.wfile.write(body[: len(body) // 2] if fail else body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dest_path = os.path.join(self.temp_dir.name, "model.onnx")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.data = os.urandom(10_000)
+        self.server.support_ranges = True
+        self.server.fail_at = set()
+        self.server.ranges = []
+        self.server.lock = threading.Lock()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/model.onnx"
+        thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}
+        )
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def _download(self, **kwargs):
+        return download_file(
+            self.url, self.dest_path, chunk_size=1000, timeout=10, **kwargs
+        )
+
+    def _read(self):
+        with open(self.dest_path, "rb") as f:
+            return f.read()
+
+    def test_parallel_chunks(self):
+        progress = []
+        digest = self._download(
+            progress_callback=lambda done, total: progress.append(
+                (done, total)
+            ),
+            sha256=hashlib.sha256(self.server.data).hexdigest(),
+        )
+        self.assertEqual(self._read(), self.server.data)
+        self.assertEqual(digest, hashlib.sha256(self.server.data).hexdigest())
+        self.assertEqual(progress[-1], (10_000, 10_000))
+        self.assertEqual(os.listdir(self.temp_dir.name), ["model.onnx"])
+
+    def test_resume(self):
+        self.server.fail_at = {3000}
+        with self.assertRaises(DownloadError):
+            self._download(num_workers=1)
+        self.assertFalse(os.path.exists(self.dest_path))
+
+        self.server.ranges = []
+        self._download()
+        self.assertEqual(self._read(), self.server.data)
+        # Only the probe and the chunks that were not finished are fetched
+        self.assertEqual(self.server.ranges[0], (0, 0))
+        self.assertNotIn((0, 999), self.server.ranges)
+        self.assertIn((3000, 3999), self.server.ranges)
+
+    def test_without_ranges(self):
+        self.server.support_ranges = False
+        self._download()
+        self.assertEqual(self._read(), self.server.data)
+
+    def test_checksum_mismatch(self):
+        with self.assertRaises(DownloadError):
+            self._download(sha256="0" * 64)
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from anylabeling.services.auto_labeling.model_manifest import ModelManifest
+
+
+class TestModelManifest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest_file = os.path.join(
+            self.temp_dir.name, "models_manifest.json"
+        )
+        self.model_path = os.path.join(self.temp_dir.name, "model.onnx")
+        with open(self.model_path, "wb") as f:
+            f.write(b"weights" * 64)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unrecorded_file(self):
+        self.assertFalse(
+            ModelManifest(self.manifest_file).is_valid(self.model_path)
+        )
+
+    def test_recorded_file(self):
+        ModelManifest(self.manifest_file).record(self.model_path)
+        manifest = ModelManifest(self.manifest_file)
+        self.assertTrue(manifest.is_valid(self.model_path))
+
+        # Same content with a new mtime is still valid
+        stat = os.stat(self.model_path)
+        os.utime(
+            self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9)
+        )
+        self.assertTrue(manifest.is_valid(self.model_path))
+
+        with open(self.model_path, "r+b") as f:
+            f.write(b"corrupt")
+        self.assertFalse(manifest.is_valid(self.model_path))
+
+        manifest.remove(self.model_path)
+        manifest.record(self.model_path)
+        self.assertTrue(manifest.is_valid(self.model_path))
+
+    def test_truncated_file(self):
+        manifest = ModelManifest(self.manifest_file)
+        manifest.record(self.model_path)
+        with open(self.model_path, "r+b") as f:
+            f.truncate(10)
+        self.assertFalse(manifest.is_valid(self.model_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+
+from anylabeling.services.auto_labeling.engines.build_onnx_engine import (
+    OnnxBaseModel,
+)
+
+
+class TestOnnxBaseModel(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.temp_dir.name, "optimized")
+        self.model_path = os.path.join(self.temp_dir.name, "model.onnx")
+        weight = helper.make_tensor(
+            "w", TensorProto.FLOAT, [2, 2], [1.0, 2.0, 3.0, 4.0]
+        )
+        graph = helper.make_graph(
+            [
+                helper.make_node("MatMul", ["x", "w"], ["y"]),
+                helper.make_node("Relu", ["y"], ["z"]),
+            ],
+            "graph",
+            [helper.make_tensor_value_info("x", TensorProto.FLOAT, [1, 2])],
+            [helper.make_tensor_value_info("z", TensorProto.FLOAT, [1, 2])],
+            [weight],
+        )
+        model = helper.make_model(
+            graph, opset_imports=[helper.make_opsetid("", 13)]
+        )
+        model.ir_version = 8
+        helper.set_model_props(model, {"kpt_shape": "[17, 3]"})
+        onnx.save(model, self.model_path)
+        self.blob = np.array([[1.0, -1.0]], dtype=np.float32)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _load(self, session_config):
+        return OnnxBaseModel(
+            self.model_path,
+            session_config=session_config,
+            optimized_model_dir=self.cache_dir,
+        )
+
+    def test_session_config(self):
+        net = self._load(
+            {
+                "intra_op_num_threads": 2,
+                "graph_optimization_level": "basic",
+                "enable_mem_arena": False,
+                "cache_optimized_model": False,
+            }
+        )
+        self.assertEqual(net.sess_opts.intra_op_num_threads, 2)
+        self.assertFalse(net.sess_opts.enable_cpu_mem_arena)
+        self.assertIsNone(net.optimized_model_file)
+        self.assertFalse(os.path.exists(self.cache_dir))
+        self.assertIn("graph_optimization_level=basic", net.describe_session())
+
+    def test_optimized_model_is_cached(self):
+        net = self._load({})
+        expected = net.get_ort_inference(self.blob)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        net = self._load({})
+        self.assertEqual(
+            os.path.dirname(net.optimized_model_file), self.cache_dir
+        )
+        self.assertIn(
+            "graph_optimization_level=disable", net.describe_session()
+        )
+        np.testing.assert_array_equal(
+            net.get_ort_inference(self.blob), expected
+        )
+
+    def test_stale_optimized_models_are_removed(self):
+        net = self._load({})
+        expected = net.get_ort_inference(self.blob)
+        first_file = net.optimized_model_file
+
+        # A newer version of the model file gets a new optimized graph,
+        # which replaces the one of the older version
+        stat = os.stat(self.model_path)
+        os.utime(
+            self.model_path,
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+        )
+        net = self._load({})
+        self.assertNotEqual(net.optimized_model_file, first_file)
+        self.assertEqual(
+            os.listdir(self.cache_dir),
+            [os.path.basename(net.optimized_model_file)],
+        )
+        np.testing.assert_array_equal(
+            net.get_ort_inference(self.blob), expected
+        )
+
+    def test_failed_optimized_model_is_not_retried(self):
+        with mock.patch(
+            "anylabeling.services.auto_labeling.engines.build_onnx_engine"
+            ".os.replace",
+            side_effect=OSError("too large"),
+        ):
+            net = self._load({})
+        self.assertIsNone(net.optimized_model_file)
+        expected = net.get_ort_inference(self.blob)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertTrue(os.listdir(self.cache_dir)[0].endswith(".failed"))
+
+        with mock.patch.object(
+            OnnxBaseModel, "save_optimized_model"
+        ) as save_optimized_model:
+            net = self._load({})
+        save_optimized_model.assert_not_called()
+        self.assertIsNone(net.optimized_model_file)
+        np.testing.assert_array_equal(
+            net.get_ort_inference(self.blob), expected
+        )
+
+    def test_metadata(self):
+        for _ in range(2):
+            net = self._load({})
+            self.assertEqual(net.get_metadata(), {"kpt_shape": "[17, 3]"})
+            self.assertEqual(net.get_metadata_info("kpt_shape"), "[17, 3]")
+            self.assertIsNone(net.get_metadata_info("names"))
+        self.assertIsNotNone(net.optimized_model_file)
+
+    def test_invalid_option(self):
+        with self.assertRaises(ValueError):
+            self._load({"graph_optimization_level": "fastest"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+from anylabeling.views.labeling.utils.opencv import (
+    load_rgb_cv_img,
+    qt_img_to_rgb_cv_img,
+)
+
+
+class TestDecodedImageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image_file = os.path.join(self.temp_dir.name, "image.png")
+        self._write_image(value=10)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write_image(self, value):
+        image = np.full((8, 6, 3), value, np.uint8)
+        image[..., 0] = 255  # blue channel in BGR order
+        cv2.imwrite(self.image_file, image)
+
+    def test_decodes_once(self):
+        first = load_rgb_cv_img(self.image_file)
+        self.assertIs(load_rgb_cv_img(self.image_file), first)
+        self.assertFalse(first.flags.writeable)
+        self.assertEqual(first.shape, (8, 6, 3))
+        self.assertEqual(first[0, 0].tolist(), [10, 10, 255])
+
+    def test_returns_writable_copies(self):
+        cv_image = qt_img_to_rgb_cv_img(None, self.image_file)
+        cv_image[:] = 0
+        cv_image = qt_img_to_rgb_cv_img(None, self.image_file)
+        self.assertEqual(cv_image[0, 0].tolist(), [10, 10, 255])
+
+    def test_modified_file_is_decoded_again(self):
+        load_rgb_cv_img(self.image_file)
+        self._write_image(value=20)
+        stat = os.stat(self.image_file)
+        os.utime(
+            self.image_file,
+            ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+        )
+        self.assertEqual(
+            load_rgb_cv_img(self.image_file)[0, 0].tolist(), [20, 20, 255]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
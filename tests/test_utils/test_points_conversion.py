@@ -0,0 +1,36 @@
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.utils.points_conversion import (
+    masks2segments,
+    roi_masks2segments,
+)
+
+
+class TestRoiMasks2Segments(unittest.TestCase):
+
+    def test_matches_full_masks(self):
+        full = np.zeros((2, 60, 80), dtype=np.uint8)
+        full[0, 10:30, 20:50] = 1
+        full[0, 15:20, 25:30] = 0
+        full[1, 0:12, 70:80] = 1
+        rois = [
+            (full[0, 8:33, 18:52].copy(), (18, 8)),
+            (full[1, 0:14, 68:80].copy(), (68, 0)),
+        ]
+        for expected, segment in zip(
+            masks2segments(full, 0.001),
+            roi_masks2segments(rois, (60, 80), 0.001),
+        ):
+            np.testing.assert_array_equal(segment, expected)
+
+    def test_empty_roi(self):
+        segments = roi_masks2segments(
+            [(np.zeros((0, 0), dtype=np.uint8), (0, 0))], (60, 80)
+        )
+        self.assertEqual(segments[0].shape, (0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+
+from anylabeling.services.auto_labeling.utils.sahi.postprocess.combine import (
+    GreedyNMMPostprocess,
+    greedy_nmm_merge,
+)
+from anylabeling.services.auto_labeling.utils.sahi.prediction import (
+    ObjectPrediction,
+)
+
+
+class TestGreedyNMMMerge(unittest.TestCase):
+
+    def _predictions(self, seed):
+        rng = np.random.default_rng(seed)
+        xy = rng.integers(0, 200, (60, 2))
+        wh = rng.integers(5, 60, (60, 2))
+        scores = rng.random(60).astype(np.float32)
+        category_ids = rng.integers(0, 3, 60)
+        return np.column_stack([xy, xy + wh, scores, category_ids])
+
+    def test_matches_greedy_nmm_postprocess(self):
+        for seed in range(5):
+            for match_metric in ("IOU", "IOS"):
+                predictions = self._predictions(seed)
+                postprocess = GreedyNMMPostprocess(
+                    match_threshold=0.3,
+                    match_metric=match_metric,
+                    class_agnostic=False,
+                )
+                expected = [
+                    [*p.bbox.to_xyxy(), p.score.value, p.category.id]
+                    for p in postprocess(
+                        [
+                            ObjectPrediction(
+                                bbox=[int(v) for v in row[:4]],
+                                score=np.float32(row[4]),
+                                category_id=int(row[5]),
+                            )
+                            for row in predictions
+                        ]
+                    )
+                ]
+                merged = greedy_nmm_merge(
+                    predictions, match_metric=match_metric, match_threshold=0.3
+                )
+                np.testing.assert_allclose(merged, expected)
+
+    def test_single_prediction_is_kept(self):
+        predictions = [[1, 2, 3, 4, 0.5, 1]]
+        np.testing.assert_array_equal(
+            greedy_nmm_merge(predictions), predictions
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
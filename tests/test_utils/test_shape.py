@@ -0,0 +1,106 @@
+import copy
+import math
+import random
+import unittest
+
+import numpy as np
+from PyQt5.QtCore import QPointF
+
+from anylabeling.views.labeling.shape import Shape
+from anylabeling.views.labeling.utils.qt import distance_to_line
+
+
+class TestShapePoints(unittest.TestCase):
+
+    def setUp(self):
+        self.shape = Shape(label="a", shape_type="polygon")
+        self.shape.points = [QPointF(0, 0), QPointF(10, 0), QPointF(10, 5)]
+
+    def test_list_interface(self):
+        points = self.shape.points
+        self.assertEqual(points.array.dtype, np.float64)
+        self.assertEqual(points[-1], QPointF(10, 5))
+        self.assertEqual(points[1:], [QPointF(10, 0), QPointF(10, 5)])
+        self.assertIn(QPointF(10, 0), points)
+        self.assertEqual(points.index(QPointF(10, 5)), 2)
+
+        points.append(QPointF(0, 5))
+        points.insert(1, QPointF(5, -1))
+        self.assertEqual(points.pop(), QPointF(0, 5))
+        points[0] = QPointF(1, 1)
+        del points[-1]
+        self.assertEqual(
+            points, [QPointF(1, 1), QPointF(5, -1), QPointF(10, 0)]
+        )
+
+        # Points are values, changing one in place does not change the shape
+        points[0].setX(100)
+        self.assertEqual(points[0], QPointF(1, 1))
+
+        points.clear()
+        self.assertFalse(points)
+        with self.assertRaises(IndexError):
+            points.pop()
+
+    def test_edits_invalidate(self):
+        path = self.shape.get_path()
+        self.shape.points.append(QPointF(0, 5))
+        self.assertIsNot(self.shape.get_path(), path)
+        self.assertEqual(self.shape.get_path().elementCount(), 4)
+
+        revision = self.shape._revision
+        self.shape.move_by(QPointF(1, 2))
+        self.assertGreater(self.shape._revision, revision)
+        self.assertEqual(self.shape.points[3], QPointF(1, 7))
+
+    def test_copies_are_independent(self):
+        other = Shape(shape_type="polygon")
+        other.points = self.shape.points
+        other.points[0] = QPointF(-1, -1)
+        copied = copy.deepcopy(self.shape)
+        copied.move_by(QPointF(1, 1))
+        self.assertEqual(self.shape.points[0], QPointF(0, 0))
+        self.assertEqual(copied.points[0], QPointF(1, 1))
+        self.assertIs(copied.points.shape, copied)
+
+    def test_dict_round_trip(self):
+        data = self.shape.to_dict()
+        self.assertEqual(
+            data["points"], [(0.0, 0.0), (10.0, 0.0), (10.0, 5.0)]
+        )
+        shape = Shape().load_from_dict(
+            {"label": "b", "points": [[1, 2], [3.5, 4]]}
+        )
+        self.assertEqual(shape.points, [QPointF(1, 2), QPointF(3.5, 4)])
+        self.assertTrue(shape.is_closed())
+
+    def test_nearest_edge(self):
+        rng = random.Random(0)
+        self.shape.points = [
+            QPointF(rng.uniform(0, 100), rng.uniform(0, 100))
+            for _ in range(30)
+        ]
+        self.shape.points.append(self.shape.points[-1])
+        for _ in range(100):
+            point = QPointF(rng.uniform(0, 100), rng.uniform(0, 100))
+            distances = [
+                distance_to_line(point, [self.shape[i - 1], self.shape[i]])
+                for i in range(len(self.shape))
+            ]
+            expected = int(np.argmin(distances))
+            if distances[expected] > 5.0:
+                expected = None
+            self.assertEqual(self.shape.nearest_edge(point, 5.0), expected)
+
+    def test_rotate_by(self):
+        center = QPointF(5, 5)
+        self.shape.rotate_by(math.pi / 2, center)
+        for point, expected in zip(
+            self.shape.points, [(0, 10), (0, 0), (5, 0)]
+        ):
+            self.assertAlmostEqual(point.x(), expected[0])
+            self.assertAlmostEqual(point.y(), expected[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
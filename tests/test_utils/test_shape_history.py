@@ -0,0 +1,90 @@
+import unittest
+
+from PyQt5.QtCore import QPointF
+
+from anylabeling.views.labeling.shape import Shape
+from anylabeling.views.labeling.utils.shape_history import (
+    SHAPE_NBYTES,
+    POINT_NBYTES,
+    ShapeHistory,
+)
+
+
+def make_polygon(x, y):
+    shape = Shape(label=f"shape_{x}", shape_type="polygon")
+    shape.points = [QPointF(x, y), QPointF(x + 10, y), QPointF(x, y + 10)]
+    shape.close()
+    return shape
+
+
+class TestShapeHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.shapes = [make_polygon(i * 20, 0) for i in range(100)]
+        self.history = ShapeHistory(max_states=10)
+        self.history.push(self.shapes)
+
+    def test_unchanged_shapes_are_shared(self):
+        self.shapes[3].move_vertex_by(0, QPointF(1, 1))
+        self.shapes[5].attributes = {"color": "red"}
+        self.assertTrue(self.history.is_modified(self.shapes[3]))
+        self.assertFalse(self.history.is_modified(self.shapes[4]))
+        self.history.push(self.shapes)
+
+        before, after = self.history.states
+        self.assertEqual(
+            [i for i in range(100) if before[i] is not after[i]], [3, 5]
+        )
+        self.assertEqual(
+            self.history.nbytes, 102 * (SHAPE_NBYTES + 3 * POINT_NBYTES)
+        )
+
+        # Changes made in place are recorded too
+        self.shapes[5].attributes["color"] = "blue"
+        self.history.push(self.shapes)
+        self.assertIsNot(self.history.states[-1][5], after[5])
+        self.assertEqual(
+            self.history.states[-1][5].shape.attributes, {"color": "blue"}
+        )
+
+    def test_restore(self):
+        self.shapes[3].move_by(QPointF(5, 5))
+        self.shapes.pop(7)
+        self.history.push(self.shapes)
+
+        restored = self.history.restore()
+        self.assertEqual(len(self.history), 0)
+        self.assertEqual(len(restored), 100)
+        self.assertIs(restored[0], self.shapes[0])
+        self.assertIsNot(restored[3], self.shapes[3])
+        self.assertEqual(restored[3].points[0], QPointF(60, 0))
+        self.assertEqual(restored[7].label, "shape_140")
+
+        # Storing the restored shapes again does not copy them
+        self.history.push(restored)
+        self.assertFalse(self.history.is_modified(restored[3]))
+        restored[3].points[0] = QPointF(0, 0)
+        self.assertTrue(self.history.is_modified(restored[3]))
+
+    def test_limits(self):
+        for i in range(20):
+            self.shapes[i].move_by(QPointF(1, 0))
+            self.history.push(self.shapes)
+        self.assertEqual(len(self.history), 11)
+
+        nbytes = SHAPE_NBYTES + 3 * POINT_NBYTES
+        history = ShapeHistory(max_states=10, max_bytes=105 * nbytes)
+        history.push(self.shapes)
+        for i in range(20):
+            self.shapes[i].move_by(QPointF(1, 0))
+            history.push(self.shapes)
+        self.assertEqual(len(history), 6)
+        self.assertEqual(history.nbytes, 105 * nbytes)
+
+        history.pop()
+        history.clear()
+        self.assertEqual((len(history), history.nbytes), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import random
+import unittest
+
+from PyQt5.QtCore import QPointF, QRectF
+
+from anylabeling.views.labeling.shape import Shape
+from anylabeling.views.labeling.utils.shape_index import (
+    ShapeIndex,
+    ShapeList,
+)
+
+
+def make_rectangle(x, y, w, h):
+    shape = Shape(shape_type="rectangle")
+    shape.points = [
+        QPointF(x, y),
+        QPointF(x + w, y),
+        QPointF(x + w, y + h),
+        QPointF(x, y + h),
+    ]
+    shape.close()
+    return shape
+
+
+class TestShapeIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.shapes = ShapeList(
+            make_rectangle(
+                rng.uniform(0, 2000),
+                rng.uniform(0, 2000),
+                rng.uniform(1, 200),
+                rng.uniform(1, 200),
+            )
+            for _ in range(500)
+        )
+        # One shape larger than the cell budget
+        self.shapes.append(make_rectangle(0, 0, 3000, 3000))
+        self.index = ShapeIndex(cell_size=32)
+
+    def brute_force(self, point, margin):
+        hits = []
+        for shape in reversed(self.shapes):
+            rect = shape.bounding_rect()
+            if (
+                rect.left() - margin <= point.x() <= rect.right() + margin
+                and rect.top() - margin <= point.y() <= rect.bottom() + margin
+            ):
+                hits.append(shape)
+        return hits
+
+    def assert_matches(self, points):
+        for point in points:
+            for margin in (0.0, 5.0):
+                self.assertEqual(
+                    self.index.query(self.shapes, point, margin),
+                    self.brute_force(point, margin),
+                )
+
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        self.assert_matches(
+            QPointF(rng.uniform(-50, 2300), rng.uniform(-50, 2300))
+            for _ in range(200)
+        )
+
+    def test_query_rect(self):
+        rect = QRectF(300, 400, 500, 200)
+        self.assertEqual(
+            self.index.query_rect(self.shapes, rect, 10.0),
+            [
+                shape
+                for shape in self.shapes
+                if shape.bounding_rect()
+                .adjusted(-10, -10, 10, 10)
+                .intersects(rect)
+            ],
+        )
+
+    def test_follows_edits(self):
+        point = QPointF(5000, 5000)
+        self.assertEqual(self.index.query(self.shapes, point), [])
+
+        self.shapes[0].move_by(point - self.shapes[0][0])
+        self.shapes[1].points[2] = QPointF(5010, 5010)
+        self.shapes.append(make_rectangle(4995, 4995, 10, 10))
+        self.assert_matches([point])
+        self.assertEqual(len(self.index.query(self.shapes, point)), 3)
+
+        removed = self.shapes.pop(0)
+        self.shapes[0] = self.shapes[0].copy()
+        self.assertNotIn(removed, self.index.query(self.shapes, point))
+        self.assert_matches([point])
+
+        # A new list is picked up too
+        self.shapes = ShapeList(self.shapes[:100])
+        self.assert_matches([point, QPointF(100, 100)])
+
+    def test_point_shape(self):
+        shape = Shape(shape_type="point")
+        shape.points = [QPointF(1500, 1500)]
+        self.shapes.append(shape)
+        self.assertIn(
+            shape, self.index.query(self.shapes, QPointF(1502, 1501), 5.0)
+        )
+        self.assertNotIn(
+            shape, self.index.query(self.shapes, QPointF(2, 1), 5.0)
+        )
+
+    def test_copy_is_not_indexed(self):
+        self.index.query(self.shapes, QPointF(0, 0))
+        shape = self.shapes[0].copy()
+        self.assertIsNone(shape._shape_index)
+        shape.points.append(QPointF(0, 0))
+        self.assertEqual(len(shape), 5)
+        self.assertEqual(len(self.shapes[0]), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
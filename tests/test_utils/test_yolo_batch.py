@@ -0,0 +1,190 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+import onnx
+from onnx import TensorProto, helper
+from PyQt5.QtGui import QImage
+
+from anylabeling.services.auto_labeling.__base__.yolo import YOLO
+
+INPUT_SIZE = 32
+STRIDE = 8
+NUM_CLASSES = 2
+
+
+def make_yolov8_model(model_path, batch_dim):
+    """
+    Tiny YOLOv8 detection graph: each 8x8 cell of the input gives one box
+    around the cell, shifted by the mean of the cell, and the class scores
+    are the mean red and green of the cell.
+    """
+    channels = 4 + NUM_CLASSES
+    weight = np.zeros((channels, 3, STRIDE, STRIDE), np.float32)
+    weight[0:4] = 4.0 / (3 * STRIDE * STRIDE)
+    weight[4, 0] = weight[5, 1] = 1.0 / (STRIDE * STRIDE)
+    grid = INPUT_SIZE // STRIDE
+    centers = (np.arange(grid, dtype=np.float32) + 0.5) * STRIDE
+    offset = np.zeros((1, channels, grid, grid), np.float32)
+    offset[0, 0] = centers[None, :]
+    offset[0, 1] = centers[:, None]
+    offset[0, 2:4] = STRIDE
+    graph = helper.make_graph(
+        [
+            helper.make_node(
+                "Conv", ["images", "w"], ["conv"], strides=[STRIDE, STRIDE]
+            ),
+            helper.make_node("Add", ["conv", "offset"], ["boxes"]),
+            helper.make_node("Reshape", ["boxes", "shape"], ["output0"]),
+        ],
+        "yolov8",
+        [
+            helper.make_tensor_value_info(
+                "images",
+                TensorProto.FLOAT,
+                [batch_dim, 3, INPUT_SIZE, INPUT_SIZE],
+            )
+        ],
+        [
+            helper.make_tensor_value_info(
+                "output0", TensorProto.FLOAT, [batch_dim, channels, None]
+            )
+        ],
+        [
+            onnx.numpy_helper.from_array(weight, "w"),
+            onnx.numpy_helper.from_array(offset, "offset"),
+            onnx.numpy_helper.from_array(
+                np.array([0, channels, -1], np.int64), "shape"
+            ),
+        ],
+    )
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13)]
+    )
+    model.ir_version = 8
+    onnx.save(model, model_path)
+
+
+def describe(result):
+    """Comparable form of a result, failed images give an empty list"""
+    return [
+        (
+            shape.label,
+            round(float(shape.score), 5),
+            [(round(p.x(), 3), round(p.y(), 3)) for p in shape.points],
+        )
+        for shape in getattr(result, "shapes", [])
+    ]
+
+
+class TestYOLOBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.images, self.image_paths = [], []
+        for i, size in enumerate([(40, 60), (32, 32), (50, 20)] * 3):
+            path = os.path.join(self.temp_dir.name, f"{i}.png")
+            image = rng.integers(0, 256, (*size, 3), dtype=np.uint8)
+            cv2.imwrite(path, image)
+            self.images.append(QImage(path))
+            self.image_paths.append(path)
+        # An image that failed to load and one that does not decode
+        self.images[2] = None
+        with open(self.image_paths[5], "wb") as f:
+            f.write(b"not an image")
+        self.images[5] = QImage()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _load(self, batch_dim, batch_size=4):
+        model_path = os.path.join(self.temp_dir.name, f"{batch_dim}.onnx")
+        make_yolov8_model(model_path, batch_dim)
+        config = {
+            "type": "yolov8",
+            "name": "yolov8_test",
+            "display_name": "YOLOv8 test",
+            "model_path": model_path,
+            "classes": ["red", "green"],
+            "conf_threshold": 0.5,
+            "batch_size": batch_size,
+            "session": {"cache_optimized_model": False},
+        }
+        with mock.patch(
+            "anylabeling.services.auto_labeling.model.get_config",
+            return_value={},
+        ):
+            return YOLO(config, on_message=None)
+
+    def _predict_each(self, model):
+        return [
+            describe(model.predict_shapes(image, path))
+            for image, path in zip(self.images, self.image_paths)
+        ]
+
+    def _predict_batch(self, model):
+        return [
+            describe(result)
+            for result in model.predict_shapes_batch(
+                self.images, self.image_paths
+            )
+        ]
+
+    def test_dynamic_batch_matches_single_images(self):
+        model = self._load("batch")
+        self.assertEqual((model.batch_size, model.fixed_batch_size), (4, None))
+        expected = self._predict_each(model)
+        self.assertTrue(all(expected[i] for i in (0, 1, 3, 4, 6, 7, 8)))
+        self.assertEqual(expected[2], [])
+        self.assertEqual(expected[5], [])
+
+        inference = mock.Mock(wraps=model.inference)
+        model.inference = inference
+        # 7 readable images in batches of 4, the last one short
+        self.assertEqual(self._predict_batch(model), expected)
+        self.assertEqual(
+            [call.args[0].shape[0] for call in inference.call_args_list],
+            [4, 3],
+        )
+
+    def test_fixed_batch_is_padded(self):
+        model = self._load(4)
+        self.assertEqual((model.batch_size, model.fixed_batch_size), (4, 4))
+        expected = self._predict_each(self._load("batch"))
+
+        inference = mock.Mock(wraps=model.inference)
+        model.inference = inference
+        self.assertEqual(self._predict_batch(model), expected)
+        blobs = [call.args[0] for call in inference.call_args_list]
+        self.assertEqual([blob.shape[0] for blob in blobs], [4, 4])
+        self.assertFalse(blobs[-1][3:].any())
+        self.assertTrue(blobs[-1][2].any())
+
+        # Single images are padded too, and only the first output is used
+        self.assertEqual(self._predict_each(model), expected)
+
+    def test_falls_back_to_single_images(self):
+        model = self._load("batch", batch_size=3)
+        expected = self._predict_each(model)
+        inference = model.inference
+
+        def batch_inference(blob):
+            if blob.shape[0] > 1 and len(batches) == 1:
+                raise RuntimeError("out of memory")
+            batches.append(blob.shape[0])
+            return inference(blob)
+
+        batches = []
+        model.inference = batch_inference
+        self.assertEqual(self._predict_batch(model), expected)
+        # The first batch succeeded, the rest ran one image at a time
+        self.assertEqual(batches, [3, 1, 1, 1, 1])
+        self.assertEqual((model.batch_size, model.fixed_batch_size), (1, None))
+
+
+if __name__ == "__main__":
+    unittest.main()